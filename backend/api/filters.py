@@ -0,0 +1,26 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.filters import BaseFilterBackend
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ``?search=`` answered from the view's ``search_index`` (api/services/search.py),
+    best matches first. ``?limit=`` caps the number of results.
+    """
+
+    search_param = 'search'
+    default_limit = 20
+    max_limit = 100
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ParseError("limit must be an integer")
+        limit = max(1, min(limit, self.max_limit))
+
+        return view.search_index.search(queryset, query, limit)
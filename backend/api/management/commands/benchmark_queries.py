@@ -0,0 +1,192 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from api.models import (
+    CareerPath,
+    InterviewQuestion,
+    LearningResource,
+    Recommendation,
+    Skill,
+    UserProgress,
+)
+from api.pagination import RecommendationCursorPagination
+
+# Indexes added by 0008_hot_path_indexes; dropped to show the plans without them
+HOT_PATH_INDEXES = {
+    UserProgress: ['progress_user_completed'],
+    LearningResource: ['resource_title_url'],
+    InterviewQuestion: ['question_career_type_level', 'question_type_level'],
+    Recommendation: ['recommendation_user_rank'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN and time the hot API queries on a synthetic dataset, with and "
+        "without the hot path indexes. Everything is rolled back afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000, help="Synthetic users")
+        parser.add_argument(
+            "--resources", type=int, default=50000, help="Synthetic learning resources"
+        )
+        parser.add_argument(
+            "--per-user", type=int, default=50,
+            help="Progress rows and recommendations per user",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        self.stdout.write(f"🧪 Benchmarking hot queries on {connection.vendor}...")
+
+        with transaction.atomic():
+            data = self.build_dataset(options)
+            queries = self.hot_queries(data)
+
+            after = self.measure(queries)
+            self.drop_hot_path_indexes()
+            self.analyze()
+            before = self.measure(queries)
+
+            transaction.set_rollback(True)
+
+        for name in queries:
+            self.stdout.write(f"\n▶ {name}")
+            for label, results in (("before", before), ("after", after)):
+                plan, seconds = results[name]
+                self.stdout.write(f"  {label}: {seconds * 1000:.2f} ms")
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        self.stdout.write(self.style.SUCCESS("\n🎉 Benchmark finished; synthetic data rolled back"))
+
+    # -------------------------------------------------
+    # Synthetic data
+    # -------------------------------------------------
+    def build_dataset(self, options):
+        n_users, n_resources, per_user = options["users"], options["resources"], options["per_user"]
+        self.stdout.write(
+            f"🌱 Creating {n_users} users, {n_resources} resources and "
+            f"{n_users * per_user * 2} progress/recommendation rows..."
+        )
+        started = time.monotonic()
+        batch = 5000
+
+        skills = Skill.objects.bulk_create(
+            Skill(name=f"Bench skill {i}", category="programming") for i in range(200)
+        )
+        careers = CareerPath.objects.bulk_create(
+            CareerPath(
+                title=f"Bench career {i}", description="", future_growth=10,
+                required_experience="1-3 years",
+            )
+            for i in range(max(per_user, 100))
+        )
+        users = User.objects.bulk_create(
+            User(username=f"bench-user-{i}") for i in range(n_users)
+        )
+        resources = LearningResource.objects.bulk_create(
+            (
+                LearningResource(
+                    title=f"Bench resource {i}", description="", resource_type="course",
+                    url=f"https://example.com/{i}", skill=skills[i % len(skills)],
+                    difficulty="beginner", estimated_hours=1,
+                )
+                for i in range(n_resources)
+            ),
+            batch_size=batch,
+        )
+        UserProgress.objects.bulk_create(
+            (
+                UserProgress(
+                    user=user, resource=resources[(u * per_user + j) % len(resources)],
+                    completed=j % 3 == 0,
+                )
+                for u, user in enumerate(users) for j in range(per_user)
+            ),
+            batch_size=batch,
+        )
+        Recommendation.objects.bulk_create(
+            (
+                Recommendation(
+                    user=user, career_path=careers[j], match_percentage=(u * 7 + j * 13) % 100,
+                )
+                for u, user in enumerate(users) for j in range(per_user)
+            ),
+            batch_size=batch,
+        )
+        types = [value for value, _ in InterviewQuestion.QUESTION_TYPES]
+        levels = [value for value, _ in LearningResource.DIFFICULTY_LEVELS]
+        InterviewQuestion.objects.bulk_create(
+            (
+                InterviewQuestion(
+                    career_path=careers[i % len(careers)], question=f"Question {i}?",
+                    question_type=types[i % len(types)], difficulty=levels[i // 7 % len(levels)],
+                    sample_answer="",
+                )
+                for i in range(n_resources)
+            ),
+            batch_size=batch,
+        )
+        self.analyze()
+        self.stdout.write(f"  … done in {time.monotonic() - started:.1f}s")
+        return {'user': users[len(users) // 2], 'career': careers[1], 'resources': resources}
+
+    def drop_hot_path_indexes(self):
+        # Plain DROP INDEX: SQLite's schema editor refuses to run inside atomic()
+        with connection.cursor() as cursor:
+            for names in HOT_PATH_INDEXES.values():
+                for name in names:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    def analyze(self):
+        # Planner statistics, so plans match what a populated database gets
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def hot_queries(self, data):
+        user, career = data['user'], data['career']
+        titles = [resource.title for resource in data['resources'][::500][:100]]
+        # Querysets are cloned for every run, so none is answered from its cache
+        return {
+            "dashboard: completed resources": UserProgress.objects.filter(
+                user=user, completed=True
+            ).values_list('id'),
+            "resources: upsert lookup by title": LearningResource.objects.filter(
+                title__in=titles
+            ).values_list('title', 'url'),
+            "resources: search title/skill": LearningResource.objects.filter(
+                Q(title__icontains='resource 4242') | Q(skill__name__icontains='resource 4242')
+            )[:20],
+            "questions: career + type + difficulty": InterviewQuestion.objects.filter(
+                career_path=career, question_type='technical', difficulty='beginner'
+            ),
+            "questions: type + difficulty": InterviewQuestion.objects.filter(
+                question_type='behavioral', difficulty='advanced'
+            )[:20],
+            "recommendations: first page": Recommendation.objects.filter(user=user).order_by(
+                *RecommendationCursorPagination.ordering
+            )[:RecommendationCursorPagination.page_size],
+        }
+
+    def measure(self, queries):
+        results = {}
+        for name, queryset in queries.items():
+            list(queryset.all())  # warm the page cache
+            timings = []
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started)
+            results[name] = (queryset.explain(), statistics.median(timings))
+        return results
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.skill_graph import skill_graph_cache
+
+
+class Command(BaseCommand):
+    help = "Rebuild the skill co-occurrence matrix from job postings and career paths"
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("🔄 Building skill co-occurrence matrix...")
+        started = time.monotonic()
+
+        graph = skill_graph_cache.rebuild()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {len(graph)} skills, {graph.matrix.nnz} non-zero pairs "
+            f"written to {skill_graph_cache.path} in {elapsed:.1f}s"
+        ))
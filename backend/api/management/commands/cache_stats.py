@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.services.service_cache import SERVICE_CACHES
+
+
+class Command(BaseCommand):
+    help = "Show fleet-wide hit/stale/miss counters for the external service caches"
+
+    def handle(self, *args, **kwargs):
+        for service_cache in SERVICE_CACHES:
+            stats = service_cache.stats()
+            hit_rate = (
+                f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else "n/a"
+            )
+            self.stdout.write(
+                f"{stats['namespace']:<10} v{stats['version']}  "
+                f"hits={stats['hits']:<8} stale={stats['stale']:<8} misses={stats['misses']:<8} hit rate={hit_rate}"
+            )
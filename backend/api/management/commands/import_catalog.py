@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.catalog_import import KINDS, CatalogImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream skills, careers, career skills, learning resources or interview "
+        "questions from a CSV or JSONL file (optionally .gz) into the catalog"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=list(KINDS), help="What the file contains")
+        parser.add_argument("path", help="CSV with a header row, or one JSON object per line")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            default=None,
+            help="File format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Rows validated and written per transaction",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=1000,
+            help="Stop once this many rows have been rejected",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        importer = CatalogImporter(
+            options["kind"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            max_errors=options["max_errors"],
+        )
+        mode = " (dry run)" if options["dry_run"] else ""
+        self.stdout.write(f"📥 Importing {options['kind']} from {options['path']}{mode}...")
+        started = time.monotonic()
+
+        def report(stats):
+            self.stdout.write(
+                f"  … {stats['read']} rows read, {stats['written']} written, {stats['invalid']} invalid"
+            )
+
+        try:
+            stats = importer.run(options["path"], options["format"], on_batch=report)
+        except (OSError, ValueError) as e:
+            self._write_errors(importer)
+            raise CommandError(str(e))
+
+        self._write_errors(importer)
+        if importer.changed_careers:
+            self.stdout.write(
+                f"ℹ️  {len(importer.changed_careers)} careers queued for re-scoring "
+                "(run_import_worker or recompute_recommendations --pending)"
+            )
+
+        elapsed = time.monotonic() - started
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {verb} {stats['written']} {options['kind']} "
+            f"({stats['read']} rows, {stats['skipped']} duplicates, "
+            f"{stats['invalid']} invalid) in {elapsed:.1f}s"
+        ))
+
+    def _write_errors(self, importer):
+        for line_num, message in importer.errors:
+            self.stderr.write(f"  line {line_num}: {message}")
+        if importer.stats["invalid"] > len(importer.errors):
+            self.stderr.write(f"  … and {importer.stats['invalid'] - len(importer.errors)} more")
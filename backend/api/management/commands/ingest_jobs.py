@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import CareerPath
+from api.services.job_ingestion import (
+    RECORDED_SEARCHES,
+    JobIngestionService,
+    RecordedAdzunaSource,
+)
+from api.services.skill_graph import skill_graph_cache
+
+
+class Command(BaseCommand):
+    help = "Pull Adzuna job postings into the local JobPosting store"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Search term to ingest; repeatable. Defaults to every career path title",
+        )
+        parser.add_argument("--where", default="us", help="Adzuna country code")
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=5,
+            help="Search pages (50 postings each) to pull per query",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of postings stored per bulk INSERT",
+        )
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Replay recorded Adzuna responses instead of calling the API",
+        )
+        parser.add_argument(
+            "--fixture",
+            default=None,
+            help=f"Recorded responses to replay with --offline (default: {RECORDED_SEARCHES.name})",
+        )
+
+    def handle(self, *args, **options):
+        if options["offline"] or options["fixture"]:
+            source = RecordedAdzunaSource(options["fixture"] or RECORDED_SEARCHES)
+            default_queries = source.queries
+            self.stdout.write("📼 Replaying recorded Adzuna responses")
+        else:
+            source = None
+            default_queries = list(CareerPath.objects.values_list("title", flat=True)) or [
+                "software developer"
+            ]
+
+        queries = options["queries"] or default_queries
+        self.stdout.write(f"📥 Ingesting {len(queries)} searches from Adzuna ({options['where']})...")
+        started = time.monotonic()
+
+        stats = JobIngestionService(source).ingest(
+            queries,
+            where=options["where"],
+            max_pages=options["pages"],
+            batch_size=options["batch_size"],
+        )
+
+        if stats["created"]:
+            graph = skill_graph_cache.rebuild()
+            self.stdout.write(f"🕸️  Skill co-occurrence matrix rebuilt ({len(graph)} skills)")
+
+        elapsed = time.monotonic() - started
+        summary = (
+            f"Stored {stats['created']} new postings "
+            f"({stats['fetched']} fetched, {stats['duplicates']} duplicates) in {elapsed:.1f}s"
+        )
+        if stats["failed_pages"]:
+            raise CommandError(
+                f"{summary}, but {stats['failed_pages']} search pages could not be fetched"
+            )
+        self.stdout.write(self.style.SUCCESS(f"🎉 {summary}"))
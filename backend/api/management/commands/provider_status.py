@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.services.resilience import provider_metrics
+
+
+class Command(BaseCommand):
+    help = "Show circuit breaker and rate limiter state for each external provider"
+
+    def handle(self, *args, **kwargs):
+        for metrics in provider_metrics():
+            line = (
+                f"{metrics['provider']:<10} circuit={metrics['state']:<10} "
+                f"failures={metrics['consecutive_failures']:<4} "
+                f"opened={metrics['times_opened']:<4} rejected={metrics['rejected_calls']:<6}"
+            )
+            if 'tokens' in metrics:
+                line += (
+                    f" tokens={metrics['tokens']:<6} "
+                    f"rate_limited={metrics['rate_limited_calls']}"
+                )
+            self.stdout.write(line)
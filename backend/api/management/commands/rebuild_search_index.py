@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.services.search import job_title_index, resource_index, skill_index
+
+
+class Command(BaseCommand):
+    help = "Re-index every learning resource, skill and job posting title for full-text search"
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔄 Rebuilding full-text search indexes...")
+        for name, index in (
+            ("skills", skill_index),
+            ("learning resources", resource_index),
+            ("job postings", job_title_index),
+        ):
+            count = index.rebuild()
+            self.stdout.write(f"✅ {count} {name} indexed")
+        self.stdout.write(self.style.SUCCESS("🎉 Search indexes rebuilt"))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.models import SkillDemand
+from api.services.skill_demand import skill_demand_service
+
+
+class Command(BaseCommand):
+    help = "Recompute the SkillDemand aggregates from every stored job posting"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of postings folded into the aggregates at a time",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔄 Rebuilding skill demand aggregates...")
+        started = time.monotonic()
+
+        skill_demand_service.rebuild(chunk_size=options["chunk_size"])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 Rebuilt demand for {SkillDemand.objects.count()} skills in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.recommendation_service import recommendation_service
+
+
+class Command(BaseCommand):
+    help = "Regenerate Recommendation rows for every user in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Number of users scored together as one user x skill matrix",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows per bulk INSERT ... ON CONFLICT statement",
+        )
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Only re-score careers whose skills changed since their rows were written",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        batch_size = options["batch_size"]
+
+        started = time.monotonic()
+
+        if options["pending"]:
+            careers = recommendation_service.refresh_pending_careers(chunk_size, batch_size)
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"🎉 Re-scored {careers} changed careers in {elapsed:.1f}s"
+            ))
+            return
+
+        self.stdout.write("🔄 Recomputing recommendations...")
+
+        # Reload so the run reflects the current CareerPathSkill table
+        recommendation_service.invalidate()
+        matrix = recommendation_service.get_matrix()
+        self.stdout.write(
+            f"📐 Career x skill matrix: {matrix.shape[0]} careers, {matrix.shape[1]} skills"
+        )
+
+        users_done = 0
+        rows_written = 0
+        for chunk in recommendation_service.iter_user_chunks(chunk_size):
+            recommendations = recommendation_service.build_recommendations(chunk, matrix)
+            recommendation_service.save_recommendations(
+                chunk, recommendations, matrix, batch_size
+            )
+
+            users_done += len(chunk)
+            rows_written += len(recommendations)
+            self.stdout.write(f"  … {users_done} users, {rows_written} recommendations")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 Recomputed {rows_written} recommendations for {users_done} users "
+            f"in {elapsed:.1f}s"
+        ))
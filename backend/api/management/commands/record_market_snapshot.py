@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from api.services.market_history import market_history_service
+
+
+class Command(BaseCommand):
+    help = "Append a market snapshot for every career path and skill (run on a schedule)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            choices=["local", "live"],
+            default="local",
+            help="Count career postings in the ingested store or with live Adzuna searches",
+        )
+        parser.add_argument(
+            "--update-growth",
+            action="store_true",
+            help="Recompute CareerPath.future_growth from the recorded history",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"📸 Recording market snapshot ({options['source']})...")
+        written = market_history_service.record(source=options["source"])
+        self.stdout.write(f"✅ {written} snapshot rows appended")
+
+        if options["update_growth"]:
+            updated = market_history_service.update_future_growth()
+            self.stdout.write(f"📈 future_growth updated for {updated} career paths")
+
+        self.stdout.write(self.style.SUCCESS("🎉 Done"))
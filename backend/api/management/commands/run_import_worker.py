@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.services.import_queue import career_import_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued career auto-population jobs (POST /api/integrated/auto-populate/) "
+        "and re-score the careers they change"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "CAREER_IMPORT_CONCURRENCY", 4),
+            help="Jobs run in parallel by this process",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait before checking an empty queue again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of waiting for more jobs",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        self.stdout.write(f"👷 Career import worker started ({concurrency} in parallel)")
+
+        try:
+            done = career_import_queue.work(
+                concurrency=concurrency,
+                poll_interval=options["poll_interval"],
+                stop_when_empty=options["once"],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("🛑 Worker stopped")
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"🎉 {done} import jobs processed"))
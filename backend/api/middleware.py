@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.utils.functional import SimpleLazyObject
+
+# Process-wide: the demo user's id, so later requests fetch it by primary key
+_demo_user_id = None
+
+
+def get_demo_user():
+    global _demo_user_id
+
+    if _demo_user_id is not None:
+        user = User.objects.filter(pk=_demo_user_id, username="demo").first()
+        if user is not None:
+            return user
+
+    user, _ = User.objects.get_or_create(
+        username="demo",
+        defaults={"email": "demo@example.com"}
+    )
+    _demo_user_id = user.pk
+    return user
+
+
+def get_acting_user(request):
+    """Return the user a request acts as, resolving it at most once per request"""
+    # DRF requests authenticate lazily on .user, so JWT users are picked up here
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+
+    acting_user = getattr(request, 'acting_user', None)
+    if acting_user is None:
+        acting_user = get_demo_user()
+        request.acting_user = acting_user
+    return acting_user
+
+
+class ActingUserMiddleware:
+    """
+    Attach ``request.acting_user``: the authenticated user, or the shared demo
+    user until real authentication is enforced. Resolved lazily, once.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.acting_user = SimpleLazyObject(lambda: self.resolve(request))
+        return self.get_response(request)
+
+    @staticmethod
+    def resolve(request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user
+        return get_demo_user()
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-17 11:28
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Max
+
+
+def remove_duplicate_recommendations(apps, schema_editor):
+    Recommendation = apps.get_model('api', 'Recommendation')
+    latest = (
+        Recommendation.objects.values('user', 'career_path')
+        .annotate(keep=Max('id'))
+        .values_list('keep', flat=True)
+    )
+    Recommendation.objects.exclude(id__in=list(latest)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_remove_userprofile_current_salary_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_recommendations, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='recommendation',
+            unique_together={('user', 'career_path')},
+        ),
+    ]
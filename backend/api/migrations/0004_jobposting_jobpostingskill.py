@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-17 11:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_alter_recommendation_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('adzuna_id', models.CharField(max_length=64, unique=True)),
+                ('title', models.CharField(max_length=300)),
+                ('company', models.CharField(blank=True, max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('country', models.CharField(default='us', max_length=8)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('salary_min', models.FloatField(blank=True, null=True)),
+                ('salary_max', models.FloatField(blank=True, null=True)),
+                ('redirect_url', models.URLField(blank=True, max_length=500)),
+                ('posted_at', models.DateTimeField(blank=True, null=True)),
+                ('ingested_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-posted_at', '-id'],
+                'indexes': [models.Index(fields=['country', 'category'], name='api_jobpost_country_306ebf_idx'), models.Index(fields=['country', 'location'], name='api_jobpost_country_140498_idx'), models.Index(fields=['-posted_at'], name='api_jobpost_posted__0cd9ee_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobPostingSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(db_index=True, max_length=100)),
+                ('posting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='api.jobposting')),
+            ],
+            options={
+                'unique_together': {('posting', 'skill')},
+            },
+        ),
+    ]
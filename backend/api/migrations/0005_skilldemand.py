@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_jobposting_jobpostingskill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillDemand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100, unique=True)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+                ('salary_count', models.PositiveIntegerField(default=0)),
+                ('salary_total', models.FloatField(default=0)),
+                ('salary_p25', models.FloatField(blank=True, null=True)),
+                ('salary_median', models.FloatField(blank=True, null=True)),
+                ('salary_p75', models.FloatField(blank=True, null=True)),
+                ('salary_histogram', models.JSONField(default=dict)),
+                ('locations', models.JSONField(default=dict)),
+                ('related_skills', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-job_count', 'skill'],
+            },
+        ),
+    ]
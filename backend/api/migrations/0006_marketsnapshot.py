@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_skilldemand'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject_type', models.CharField(choices=[('career', 'Career Path'), ('skill', 'Skill')], max_length=10)),
+                ('subject', models.CharField(max_length=200)),
+                ('recorded_at', models.DateTimeField()),
+                ('job_count', models.PositiveIntegerField()),
+                ('average_salary', models.FloatField(blank=True, null=True)),
+                ('median_salary', models.FloatField(blank=True, null=True)),
+                ('source', models.CharField(default='local', max_length=10)),
+            ],
+            options={
+                'ordering': ['recorded_at'],
+                'indexes': [models.Index(fields=['subject_type', 'subject', 'recorded_at'], name='api_markets_subject_503af2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-17 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_careerimportbatch_careerimportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interviewquestion',
+            index=models.Index(fields=['career_path', 'question_type', 'difficulty'], name='question_career_type_level'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewquestion',
+            index=models.Index(fields=['question_type', 'difficulty'], name='question_type_level'),
+        ),
+        migrations.AddIndex(
+            model_name='learningresource',
+            index=models.Index(fields=['title', 'url'], name='resource_title_url'),
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['user', '-match_percentage', 'id'], name='recommendation_user_rank'),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(condition=models.Q(('completed', True)), fields=['user'], name='progress_user_completed'),
+        ),
+        migrations.AddConstraint(
+            model_name='careerpathskill',
+            constraint=models.CheckConstraint(condition=models.Q(('proficiency_level__range', (1, 5))), name='careerpathskill_proficiency_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='userprogress',
+            constraint=models.CheckConstraint(condition=models.Q(('progress_percentage__range', (0, 100))), name='progress_percentage_range'),
+        ),
+        migrations.AddConstraint(
+            model_name='userskill',
+            constraint=models.CheckConstraint(condition=models.Q(('proficiency_level__range', (1, 5))), name='userskill_proficiency_range'),
+        ),
+    ]
@@ -0,0 +1,115 @@
+from django.db import migrations
+
+# Hand-written: FTS5 indexes for LearningResource (title, skill name,
+# description) and Skill (name, category, description), kept current by
+# triggers so rows written with bulk_create(), update() or raw SQL are indexed
+# as well. Queried by api/services/search.py. Other databases get no index and
+# fall back to icontains.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE api_learningresource_fts USING fts5(
+        title, skill, description,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_learningresource_fts_insert AFTER INSERT ON api_learningresource
+    BEGIN
+        INSERT INTO api_learningresource_fts (rowid, title, skill, description)
+        VALUES (new.id, new.title, (SELECT name FROM api_skill WHERE id = new.skill_id), new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_learningresource_fts_update
+    AFTER UPDATE OF title, description, skill_id ON api_learningresource
+    BEGIN
+        DELETE FROM api_learningresource_fts WHERE rowid = old.id;
+        INSERT INTO api_learningresource_fts (rowid, title, skill, description)
+        VALUES (new.id, new.title, (SELECT name FROM api_skill WHERE id = new.skill_id), new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_learningresource_fts_delete AFTER DELETE ON api_learningresource
+    BEGIN
+        DELETE FROM api_learningresource_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE VIRTUAL TABLE api_skill_fts USING fts5(
+        name, category, description,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_skill_fts_insert AFTER INSERT ON api_skill
+    BEGIN
+        INSERT INTO api_skill_fts (rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_skill_fts_update AFTER UPDATE OF name, category, description ON api_skill
+    BEGIN
+        DELETE FROM api_skill_fts WHERE rowid = old.id;
+        INSERT INTO api_skill_fts (rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_skill_fts_rename AFTER UPDATE OF name ON api_skill
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE api_learningresource_fts SET skill = new.name
+        WHERE rowid IN (SELECT id FROM api_learningresource WHERE skill_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER api_skill_fts_delete AFTER DELETE ON api_skill
+    BEGIN
+        DELETE FROM api_skill_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    INSERT INTO api_learningresource_fts (rowid, title, skill, description)
+    SELECT r.id, r.title, s.name, r.description
+    FROM api_learningresource r LEFT JOIN api_skill s ON s.id = r.skill_id
+    """,
+    """
+    INSERT INTO api_skill_fts (rowid, name, category, description)
+    SELECT id, name, category, description FROM api_skill
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS api_skill_fts_delete",
+    "DROP TRIGGER IF EXISTS api_skill_fts_rename",
+    "DROP TRIGGER IF EXISTS api_skill_fts_update",
+    "DROP TRIGGER IF EXISTS api_skill_fts_insert",
+    "DROP TABLE IF EXISTS api_skill_fts",
+    "DROP TRIGGER IF EXISTS api_learningresource_fts_delete",
+    "DROP TRIGGER IF EXISTS api_learningresource_fts_update",
+    "DROP TRIGGER IF EXISTS api_learningresource_fts_insert",
+    "DROP TABLE IF EXISTS api_learningresource_fts",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(SQLITE_FORWARD), run(SQLITE_REVERSE)),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# Hand-written: an FTS5 index over JobPosting titles, so the market endpoints
+# can match a job title without a leading-wildcard LIKE over every posting.
+# Kept current by triggers like the indexes in 0009; other databases get no
+# index and fall back to icontains.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE api_jobposting_fts USING fts5(
+        title,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_jobposting_fts_insert AFTER INSERT ON api_jobposting
+    BEGIN
+        INSERT INTO api_jobposting_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER api_jobposting_fts_update AFTER UPDATE OF title ON api_jobposting
+    BEGIN
+        DELETE FROM api_jobposting_fts WHERE rowid = old.id;
+        INSERT INTO api_jobposting_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER api_jobposting_fts_delete AFTER DELETE ON api_jobposting
+    BEGIN
+        DELETE FROM api_jobposting_fts WHERE rowid = old.id;
+    END
+    """,
+    "INSERT INTO api_jobposting_fts (rowid, title) SELECT id, title FROM api_jobposting",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS api_jobposting_fts_delete",
+    "DROP TRIGGER IF EXISTS api_jobposting_fts_update",
+    "DROP TRIGGER IF EXISTS api_jobposting_fts_insert",
+    "DROP TABLE IF EXISTS api_jobposting_fts",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_full_text_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(SQLITE_FORWARD), run(SQLITE_REVERSE)),
+    ]
@@ -0,0 +1,77 @@
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+# Generated, then edited by hand: batch membership is copied into the new
+# many-to-many table, and duplicate active jobs left by racing requests are
+# failed before the constraint allowing one per title is added.
+
+ACTIVE = ('queued', 'running')
+
+
+def copy_batch_membership(apps, schema_editor):
+    CareerImportJob = apps.get_model('api', 'CareerImportJob')
+    Membership = apps.get_model('api', 'CareerImportBatch').jobs.through
+    Membership.objects.bulk_create(
+        Membership(careerimportbatch_id=batch_id, careerimportjob_id=job_id)
+        for job_id, batch_id in CareerImportJob.objects.filter(batch__isnull=False)
+        .values_list('id', 'batch_id')
+    )
+
+
+def restore_batch_fk(apps, schema_editor):
+    CareerImportJob = apps.get_model('api', 'CareerImportJob')
+    Membership = apps.get_model('api', 'CareerImportBatch').jobs.through
+    # A job shared by several batches goes back to the first one
+    for job_id, batch_id in Membership.objects.order_by('-careerimportbatch_id').values_list(
+        'careerimportjob_id', 'careerimportbatch_id'
+    ):
+        CareerImportJob.objects.filter(pk=job_id).update(batch_id=batch_id)
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    CareerImportJob = apps.get_model('api', 'CareerImportJob')
+    kept = {}
+    for job in CareerImportJob.objects.filter(status__in=ACTIVE).annotate(
+        key=Lower('title')
+    ).order_by('created_at', 'id'):
+        if job.key in kept:
+            CareerImportJob.objects.filter(pk=job.pk).update(
+                status='failed', error=f"Duplicate of job {kept[job.key]}"
+            )
+        else:
+            kept[job.key] = job.pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_jobposting_title_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Frees the "jobs" name for the many-to-many field
+        migrations.AlterField(
+            model_name='careerimportjob',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.careerimportbatch'),
+        ),
+        migrations.AddField(
+            model_name='careerimportbatch',
+            name='jobs',
+            field=models.ManyToManyField(blank=True, related_name='batches', to='api.careerimportjob'),
+        ),
+        migrations.RunPython(copy_batch_membership, restore_batch_fk),
+        migrations.RemoveField(
+            model_name='careerimportjob',
+            name='batch',
+        ),
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='careerimportjob',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('title'), condition=models.Q(('status__in', ('queued', 'running'))), name='careerimportjob_one_active_per_title'),
+        ),
+    ]
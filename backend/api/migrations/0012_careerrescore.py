@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_careerimport_shared_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareerRescore',
+            fields=[
+                ('career_path', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='api.careerpath')),
+                ('requested_at', models.DateTimeField()),
+            ],
+        ),
+    ]
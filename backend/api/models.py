@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -57,6 +58,12 @@ class CareerPathSkill(models.Model):
 
     class Meta:
         unique_together = ('career_path', 'skill')
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(proficiency_level__range=(1, 5)),
+                name='careerpathskill_proficiency_range',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.career_path.title} - {self.skill.name}"
@@ -92,6 +99,12 @@ class UserSkill(models.Model):
 
     class Meta:
         unique_together = ('user', 'skill')
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(proficiency_level__range=(1, 5)),
+                name='userskill_proficiency_range',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.skill.name}"
@@ -127,6 +140,13 @@ class LearningResource(models.Model):
     estimated_hours = models.IntegerField()
     free = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Upserts by title in CareerImportService and import_catalog;
+            # url is included so the duplicate check reads only the index
+            models.Index(fields=['title', 'url'], name='resource_title_url'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -152,6 +172,16 @@ class InterviewQuestion(models.Model):
         max_length=20, choices=LearningResource.DIFFICULTY_LEVELS
     )
 
+    class Meta:
+        indexes = [
+            # Question lists filtered by career, then type and difficulty
+            models.Index(
+                fields=['career_path', 'question_type', 'difficulty'],
+                name='question_career_type_level',
+            ),
+            models.Index(fields=['question_type', 'difficulty'], name='question_type_level'),
+        ]
+
     def __str__(self):
         return f"{self.career_path.title} - {self.question[:40]}"
 
@@ -169,6 +199,21 @@ class UserProgress(models.Model):
 
     class Meta:
         unique_together = ('user', 'resource')
+        indexes = [
+            # The dashboard's completed count reads only this index. Partial,
+            # because Django compiles completed=True to a bare WHERE "completed"
+            # that a (user, completed) index cannot seek on
+            models.Index(
+                fields=['user'], condition=models.Q(completed=True),
+                name='progress_user_completed',
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(progress_percentage__range=(0, 100)),
+                name='progress_percentage_range',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.resource.title}"
@@ -184,5 +229,246 @@ class Recommendation(models.Model):
     skill_gaps = models.JSONField(default=list)
     generated_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        unique_together = ('user', 'career_path')
+        indexes = [
+            # Matches RecommendationCursorPagination.ordering, so a page is an
+            # index range scan instead of a sort of all the user's rows
+            models.Index(
+                fields=['user', '-match_percentage', 'id'], name='recommendation_user_rank'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} → {self.career_path.title}"
+
+
+# =========================
+# CAREER RESCORE
+# =========================
+class CareerRescore(models.Model):
+    """
+    A career whose required skills changed after its Recommendation rows
+    were written. Re-scoring it means scoring every user, so it is left to
+    `manage.py run_import_worker` (between jobs) or `manage.py
+    recompute_recommendations --pending` rather than the request that
+    changed it.
+    """
+    career_path = models.OneToOneField(
+        CareerPath, on_delete=models.CASCADE, primary_key=True, related_name='+'
+    )
+    requested_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Re-score {self.career_path_id} (since {self.requested_at})"
+
+
+# =========================
+# JOB POSTING
+# =========================
+class JobPosting(models.Model):
+    """A job ad ingested from Adzuna, so market endpoints can answer locally"""
+
+    adzuna_id = models.CharField(max_length=64, unique=True)
+    title = models.CharField(max_length=300)
+    company = models.CharField(max_length=200, blank=True)
+    description = models.TextField(blank=True)
+    country = models.CharField(max_length=8, default='us')
+    location = models.CharField(max_length=200, blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    salary_min = models.FloatField(null=True, blank=True)
+    salary_max = models.FloatField(null=True, blank=True)
+    redirect_url = models.URLField(max_length=500, blank=True)
+    posted_at = models.DateTimeField(null=True, blank=True)
+    ingested_at = models.DateTimeField(auto_now_add=True)
+
+    # Midpoint of the advertised range, for aggregates; NULL unless both ends are set
+    SALARY_MID = (models.F('salary_min') + models.F('salary_max')) / 2.0
+
+    class Meta:
+        ordering = ['-posted_at', '-id']
+        indexes = [
+            models.Index(fields=['country', 'category']),
+            models.Index(fields=['country', 'location']),
+            models.Index(fields=['-posted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.company})"
+
+    @property
+    def salary_mid(self):
+        if self.salary_min and self.salary_max:
+            return (self.salary_min + self.salary_max) / 2
+        return None
+
+
+# =========================
+# JOB POSTING SKILL
+# =========================
+class JobPostingSkill(models.Model):
+    """Canonical skill name mentioned in a posting, found at ingestion time"""
+
+    posting = models.ForeignKey(
+        JobPosting, on_delete=models.CASCADE, related_name='skills'
+    )
+    # Canonical extractor name rather than a Skill FK: the extractor also
+    # knows skills that are not in the Skill table yet
+    skill = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        unique_together = ('posting', 'skill')
+
+    def __str__(self):
+        return f"{self.posting.title} - {self.skill}"
+
+
+# =========================
+# SKILL DEMAND
+# =========================
+class SkillDemand(models.Model):
+    """
+    Market demand for one skill, aggregated over every ingested posting.
+
+    Updated incrementally as postings are ingested, so the skill-demand
+    endpoint is a single lookup by skill name.
+    """
+
+    # Canonical extractor name, like JobPostingSkill.skill
+    skill = models.CharField(max_length=100, unique=True)
+    job_count = models.PositiveIntegerField(default=0)
+    salary_count = models.PositiveIntegerField(default=0)
+    salary_total = models.FloatField(default=0)
+    salary_p25 = models.FloatField(null=True, blank=True)
+    salary_median = models.FloatField(null=True, blank=True)
+    salary_p75 = models.FloatField(null=True, blank=True)
+    # {bucket lower bound: postings}, in SALARY_BUCKET steps
+    salary_histogram = models.JSONField(default=dict)
+    # {location: postings}
+    locations = models.JSONField(default=dict)
+    # {other skill: postings mentioning both}
+    related_skills = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SALARY_BUCKET = 5000
+
+    class Meta:
+        ordering = ['-job_count', 'skill']
+
+    def __str__(self):
+        return f"{self.skill} ({self.job_count} jobs)"
+
+    @property
+    def average_salary(self):
+        return self.salary_total / self.salary_count if self.salary_count else 0
+
+    def top_locations(self, limit=5):
+        return dict(sorted(self.locations.items(), key=lambda item: (-item[1], item[0]))[:limit])
+
+
+# =========================
+# MARKET SNAPSHOT
+# =========================
+class MarketSnapshot(models.Model):
+    """
+    One point of market history for a career path or skill.
+
+    Rows are only ever appended (see `manage.py record_market_snapshot`);
+    trends and growth rates are range queries over them.
+    """
+
+    SUBJECT_TYPES = [
+        ('career', 'Career Path'),
+        ('skill', 'Skill'),
+    ]
+
+    subject_type = models.CharField(max_length=10, choices=SUBJECT_TYPES)
+    # CareerPath title or canonical skill name
+    subject = models.CharField(max_length=200)
+    recorded_at = models.DateTimeField()
+    job_count = models.PositiveIntegerField()
+    average_salary = models.FloatField(null=True, blank=True)
+    median_salary = models.FloatField(null=True, blank=True)
+    source = models.CharField(max_length=10, default='local')
+
+    class Meta:
+        ordering = ['recorded_at']
+        indexes = [
+            models.Index(fields=['subject_type', 'subject', 'recorded_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} @ {self.recorded_at:%Y-%m-%d}: {self.job_count} jobs"
+
+
+# =========================
+# CAREER IMPORT JOBS
+# =========================
+class CareerImportBatch(models.Model):
+    """
+    Several career titles submitted together; progress is summed over its
+    jobs. A title already queued elsewhere shares that job, so one job can
+    belong to several batches.
+    """
+
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    jobs = models.ManyToManyField('CareerImportJob', related_name='batches', blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Import batch {self.pk}"
+
+
+class CareerImportJob(models.Model):
+    """
+    One queued auto-population of a career path.
+
+    Rows are the queue: `manage.py run_import_worker` claims queued jobs,
+    runs CareerImportService and records progress and the outcome here.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+    ACTIVE = (QUEUED, RUNNING)
+
+    title = models.CharField(max_length=200)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    stage = models.CharField(max_length=20, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            # One queued or running job per career, whatever its case
+            models.UniqueConstraint(
+                Lower('title'), condition=models.Q(status__in=('queued', 'running')),
+                name='careerimportjob_one_active_per_title',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.status})"
@@ -0,0 +1,8 @@
+from rest_framework.pagination import CursorPagination
+
+
+class RecommendationCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-match_percentage', 'id')
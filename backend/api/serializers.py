@@ -104,7 +104,8 @@ class CareerPathDetailSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_required_skills(self, obj):
-        skills = CareerPathSkill.objects.filter(career_path=obj)
+        # Uses the viewset's prefetch_related('required_skills__skill') when present
+        skills = obj.required_skills.all()
         return CareerPathSkillSerializer(skills, many=True).data
 
 class CareerPathSkillSerializer(serializers.ModelSerializer):
@@ -112,4 +113,21 @@ class CareerPathSkillSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = CareerPathSkill
-        fields = ['skill', 'skill_details', 'proficiency_level', 'is_core']
\ No newline at end of file
+        fields = ['skill', 'skill_details', 'proficiency_level', 'is_core']
+class JobPostingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobPosting
+        fields = [
+            'adzuna_id', 'title', 'company', 'description', 'location', 'category',
+            'salary_min', 'salary_max', 'redirect_url', 'posted_at',
+        ]
+
+class CareerImportJobSerializer(serializers.ModelSerializer):
+    batches = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = CareerImportJob
+        fields = [
+            'id', 'title', 'batches', 'status', 'stage', 'progress', 'attempts',
+            'result', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
@@ -1,140 +1,332 @@
-import requests 
+import asyncio
 import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.core.cache import cache
 from datetime import datetime, timedelta
+from .fanout import Deadline, fan_out
+from .http_client import get_async_client, get_session, get_timeout
+from .resilience import get_guard
+from .service_cache import adzuna_cache
+from .skill_extractor import get_skill_extractor
+
+logger = logging.getLogger(__name__)
+
+# Page downloads get their own pool: extract_skills_from_jobs itself often runs
+# on the shared fan-out pool and must not wait on work queued behind it
+_page_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='adzuna-pages')
+
+
+def _no_results(data):
+    # Adzuna answers unknown searches with a normal payload and no results
+    return not data.get('results')
 
 class AdzunaService:
     BASE_URL = "http://api.adzuna.com/v1/api"
-    
+    PROVIDER = "adzuna"
+    # Namespaced, versioned slice of the shared cache
+    cache = adzuna_cache
+
+    # Adzuna's maximum results_per_page. Every search fetches whole pages of
+    # this size so search_jobs and extract_skills_from_jobs share cached pages
+    PAGE_SIZE = 50
+
     def __init__(self):
         self.app_id = getattr(settings, '5dac6c1e', '')
         self.app_key = getattr(settings, 'c1a3bb7b4137b225a064f37819d0c1ca', '')
-    
-    def search_jobs(self, what="software developer", where="us", max_results=10):
-        """Search for jobs by keyword and location"""
-        cache_key = f"adzuna_jobs_{what}_{where}_{max_results}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
-        
+
+    @property
+    def session(self):
+        # Pooled keep-alive session with retry/backoff, shared per provider
+        return get_session(self.PROVIDER)
+
+    @property
+    def guard(self):
+        # Circuit breaker and rate limit shared by every worker
+        return get_guard(self.PROVIDER)
+
+    def _search_request(self, what, where, page=1):
+        url = f"{self.BASE_URL}/jobs/{where}/search/{page}"
+        params = {
+            'app_id': self.app_id,
+            'app_key': self.app_key,
+            'what': what,
+            'results_per_page': self.PAGE_SIZE,
+            'content-type': 'application/json'
+        }
+        return url, params
+
+    def _categories_request(self):
+        url = f"{self.BASE_URL}/jobs/us/categories"
+        params = {
+            'app_id': self.app_id,
+            'app_key': self.app_key,
+            'content-type': 'application/json'
+        }
+        return url, params
+
+    def _salary_request(self, job_title, location):
+        url = f"{self.BASE_URL}/jobs/{location}/salary_stats"
+        params = {
+            'app_id': self.app_id,
+            'app_key': self.app_key,
+            'title': job_title,
+            'content-type': 'application/json'
+        }
+        return url, params
+
+    def _page_cache_key(self, what, where, page):
+        return self.cache.key('page', what, where, page)
+
+    def _pages_for(self, max_results):
+        return range(1, max(1, math.ceil(max_results / self.PAGE_SIZE)) + 1)
+
+    def _merge_pages(self, pages, max_results):
+        """Combine search pages into one search_jobs-shaped response"""
+        data = dict(pages[0])
+        data['results'] = [
+            job for page in pages for job in page.get('results', [])
+        ][:max_results]
+        return data
+
+    def _count_skills(self, pages, extractor=None):
+        """Count skill mentions across pages of search results"""
+        extractor = extractor or get_skill_extractor()
+        descriptions = (
+            job.get('description', '')
+            for data in pages
+            for job in data.get('results', [])
+        )
+        skill_counts = extractor.count(descriptions)
+
+        return skill_counts.most_common(20)
+
+    def _get_json(self, url, params):
+        response = self.guard.call(self.session.get, url, params=params, timeout=get_timeout())
+        return response.json()
+
+    def fetch_search_page(self, what, where, page):
+        """Fetch one page of search results, cached and shared by concurrent callers"""
+        cache_key = self._page_cache_key(what, where, page)
+
         try:
-            url = f"{self.BASE_URL}/jobs/{where}/search/1"
-            params = {
-                'app_id': self.app_id,
-                'app_key': self.app_key,
-                'what': what,
-                'results_per_page': max_results,
-                'content-type': 'application/json'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            # Cache for 1 hour
-            cache.set(cache_key, data, 3600)
-            
-            return data
+            url, params = self._search_request(what, where, page)
+
+            # Cache for 1 hour; empty pages and failures for a minute
+            return self.cache.fetch_once(
+                cache_key, partial(self._get_json, url, params), 3600,
+                default={'results': []}, is_empty=_no_results,
+            )
         except Exception as e:
-            print(f"Adzuna API error: {e}")
+            logger.warning("Adzuna page %s error: %s", page, e)
             return {'results': []}
-    
+
+    def download_search_page(self, what, where, page, rate_limit_wait):
+        """
+        Fetch one search page straight from Adzuna, for bulk ingestion.
+
+        Unlike fetch_search_page nothing is cached, the call waits up to
+        rate_limit_wait seconds for a rate limit token, and failures raise
+        instead of coming back as an empty page.
+        """
+        url, params = self._search_request(what, where, page)
+        response = self.guard.call(
+            self.session.get, url, params=params, timeout=get_timeout(),
+            rate_limit_wait=rate_limit_wait,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_pages(self, what, where, pages):
+        """Fetch several search pages concurrently, in page order"""
+        pages = list(pages)
+        if len(pages) == 1:
+            return [self.fetch_search_page(what, where, pages[0])]
+
+        results, _ = fan_out(
+            {page: partial(self.fetch_search_page, what, where, page) for page in pages},
+            Deadline(getattr(settings, 'EXTERNAL_API_DEADLINE', 15)),
+            defaults={page: {'results': []} for page in pages},
+            executor=_page_executor,
+        )
+        return [results[page] for page in pages]
+
+    def search_jobs(self, what="software developer", where="us", max_results=10):
+        """Search for jobs by keyword and location"""
+        pages = self.fetch_pages(what, where, self._pages_for(max_results))
+        return self._merge_pages(pages, max_results)
+
     def get_job_categories(self):
         """Get all job categories"""
-        cache_key = "adzuna_categories"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
-        
+        cache_key = self.cache.key('categories')
+
         try:
-            url = f"{self.BASE_URL}/jobs/us/categories"
-            params = {
-                'app_id': self.app_id,
-                'app_key': self.app_key,
-                'content-type': 'application/json'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            cache.set(cache_key, data, 86400)  # 24 hours
-            
-            return data
+            url, params = self._categories_request()
+
+            return self.cache.fetch_once(
+                cache_key, partial(self._get_json, url, params), 86400,  # 24 hours
+                default={'results': []}, is_empty=_no_results,
+            )
         except Exception as e:
-            print(f"Adzuna categories error: {e}")
+            logger.warning("Adzuna categories error: %s", e)
             return {'results': []}
-    
+
     def get_salary_data(self, job_title="software developer", location="us"):
         """Get salary information for a job title"""
-        cache_key = f"adzuna_salary_{job_title}_{location}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
-        
+        cache_key = self.cache.key('salary', job_title, location)
+
         try:
-            url = f"{self.BASE_URL}/jobs/{location}/salary_stats"
-            params = {
-                'app_id': self.app_id,
-                'app_key': self.app_key,
-                'title': job_title,
-                'content-type': 'application/json'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            cache.set(cache_key, data, 86400)  # 24 hours
-            
-            return data
+            url, params = self._salary_request(job_title, location)
+
+            return self.cache.fetch_once(
+                cache_key, partial(self._get_json, url, params), 86400,  # 24 hours
+                default={},
+            )
         except Exception as e:
-            print(f"Adzuna salary error: {e}")
+            logger.warning("Adzuna salary error: %s", e)
             return {}
-    
+
     def extract_skills_from_jobs(self, job_title="developer", location="us", max_pages=3):
         """Extract common skills from job descriptions"""
-        all_skills = []
-        
-        for page in range(1, max_pages + 1):
-            url = f"{self.BASE_URL}/jobs/{location}/search/{page}"
-            params = {
-                'app_id': self.app_id,
-                'app_key': self.app_key,
-                'what': job_title,
-                'results_per_page': 50,
-                'content-type': 'application/json'
+        pages = self.fetch_pages(job_title, location, range(1, max_pages + 1))
+        return self._count_skills(pages)
+
+    def _trends_snapshot(self, categories, pages):
+        """Assemble per-category search pages into one trends snapshot"""
+        trends = [
+            {
+                'category': category.get('label', ''),
+                'tag': category.get('tag', ''),
+                'job_count': page.get('count', 0),
+                # Search responses carry the mean advertised salary of all matches
+                'average_salary': round(page.get('mean') or 0, 2),
             }
-            
-            try:
-                response = requests.get(url, params=params, timeout=10)
-                data = response.json()
-                
-                # Extract skills from job descriptions
-                for job in data.get('results', []):
-                    description = job.get('description', '').lower()
-                    
-                    # Simple skill extraction (you can enhance this)
-                    tech_skills = [
-                        'python', 'javascript', 'java', 'c++', 'react', 'angular',
-                        'vue', 'node.js', 'django', 'flask', 'spring', 'sql',
-                        'mongodb', 'aws', 'azure', 'docker', 'kubernetes', 'git',
-                        'linux', 'machine learning', 'data science', 'ai'
-                    ]
-                    
-                    for skill in tech_skills:
-                        if skill in description:
-                            all_skills.append(skill)
-                            
-            except Exception as e:
-                print(f"Error fetching page {page}: {e}")
-        
-        # Count frequency and return top skills
-        from collections import Counter
-        skill_counts = Counter(all_skills)
-        
-        return skill_counts.most_common(20)
+            for category, page in zip(categories, pages)
+        ]
+        trends.sort(key=lambda trend: -trend['job_count'])
+        return {
+            'trends': trends,
+            # Pages that failed come back without a count
+            'complete': bool(pages) and all('count' in page for page in pages),
+        }
+
+    def _build_market_trends(self, where):
+        categories = self.get_job_categories().get('results', [])
+        labels = [category.get('label', '') for category in categories]
+        # One cached first page per category, all requested at once
+        pages = self.fetch_pages_for(labels, where)
+        return self._trends_snapshot(categories, pages)
+
+    def fetch_pages_for(self, queries, where, page=1):
+        """Fetch the same page for several searches concurrently, in query order"""
+        results, _ = fan_out(
+            {i: partial(self.fetch_search_page, what, where, page) for i, what in enumerate(queries)},
+            Deadline(getattr(settings, 'EXTERNAL_API_DEADLINE', 15)),
+            defaults={i: {'results': []} for i in range(len(queries))},
+            executor=_page_executor,
+        )
+        return [results[i] for i in range(len(queries))]
+
+    def get_market_trends(self, where="us"):
+        """Job counts and mean salaries for every category, cached as one snapshot"""
+        # Incomplete snapshots are kept for a minute only; the next build then
+        # refetches just the category pages that are not cached yet
+        return self.cache.fetch_once(
+            self.cache.key('trends', where), partial(self._build_market_trends, where), 3600,
+            default={'trends': [], 'complete': False},
+            is_empty=lambda snapshot: not snapshot['complete'],
+        )
+
+
+class AsyncAdzunaService(AdzunaService):
+    """Same API as AdzunaService, for async views, on the shared pooled client"""
+
+    async def _aget_json(self, url, params):
+        response = await self.guard.acall(get_async_client().get, url, params=params)
+        return response.json()
+
+    async def fetch_search_page(self, what, where, page):
+        """Fetch one page of search results, sharing the sync service's cache"""
+        cache_key = self._page_cache_key(what, where, page)
+
+        try:
+            url, params = self._search_request(what, where, page)
+
+            # Cache for 1 hour; empty pages and failures for a minute
+            return await self.cache.afetch_once(
+                cache_key, partial(self._aget_json, url, params), 3600,
+                default={'results': []}, is_empty=_no_results,
+            )
+        except Exception as e:
+            logger.warning("Adzuna page %s error: %s", page, e)
+            return {'results': []}
+
+    async def fetch_pages(self, what, where, pages):
+        return await asyncio.gather(*(
+            self.fetch_search_page(what, where, page) for page in pages
+        ))
+
+    async def search_jobs(self, what="software developer", where="us", max_results=10):
+        """Search for jobs by keyword and location"""
+        pages = await self.fetch_pages(what, where, self._pages_for(max_results))
+        return self._merge_pages(pages, max_results)
+
+    async def get_job_categories(self):
+        """Get all job categories"""
+        cache_key = self.cache.key('categories')
+
+        try:
+            url, params = self._categories_request()
+
+            return await self.cache.afetch_once(
+                cache_key, partial(self._aget_json, url, params), 86400,  # 24 hours
+                default={'results': []}, is_empty=_no_results,
+            )
+        except Exception as e:
+            logger.warning("Adzuna categories error: %s", e)
+            return {'results': []}
+
+    async def get_salary_data(self, job_title="software developer", location="us"):
+        """Get salary information for a job title"""
+        cache_key = self.cache.key('salary', job_title, location)
+
+        try:
+            url, params = self._salary_request(job_title, location)
+
+            return await self.cache.afetch_once(
+                cache_key, partial(self._aget_json, url, params), 86400,  # 24 hours
+                default={},
+            )
+        except Exception as e:
+            logger.warning("Adzuna salary error: %s", e)
+            return {}
+
+    async def extract_skills_from_jobs(self, job_title="developer", location="us", max_pages=3):
+        """Extract common skills from job descriptions, fetching all pages at once"""
+        pages = await self.fetch_pages(job_title, location, range(1, max_pages + 1))
+        # Building the extractor may read the Skill table
+        extractor = await sync_to_async(get_skill_extractor)()
+        return self._count_skills(pages, extractor)
+
+    async def _build_market_trends(self, where):
+        categories = (await self.get_job_categories()).get('results', [])
+        pages = await asyncio.gather(*(
+            self.fetch_search_page(category.get('label', ''), where, 1)
+            for category in categories
+        ))
+        return self._trends_snapshot(categories, pages)
+
+    async def get_market_trends(self, where="us"):
+        """Job counts and mean salaries for every category, cached as one snapshot"""
+        return await self.cache.afetch_once(
+            self.cache.key('trends', where), partial(self._build_market_trends, where), 3600,
+            default={'trends': [], 'complete': False},
+            is_empty=lambda snapshot: not snapshot['complete'],
+        )
 
-# Singleton instance
-adzuna_service = AdzunaService()
\ No newline at end of file
+# Singleton instances
+adzuna_service = AdzunaService()
+async_adzuna_service = AsyncAdzunaService()
@@ -0,0 +1,199 @@
+from functools import partial, reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import CareerPath, CareerPathSkill, LearningResource, Skill
+from .adzuna_service import adzuna_service
+from .coursera_service import CourseraService
+from .fanout import Deadline, fan_out
+from .market_history import market_history_service
+from .recommendation_service import recommendation_service
+from .skill_extractor import skill_extractor_cache
+
+coursera_service = CourseraService()
+
+# Used for careers without enough recorded market history (record_market_snapshot)
+DEFAULT_FUTURE_GROWTH = 15
+
+
+class CareerImportService:
+    """
+    Create or refresh a CareerPath, its skills and learning resources from
+    market data.
+
+    External calls happen first; everything is then written in one
+    transaction with a fixed number of bulk queries, however many skills
+    and courses come back.
+    """
+
+    MAX_SKILLS = 10
+    SKILLS_WITH_COURSES = 5
+    COURSES_PER_SKILL = 3
+    RESOURCE_FIELDS = [
+        'description', 'resource_type', 'url', 'skill',
+        'difficulty', 'estimated_hours', 'free',
+    ]
+
+    # Stages reported to the ``progress`` callback of populate()
+    STAGES = ('fetching', 'saving')
+
+    def populate(self, career_title, progress=None):
+        """Fetch market data for career_title and store it; return a summary"""
+        progress = progress or (lambda stage: None)
+        progress('fetching')
+        market = self.fetch(career_title)
+        progress('saving')
+        return self.save(career_title, **market)
+
+    # -------------------------------------------------
+    # External I/O
+    # -------------------------------------------------
+    def fetch(self, career_title):
+        extracted_skills = adzuna_service.extract_skills_from_jobs(
+            job_title=career_title,
+            location='us',
+            max_pages=2
+        )
+        salary_data = adzuna_service.get_salary_data(career_title, 'us')
+
+        # Courses for the top skills, requested at once
+        top_skills = [name for name, _ in extracted_skills[:self.SKILLS_WITH_COURSES]]
+        courses, _ = fan_out(
+            {
+                name: partial(coursera_service.search_courses, name, self.COURSES_PER_SKILL)
+                for name in top_skills
+            },
+            Deadline(getattr(settings, 'EXTERNAL_API_DEADLINE', 15)),
+            defaults={name: [] for name in top_skills},
+        )
+
+        return {
+            'extracted_skills': extracted_skills[:self.MAX_SKILLS],
+            'salary_data': salary_data,
+            'courses': courses,
+        }
+
+    # -------------------------------------------------
+    # Database writes
+    # -------------------------------------------------
+    def save(self, career_title, extracted_skills, salary_data, courses):
+        growth = market_history_service.growth_rate('career', career_title)
+
+        with transaction.atomic():
+            career, _ = CareerPath.objects.update_or_create(
+                title=career_title,
+                defaults={
+                    'description': f"Career path for {career_title} based on market data",
+                    'average_salary': salary_data.get('median', 70000),
+                    'future_growth': growth if growth is not None else DEFAULT_FUTURE_GROWTH,
+                    'required_experience': '2-5 years'
+                }
+            )
+
+            skills, created_skills = self._resolve_skills(
+                [name for name, _ in extracted_skills], career_title
+            )
+
+            # Proficiency scaled from frequency to 3-5
+            links = {}
+            for name, frequency in extracted_skills:
+                proficiency = min(5, max(3, frequency // 10))
+                # Two spellings of one skill must not hit the same row twice
+                links.setdefault(skills[name].id, CareerPathSkill(
+                    career_path=career,
+                    skill=skills[name],
+                    proficiency_level=proficiency,
+                    is_core=proficiency >= 4,
+                ))
+            CareerPathSkill.objects.bulk_create(
+                list(links.values()),
+                update_conflicts=True,
+                unique_fields=['career_path', 'skill'],
+                update_fields=['proficiency_level', 'is_core'],
+            )
+
+            resources = self._save_resources(courses, skills)
+
+            # Bulk writes skip the post_save receivers in api.signals
+            recommendation_service.schedule_career_refresh(career.id)
+            if created_skills:
+                transaction.on_commit(skill_extractor_cache.invalidate)
+
+        return {
+            'career_id': career.id,
+            'skills_added': len(links),
+            'resources_added': resources,
+        }
+
+    def _resolve_skills(self, names, career_title):
+        """
+        Map extracted names to Skill rows, creating missing ones.
+
+        Matching is case-insensitive so 'machine learning' finds the seeded
+        'Machine Learning' rather than adding a 'Machine learning' twin.
+        """
+        if not names:
+            return {}, 0
+
+        def lookup():
+            query = reduce(or_, (Q(name__iexact=name) for name in names))
+            found = {skill.name.lower(): skill for skill in Skill.objects.filter(query)}
+            return {name: found[name.lower()] for name in names if name.lower() in found}
+
+        skills = lookup()
+        missing = [name for name in names if name not in skills]
+        if not missing:
+            return skills, 0
+
+        Skill.objects.bulk_create(
+            [
+                Skill(
+                    name=name.capitalize(),
+                    category='Technical',
+                    description=f"Skill extracted from {career_title} job market",
+                )
+                for name in missing
+            ],
+            # Never overwrite a curated skill; a concurrent import may also
+            # have created the same one
+            ignore_conflicts=True,
+        )
+        return lookup(), len(missing)
+
+    def _save_resources(self, courses, skills):
+        """Upsert courses by title; LearningResource.title is not unique, so no ON CONFLICT"""
+        rows = {}
+        for name, skill_courses in courses.items():
+            for course in skill_courses:
+                rows[course['name']] = LearningResource(
+                    title=course['name'],
+                    description=course.get('description') or '',
+                    resource_type='course',
+                    url=course['link'],
+                    skill=skills[name],
+                    difficulty='beginner',
+                    estimated_hours=20,
+                    free=course.get('free', True),
+                )
+        if not rows:
+            return 0
+
+        # Every existing row with a matching title is refreshed, one UPDATE per batch
+        existing = list(LearningResource.objects.filter(title__in=list(rows)))
+        for resource in existing:
+            fresh = rows[resource.title]
+            for field in self.RESOURCE_FIELDS:
+                setattr(resource, field, getattr(fresh, field))
+        LearningResource.objects.bulk_update(existing, self.RESOURCE_FIELDS)
+
+        found = {resource.title for resource in existing}
+        LearningResource.objects.bulk_create(
+            [resource for title, resource in rows.items() if title not in found]
+        )
+        return len(rows)
+
+
+career_import_service = CareerImportService()
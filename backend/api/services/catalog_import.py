@@ -0,0 +1,299 @@
+import csv
+import gzip
+import json
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.functions import Lower
+
+from ..models import CareerPath, CareerPathSkill, InterviewQuestion, LearningResource, Skill
+from .recommendation_service import recommendation_service
+from .skill_extractor import skill_extractor_cache
+
+
+# -------------------------------------------------
+# Streaming readers
+# -------------------------------------------------
+def open_text(path):
+    path = Path(path)
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def detect_format(path):
+    suffixes = [s for s in Path(path).suffixes if s != '.gz']
+    suffix = suffixes[-1] if suffixes else ''
+    if suffix == '.csv':
+        return 'csv'
+    if suffix in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Cannot tell the format of {path}; pass csv or jsonl")
+
+
+def iter_rows(f, fmt):
+    """Yield (line number, dict or error message) one row at a time"""
+    if fmt == 'csv':
+        reader = csv.DictReader(f)
+        for row in reader:
+            row.pop(None, None)  # values beyond the header
+            yield reader.line_num, row
+        return
+
+    for line_num, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, f"invalid JSON: {e.msg}"
+            continue
+        yield line_num, row if isinstance(row, dict) else "expected a JSON object"
+
+
+# -------------------------------------------------
+# What each kind of row becomes
+# -------------------------------------------------
+class CatalogKind:
+    """
+    How rows of one kind map onto a model.
+
+    ``fields`` are copied from the row and validated by the model fields
+    themselves; ``references`` name a CareerPath or Skill by title/name.
+    Rows are written with ON CONFLICT upserts when the model has a unique
+    key (``unique_fields``), otherwise rows already stored under ``key`` are
+    skipped so a file can be imported again.
+    """
+
+    def __init__(self, model, fields, references=(), key=(), unique_fields=()):
+        self.model = model
+        self.fields = fields
+        self.references = dict(references)
+        self.key = key or unique_fields
+        self.unique_fields = unique_fields
+
+    @property
+    def update_fields(self):
+        return [field for field in self.fields if field not in self.unique_fields]
+
+
+KINDS = {
+    'skills': CatalogKind(
+        Skill, ['name', 'category', 'description'],
+        unique_fields=['name'],
+    ),
+    'careers': CatalogKind(
+        CareerPath, ['title', 'description', 'average_salary', 'future_growth', 'required_experience'],
+        unique_fields=['title'],
+    ),
+    'career_skills': CatalogKind(
+        CareerPathSkill, ['proficiency_level', 'is_core'],
+        references={'career_path': 'career', 'skill': 'skill'},
+        unique_fields=['career_path', 'skill'],
+    ),
+    'resources': CatalogKind(
+        LearningResource,
+        ['title', 'description', 'resource_type', 'url', 'difficulty', 'estimated_hours', 'free'],
+        references={'skill': 'skill'},
+        key=['title', 'url'],
+    ),
+    'questions': CatalogKind(
+        InterviewQuestion, ['question', 'question_type', 'sample_answer', 'tips', 'difficulty'],
+        references={'career_path': 'career'},
+        key=['career_path', 'question'],
+    ),
+}
+
+# Spreadsheet spellings of booleans; BooleanField itself only takes True/1/t
+BOOLEANS = {'true': True, 'yes': True, 'y': True, '1': True, 'false': False, 'no': False, 'n': False, '0': False}
+
+# Row column naming each referenced model, and the field it is looked up by
+REFERENCE_LOOKUPS = {
+    'career': (CareerPath, 'title'),
+    'skill': (Skill, 'name'),
+}
+
+
+class CatalogImporter:
+    """
+    Load one kind of catalog row from a CSV or JSONL file.
+
+    The file is read one row at a time and written ``batch_size`` rows per
+    transaction, so memory stays flat however long the file is. Invalid rows
+    are skipped and reported by line number.
+    """
+
+    # Referenced titles/names remembered between batches, per model
+    MAX_CACHED_REFERENCES = 50000
+
+    def __init__(self, kind, batch_size=2000, dry_run=False, max_errors=1000):
+        self.kind = KINDS[kind]
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.stats = {'read': 0, 'written': 0, 'skipped': 0, 'invalid': 0}
+        self.errors = []
+        # Careers whose required skills this import wrote
+        self.changed_careers = set()
+        self._references = {column: {} for column in REFERENCE_LOOKUPS}
+
+    def run(self, path, fmt=None, on_batch=None):
+        """Import path; on_batch(stats) is called after every batch"""
+        fmt = fmt or detect_format(path)
+        batch = []
+        with open_text(path) as f:
+            for line_num, row in iter_rows(f, fmt):
+                self.stats['read'] += 1
+                batch.append((line_num, row))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+                    if on_batch:
+                        on_batch(self.stats)
+            if batch:
+                self._import_batch(batch)
+                if on_batch:
+                    on_batch(self.stats)
+
+        if self.stats['written'] and not self.dry_run:
+            self._after_import()
+        return self.stats
+
+    # -------------------------------------------------
+    # Validation
+    # -------------------------------------------------
+    def _reject(self, line_num, message):
+        self.stats['invalid'] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_num, message))
+        else:
+            raise ValueError(
+                f"More than {self.max_errors} invalid rows; stopped at line {line_num}"
+            )
+
+    def _resolve_references(self, rows):
+        """Load ids for the careers/skills named in this batch, one query per model"""
+        for column, (model, field) in REFERENCE_LOOKUPS.items():
+            if column not in self.kind.references.values():
+                continue
+            cache = self._references[column]
+            wanted = {
+                str(row[column]).strip().lower()
+                for _, row in rows if isinstance(row, dict) and row.get(column)
+            } - cache.keys()
+            if not wanted:
+                continue
+            if len(cache) + len(wanted) > self.MAX_CACHED_REFERENCES:
+                cache.clear()
+            found = (
+                model.objects.annotate(key=Lower(field))
+                .filter(key__in=wanted)
+                .values_list('key', 'id')
+            )
+            cache.update({name: None for name in wanted})
+            cache.update(found)
+
+    def _build(self, line_num, row):
+        if isinstance(row, str):
+            self._reject(line_num, row)
+            return None
+
+        instance = self.kind.model()
+        for field in self.kind.fields:
+            value = row.get(field)
+            if isinstance(value, str):
+                value = value.strip()
+                if isinstance(self.kind.model._meta.get_field(field), models.BooleanField):
+                    value = BOOLEANS.get(value.lower(), value)
+            # Missing and blank values fall back to the model default, so
+            # required fields are reported as blank by clean_fields below
+            if value not in (None, ''):
+                setattr(instance, field, value)
+
+        for fk, column in self.kind.references.items():
+            name = str(row.get(column) or '').strip()
+            pk = self._references[column].get(name.lower())
+            if pk is None:
+                model = REFERENCE_LOOKUPS[column][0]
+                self._reject(line_num, f"{column}: unknown {model._meta.verbose_name} {name!r}")
+                return None
+            setattr(instance, f'{fk}_id', pk)
+
+        try:
+            # Field-level checks only: full_clean() would cost a query per row
+            instance.clean_fields(exclude=list(self.kind.references))
+        except ValidationError as e:
+            self._reject(line_num, '; '.join(
+                f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items()
+            ))
+            return None
+        return instance
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+    def _key(self, instance):
+        return tuple(
+            getattr(instance, f'{field}_id' if field in self.kind.references else field)
+            for field in self.kind.key
+        )
+
+    def _import_batch(self, batch):
+        self._resolve_references(batch)
+
+        # Last row wins when a key repeats within the batch; one statement
+        # cannot upsert the same row twice
+        instances = {}
+        for line_num, row in batch:
+            instance = self._build(line_num, row)
+            if instance is not None:
+                key = self._key(instance)
+                if key in instances:
+                    self.stats['skipped'] += 1
+                instances[key] = instance
+        if not instances:
+            return
+
+        if not self.kind.unique_fields:
+            for key in self._existing_keys(instances):
+                del instances[key]
+                self.stats['skipped'] += 1
+
+        if not self.dry_run and instances:
+            with transaction.atomic():
+                self._write(list(instances.values()))
+            if self.kind.model is CareerPathSkill:
+                self.changed_careers.update(instance.career_path_id for instance in instances.values())
+        self.stats['written'] += len(instances)
+
+    def _existing_keys(self, instances):
+        """Keys of this batch already stored, for models without a unique constraint"""
+        lookups = [
+            f'{field}_id' if field in self.kind.references else field for field in self.kind.key
+        ]
+        stored = self.kind.model.objects.filter(
+            **{f'{lookups[0]}__in': {key[0] for key in instances}}
+        ).values_list(*lookups)
+        return set(stored) & instances.keys()
+
+    def _write(self, instances):
+        if self.kind.unique_fields:
+            self.kind.model.objects.bulk_create(
+                instances,
+                update_conflicts=True,
+                unique_fields=self.kind.unique_fields,
+                update_fields=self.kind.update_fields,
+            )
+        else:
+            self.kind.model.objects.bulk_create(instances)
+
+    def _after_import(self):
+        # Bulk writes skip the receivers in api.signals
+        if self.kind.model is Skill:
+            skill_extractor_cache.invalidate()
+        if self.changed_careers:
+            # Queued once for all of them, re-scored off the import (CareerRescore)
+            with transaction.atomic():
+                for career_id in sorted(self.changed_careers):
+                    recommendation_service.schedule_career_refresh(career_id)
@@ -1,59 +1,117 @@
-import requests
 import json
+import logging
+from functools import partial
 from django.conf import settings
-from django.core.cache import cache
+from .http_client import get_async_client, get_session, get_timeout
+from .resilience import get_guard
+from .service_cache import coursera_cache
+
+logger = logging.getLogger(__name__)
 
 class CourseraService:
     BASE_URL = "https://api.coursera.org/api/courses.v1"
-    
+    PROVIDER = "coursera"
+    # Namespaced, versioned slice of the shared cache
+    cache = coursera_cache
+
+    @property
+    def session(self):
+        # Pooled keep-alive session with retry/backoff, shared per provider
+        return get_session(self.PROVIDER)
+
+    @property
+    def guard(self):
+        # Circuit breaker and rate limit shared by every worker
+        return get_guard(self.PROVIDER)
+
+    def _search_params(self, query, max_results):
+        return {
+            'q': 'search',
+            'query': query,
+            'limit': max_results,
+            'fields': 'description,primaryLanguages,specializations,partnerIds'
+        }
+
+    def _transform_courses(self, data):
+        courses = []
+        for course in data.get('elements', []):
+            courses.append({
+                'id': course.get('id'),
+                'name': course.get('name'),
+                'slug': course.get('slug'),
+                'description': course.get('description'),
+                'languages': course.get('primaryLanguages', []),
+                'link': f"https://www.coursera.org/learn/{course.get('slug')}",
+                'free': self._check_if_free(course)
+            })
+        return courses
+
+    def _fetch_courses(self, url, params):
+        response = self.guard.call(self.session.get, url, params=params, timeout=get_timeout())
+        data = response.json()
+
+        # Transform data
+        return self._transform_courses(data)
+
     def search_courses(self, query="python", max_results=10):
-        cache_key = f"coursera_{query}_{max_results}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
-        
+        cache_key = self.cache.key('courses', query, max_results)
+
         try:
             url = f"{self.BASE_URL}"
-            params = {
-                'q': 'search',
-                'query': query,
-                'limit': max_results,
-                'fields': 'description,primaryLanguages,specializations,partnerIds'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            # Transform data
-            courses = []
-            for course in data.get('elements', []):
-                courses.append({
-                    'id': course.get('id'),
-                    'name': course.get('name'),
-                    'slug': course.get('slug'),
-                    'description': course.get('description'),
-                    'languages': course.get('primaryLanguages', []),
-                    'link': f"https://www.coursera.org/learn/{course.get('slug')}",
-                    'free': self._check_if_free(course)
-                })
-            
-            cache.set(cache_key, courses, 86400)  # 24 hours
-            
-            return courses
+            params = self._search_params(query, max_results)
+
+            return self.cache.fetch_once(
+                cache_key, partial(self._fetch_courses, url, params), 86400,  # 24 hours
+                default=[],
+            )
         except Exception as e:
-            print(f"Coursera API error: {e}")
+            logger.warning("Coursera API error: %s", e)
             return []
-    
+
     def _check_if_free(self, course):
         # Simple check - many Coursera courses are free to audit
         return True
-    
+
     def get_course_details(self, course_id):
         try:
             url = f"{self.BASE_URL}/{course_id}"
-            response = requests.get(url, timeout=10)
+            response = self.guard.call(self.session.get, url, timeout=get_timeout())
+            return response.json()
+        except Exception as e:
+            logger.warning("Coursera details error: %s", e)
+            return {}
+
+
+class AsyncCourseraService(CourseraService):
+    """Same API as CourseraService, for async views, on the shared pooled client"""
+
+    async def _fetch_courses(self, url, params):
+        response = await self.guard.acall(get_async_client().get, url, params=params)
+        data = response.json()
+
+        # Transform data
+        return self._transform_courses(data)
+
+    async def search_courses(self, query="python", max_results=10):
+        cache_key = self.cache.key('courses', query, max_results)
+
+        try:
+            url = f"{self.BASE_URL}"
+            params = self._search_params(query, max_results)
+
+            return await self.cache.afetch_once(
+                cache_key, partial(self._fetch_courses, url, params), 86400,  # 24 hours
+                default=[],
+            )
+        except Exception as e:
+            logger.warning("Coursera API error: %s", e)
+            return []
+
+    async def get_course_details(self, course_id):
+        try:
+            url = f"{self.BASE_URL}/{course_id}"
+            response = await self.guard.acall(get_async_client().get, url)
             return response.json()
         except Exception as e:
-            print(f"Coursera details error: {e}")
-            return {}
\ No newline at end of file
+            logger.warning("Coursera details error: %s", e)
+            return {}
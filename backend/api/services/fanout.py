@@ -0,0 +1,56 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared by all requests so a slow provider never blocks a request past its
+# deadline waiting for a per-request pool to shut down
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'EXTERNAL_API_MAX_WORKERS', 16),
+    thread_name_prefix='external-api',
+)
+
+
+class Deadline:
+    """An absolute point in time that several waits share"""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+def fan_out(calls, deadline, defaults=None, executor=None):
+    """
+    Run ``{key: callable}`` concurrently and wait until ``deadline`` at most.
+
+    Returns ``(results, missing)``: results for every key, using
+    ``defaults[key]`` for calls that timed out or raised, and the list of those
+    keys so callers can report a partial response. Code that already runs on
+    the shared pool should pass its own ``executor`` so it never waits on
+    work queued behind itself.
+    """
+    defaults = defaults or {}
+    executor = executor or _executor
+    futures = {key: executor.submit(fn) for key, fn in calls.items()}
+    wait(futures.values(), timeout=deadline.remaining())
+
+    results = {}
+    missing = []
+    for key, future in futures.items():
+        if not future.done():
+            future.cancel()
+            logger.warning("External call %r missed its deadline", key)
+        elif future.exception() is not None:
+            logger.warning("External call %r failed: %s", key, future.exception())
+        else:
+            results[key] = future.result()
+            continue
+        results[key] = defaults.get(key)
+        missing.append(key)
+
+    return results, missing
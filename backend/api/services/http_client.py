@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Statuses worth retrying: rate limited or a transient server-side failure
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_timeout():
+    return getattr(settings, 'EXTERNAL_API_TIMEOUT', 10)
+
+
+class CappedRetry(Retry):
+    """
+    Retry that never waits longer than ``backoff_max`` between attempts.
+
+    A 429 asking for ``Retry-After: 120`` would otherwise park a pooled
+    fan-out worker long after the request's deadline has passed; with the cap
+    the waits of all retries together stay well inside it.
+    """
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.backoff_max)
+
+
+def _build_session():
+    retry = CappedRetry(
+        total=getattr(settings, 'EXTERNAL_API_RETRIES', 3),
+        backoff_factor=getattr(settings, 'EXTERNAL_API_BACKOFF', 0.5),
+        backoff_jitter=getattr(settings, 'EXTERNAL_API_BACKOFF_JITTER', 0.5),
+        backoff_max=getattr(settings, 'EXTERNAL_API_MAX_RETRY_WAIT', 2),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        # Hand the last 429/5xx response back instead of raising, as callers
+        # already handle error payloads
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=getattr(settings, 'EXTERNAL_API_POOL_SIZE', 10),
+        pool_block=True,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(provider):
+    """
+    Return the keep-alive Session for a provider (e.g. 'adzuna').
+
+    Each provider gets its own bounded connection pool, so repeated calls to the
+    same host reuse TCP/TLS connections and a slow provider cannot use up
+    another provider's connections.
+    """
+    session = _sessions.get(provider)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(provider)
+            if session is None:
+                session = _sessions[provider] = _build_session()
+    return session
+
+
+# One pooled client per event loop: httpx connections cannot be shared
+# across loops, but every request served by a loop can reuse them
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Return the shared AsyncClient for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=get_timeout(),
+            limits=httpx.Limits(
+                max_connections=getattr(settings, 'EXTERNAL_API_MAX_CONNECTIONS', 100),
+                max_keepalive_connections=getattr(settings, 'EXTERNAL_API_MAX_KEEPALIVE', 20),
+            ),
+        )
+        _async_clients[loop] = client
+
+    return client
+
@@ -0,0 +1,217 @@
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Avg, Count, F, Q, Value
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from ..models import CareerImportBatch, CareerImportJob
+from .career_import import career_import_service
+from .recommendation_service import recommendation_service
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING = CareerImportJob.QUEUED, CareerImportJob.RUNNING
+SUCCEEDED, FAILED = CareerImportJob.SUCCEEDED, CareerImportJob.FAILED
+
+
+class CareerImportQueue:
+    """
+    Database-backed queue of CareerImportJob rows.
+
+    A job is claimed with a conditional UPDATE (``status`` still queued), so
+    any number of worker threads and processes can poll the same table
+    without running a job twice, on SQLite as well as Postgres.
+    """
+
+    # Percent complete once each stage of CareerImportService.populate starts
+    STAGE_PROGRESS = {'claimed': 5, 'fetching': 10, 'saving': 70}
+    # Claims a job gets before a worker that keeps dying on it gives up
+    MAX_ATTEMPTS = 3
+
+    @property
+    def stale_after(self):
+        """Seconds without a heartbeat before a running job is taken back"""
+        return getattr(settings, 'CAREER_IMPORT_STALE_AFTER', 600)
+
+    # -------------------------------------------------
+    # Producers
+    # -------------------------------------------------
+    def enqueue(self, title, user=None):
+        """Queue title unless that career is already waiting; return (job, created)"""
+        title_key = Lower(Value(title))
+        while True:
+            active = (
+                CareerImportJob.objects.alias(key=Lower('title'))
+                .filter(key=title_key, status__in=CareerImportJob.ACTIVE)
+                .first()
+            )
+            if active:
+                return active, False
+            try:
+                with transaction.atomic():
+                    return CareerImportJob.objects.create(title=title, requested_by=user), True
+            except IntegrityError:
+                # Another request queued the same career since the check
+                # above; the unique constraint let only one through
+                continue
+
+    def enqueue_batch(self, titles, user=None):
+        """Queue several titles; return the batch and (job, created) per title"""
+        with transaction.atomic():
+            batch = CareerImportBatch.objects.create(requested_by=user)
+            jobs = [self.enqueue(title, user) for title in titles]
+            batch.jobs.add(*(job for job, _ in jobs))
+        return batch, jobs
+
+    def batch_summary(self, batch):
+        """Job counts per status and overall progress, from one query"""
+        counts = batch.jobs.aggregate(
+            total=Count('id'),
+            progress=Avg('progress'),
+            **{status: Count('id', filter=Q(status=status)) for status, _ in CareerImportJob.STATUS_CHOICES}
+        )
+        total = counts.pop('total')
+        progress = round(counts.pop('progress') or 0)
+
+        if counts[QUEUED] == total:
+            state = QUEUED
+        elif counts[QUEUED] or counts[RUNNING]:
+            state = RUNNING
+        elif counts[FAILED] == total:
+            state = FAILED
+        elif counts[FAILED]:
+            state = 'partial'
+        else:
+            state = SUCCEEDED
+        return {'status': state, 'progress': progress, 'total': total, 'counts': counts}
+
+    # -------------------------------------------------
+    # Workers
+    # -------------------------------------------------
+    def claim(self, worker):
+        """Mark the oldest queued job as running on worker and return it, or None"""
+        while True:
+            job_id = (
+                CareerImportJob.objects.filter(status=QUEUED)
+                .order_by('created_at', 'id')
+                .values_list('id', flat=True)
+                .first()
+            )
+            if job_id is None:
+                return None
+
+            now = timezone.now()
+            claimed = CareerImportJob.objects.filter(pk=job_id, status=QUEUED).update(
+                status=RUNNING,
+                worker=worker,
+                stage='claimed',
+                progress=self.STAGE_PROGRESS['claimed'],
+                attempts=F('attempts') + 1,
+                started_at=now,
+                heartbeat_at=now,
+            )
+            if claimed:
+                return CareerImportJob.objects.get(pk=job_id)
+            # Another worker got there first; try the next one
+
+    def run(self, job):
+        """Populate job's career and record the outcome"""
+        mine = CareerImportJob.objects.filter(pk=job.pk, worker=job.worker, status=RUNNING)
+
+        def progress(stage):
+            mine.update(
+                stage=stage, progress=self.STAGE_PROGRESS[stage], heartbeat_at=timezone.now()
+            )
+
+        try:
+            result = career_import_service.populate(job.title, progress=progress)
+        except Exception as e:
+            logger.exception("Career import %s (%r) failed", job.pk, job.title)
+            outcome = {'status': FAILED, 'error': str(e)}
+        else:
+            outcome = {'status': SUCCEEDED, 'result': result, 'progress': 100}
+
+        # Does nothing if the job was taken back as stale meanwhile
+        mine.update(stage='', finished_at=timezone.now(), **outcome)
+
+    def requeue_stale(self):
+        """Take back jobs whose worker stopped reporting; return (requeued, failed)"""
+        now = timezone.now()
+        stale = CareerImportJob.objects.filter(
+            status=RUNNING, heartbeat_at__lt=now - timedelta(seconds=self.stale_after)
+        )
+        failed = stale.filter(attempts__gte=self.MAX_ATTEMPTS).update(
+            status=FAILED, error="Worker stopped responding", finished_at=now
+        )
+        requeued = stale.update(status=QUEUED, worker='', stage='', progress=0)
+        return requeued, failed
+
+    def refresh_recommendations(self):
+        """
+        Re-score the careers imports have changed; return how many.
+
+        A job's commit only queues its career (see CareerRescore), because
+        re-scoring every user can outlast CAREER_IMPORT_STALE_AFTER. It runs
+        here instead, between jobs, where no heartbeat is waiting on it.
+        """
+        try:
+            return recommendation_service.refresh_pending_careers()
+        except Exception:
+            logger.exception("Re-scoring changed careers failed")
+            return 0
+
+    def work(self, concurrency=1, poll_interval=2.0, stop_when_empty=False, stop=None):
+        """
+        Run jobs on ``concurrency`` threads until ``stop`` is set, or until
+        the queue is empty with ``stop_when_empty``. Returns jobs run.
+        """
+        stop = stop or threading.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        def loop(n):
+            worker = f"{prefix}:{n}"
+            done = 0
+            while not stop.is_set():
+                if n == 0:
+                    self.refresh_recommendations()
+                job = self.claim(worker)
+                if job is not None:
+                    self.run(job)
+                    done += 1
+                elif stop_when_empty:
+                    break
+                else:
+                    if n == 0:
+                        self.requeue_stale()
+                    stop.wait(poll_interval)
+            return done
+
+        def threaded_loop(n):
+            try:
+                return loop(n)
+            finally:
+                connection.close()
+
+        self.requeue_stale()
+        if concurrency == 1:
+            done = loop(0)
+        else:
+            with ThreadPoolExecutor(concurrency, thread_name_prefix='career-import') as pool:
+                try:
+                    done = sum(pool.map(threaded_loop, range(concurrency)))
+                finally:
+                    # On Ctrl-C, threads exit once their current job is done
+                    stop.set()
+        # Jobs other threads finished after the first one stopped
+        self.refresh_recommendations()
+        return done
+
+
+career_import_queue = CareerImportQueue()
@@ -0,0 +1,199 @@
+import json
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+
+from ..models import JobPosting, JobPostingSkill
+from .adzuna_service import adzuna_service
+from .skill_demand import skill_demand_service
+from .skill_extractor import get_skill_extractor
+
+logger = logging.getLogger(__name__)
+
+RECORDED_SEARCHES = Path(__file__).resolve().parent.parent / 'recorded' / 'adzuna_search.json'
+
+
+class AdzunaIngestionSource:
+    """
+    Live Adzuna search pages for bulk ingestion.
+
+    Pages are fetched one after another, each waiting up to
+    JOB_INGESTION_RATE_LIMIT_WAIT seconds for a rate limit token, so a long
+    run paces itself to the quota it shares with the request path instead
+    of having pages refused. The service cache is bypassed: a page that
+    fails comes back as None rather than being cached as empty.
+    """
+
+    def __init__(self, service=adzuna_service):
+        self.service = service
+
+    @property
+    def rate_limit_wait(self):
+        return getattr(settings, 'JOB_INGESTION_RATE_LIMIT_WAIT', 120)
+
+    def fetch_pages(self, what, where, pages):
+        results = []
+        for page in pages:
+            try:
+                data = self.service.download_search_page(what, where, page, self.rate_limit_wait)
+            except Exception as e:
+                logger.warning("Adzuna page %s for %r failed: %s", page, what, e)
+                data = None
+            results.append(data)
+            if data is not None and not data.get('results'):
+                # Past the last page; don't spend quota on the rest
+                results.extend({'results': []} for _ in pages[len(results):])
+                break
+        return results
+
+
+class RecordedAdzunaSource:
+    """Offline stand-in for AdzunaService.fetch_pages that replays recorded searches"""
+
+    def __init__(self, path=RECORDED_SEARCHES):
+        with open(path) as f:
+            searches = json.load(f)['searches']
+        self.searches = {what.lower(): pages for what, pages in searches.items()}
+
+    @property
+    def queries(self):
+        return list(self.searches)
+
+    def fetch_pages(self, what, where, pages):
+        recorded = self.searches.get(what.lower(), [])
+        return [
+            recorded[page - 1] if page <= len(recorded) else {'results': []}
+            for page in pages
+        ]
+
+
+def _display_name(job, field):
+    return (job.get(field) or {}).get('display_name') or ''
+
+
+def posting_from_adzuna(job, country):
+    """Build an unsaved JobPosting from one Adzuna search result"""
+    created = job.get('created')
+    return JobPosting(
+        adzuna_id=str(job['id']),
+        title=(job.get('title') or '')[:300],
+        company=_display_name(job, 'company')[:200],
+        description=job.get('description') or '',
+        country=country,
+        location=_display_name(job, 'location')[:200],
+        category=((job.get('category') or {}).get('label') or '')[:100],
+        salary_min=job.get('salary_min'),
+        salary_max=job.get('salary_max'),
+        redirect_url=(job.get('redirect_url') or '')[:500],
+        posted_at=parse_datetime(created) if created else None,
+    )
+
+
+class JobIngestionService:
+    """
+    Pull Adzuna search pages in bulk and store new postings.
+
+    Postings are deduplicated by Adzuna id, both within a run and against
+    the table; postings already stored are left as they are. Skills are
+    extracted once here and the SkillDemand aggregates updated in the same
+    transaction, so reads never scan descriptions.
+    """
+
+    def __init__(self, source=None):
+        self.source = source or AdzunaIngestionSource()
+
+    def fetch(self, queries, where='us', max_pages=5):
+        """Yield every query's search pages; a page that could not be fetched is None"""
+        pages = range(1, max_pages + 1)
+        for what in queries:
+            yield from self.source.fetch_pages(what, where, pages)
+
+    def ingest(self, queries, where='us', max_pages=5, batch_size=500):
+        """Fetch and store postings; return fetched/created/duplicate/failed page counts"""
+        postings = {}
+        fetched = failed_pages = 0
+        for page in self.fetch(queries, where, max_pages):
+            if page is None:
+                failed_pages += 1
+                continue
+            for job in page.get('results', []):
+                fetched += 1
+                if job.get('id'):
+                    postings.setdefault(str(job['id']), job)
+
+        adzuna_ids = list(postings)
+        created = 0
+        for start in range(0, len(adzuna_ids), batch_size):
+            batch = {
+                adzuna_id: postings[adzuna_id]
+                for adzuna_id in adzuna_ids[start:start + batch_size]
+            }
+            created += self._store_batch(batch, where)
+
+        return {
+            'fetched': fetched,
+            'created': created,
+            'duplicates': fetched - created,
+            'failed_pages': failed_pages,
+        }
+
+    def _store_batch(self, jobs, country):
+        extractor = get_skill_extractor()
+        skills = {}
+        stored = self._stored_ids(jobs)
+        while True:
+            jobs = {adzuna_id: job for adzuna_id, job in jobs.items() if adzuna_id not in stored}
+            if not jobs:
+                return 0
+
+            postings = [posting_from_adzuna(job, country) for job in jobs.values()]
+            for posting in postings:
+                if posting.adzuna_id not in skills:
+                    skills[posting.adzuna_id] = extractor.find(f"{posting.title} {posting.description}")
+
+            try:
+                with transaction.atomic():
+                    self._insert(postings, skills)
+            except IntegrityError:
+                stored = self._stored_ids(jobs)
+                if not stored:
+                    raise
+                # Another ingestion run stored some of these ids since they
+                # were checked; only the rest are new, and only they may be
+                # added to SkillDemand
+                continue
+            return len(postings)
+
+    @staticmethod
+    def _stored_ids(jobs):
+        return set(
+            JobPosting.objects.filter(adzuna_id__in=list(jobs))
+            .values_list('adzuna_id', flat=True)
+        )
+
+    def _insert(self, postings, skills):
+        JobPosting.objects.bulk_create(postings)
+        if any(posting.pk is None for posting in postings):
+            # Databases that cannot return primary keys from a bulk insert
+            posting_ids = dict(
+                JobPosting.objects.filter(adzuna_id__in=[posting.adzuna_id for posting in postings])
+                .values_list('adzuna_id', 'id')
+            )
+        else:
+            posting_ids = {posting.adzuna_id: posting.pk for posting in postings}
+
+        JobPostingSkill.objects.bulk_create(
+            JobPostingSkill(posting_id=posting_ids[posting.adzuna_id], skill=skill)
+            for posting in postings
+            for skill in skills[posting.adzuna_id]
+        )
+        skill_demand_service.apply(
+            (skills[posting.adzuna_id], posting.salary_mid, posting.location)
+            for posting in postings
+        )
+
+
+job_ingestion_service = JobIngestionService()
@@ -0,0 +1,203 @@
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from ..models import CareerPath, JobPosting, JobPostingSkill, MarketSnapshot, SkillDemand
+from .adzuna_service import adzuna_service
+from .search import job_title_index
+
+INTERVALS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+class MarketHistoryService:
+    """Append-only market snapshots and the trends computed from them"""
+
+    # Needed before a growth rate means anything
+    MIN_POINTS = 3
+    MIN_SPAN_DAYS = 14
+    # Keeps one noisy month from producing a 900% growth forecast
+    GROWTH_LIMITS = (-100.0, 300.0)
+
+    @property
+    def window_days(self):
+        """Local snapshots count the postings of the last this many days"""
+        return getattr(settings, 'MARKET_SNAPSHOT_WINDOW_DAYS', 30)
+
+    # -------------------------------------------------
+    # Recording
+    # -------------------------------------------------
+    def record(self, source='local', recorded_at=None):
+        """Append one snapshot per career path and per skill; return rows written"""
+        recorded_at = recorded_at or timezone.now()
+        titles = list(CareerPath.objects.order_by('id').values_list('title', flat=True))
+        if source == 'live':
+            careers = self._live_career_stats(titles)
+        else:
+            careers = self._local_career_stats(titles, recorded_at)
+
+        snapshots = [
+            MarketSnapshot(
+                subject_type='career', subject=title, recorded_at=recorded_at,
+                job_count=job_count, average_salary=average_salary, source=source,
+            )
+            for title, (job_count, average_salary) in careers.items()
+        ]
+        # Skill demand is always local; sampling it live would cost one call per skill
+        snapshots += [
+            MarketSnapshot(
+                subject_type='skill', subject=skill, recorded_at=recorded_at,
+                job_count=job_count,
+                average_salary=float(np.mean(salaries)) if salaries else None,
+                median_salary=float(np.median(salaries)) if salaries else None,
+                source='local',
+            )
+            for skill, (job_count, salaries) in self._local_skill_stats(recorded_at).items()
+        ]
+        MarketSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+        return len(snapshots)
+
+    def _window(self, recorded_at, prefix=''):
+        """
+        Q for postings advertised in the ``window_days`` up to recorded_at,
+        by ingestion time when a posting has no date. Postings are never
+        pruned, so counting all of them would only measure how much has
+        been ingested.
+        """
+        since = recorded_at - timedelta(days=self.window_days)
+        return Q(**{
+            f'{prefix}posted_at__gt': since, f'{prefix}posted_at__lte': recorded_at,
+        }) | Q(**{
+            f'{prefix}posted_at__isnull': True,
+            f'{prefix}ingested_at__gt': since, f'{prefix}ingested_at__lte': recorded_at,
+        })
+
+    def _local_career_stats(self, titles, recorded_at):
+        """Count recent postings per career title through the job title index"""
+        recent = JobPosting.objects.filter(self._window(recorded_at))
+        stats = {}
+        for title in titles:
+            row = job_title_index.filter(recent, title).aggregate(
+                count=Count('id'), salary=Avg(JobPosting.SALARY_MID)
+            )
+            stats[title] = (row['count'], row['salary'])
+        return stats
+
+    def _local_skill_stats(self, recorded_at):
+        """{skill: (recent postings, their salary midpoints)}, every known skill included"""
+        counts = dict.fromkeys(SkillDemand.objects.values_list('skill', flat=True), 0)
+        salaries = defaultdict(list)
+        rows = JobPostingSkill.objects.filter(self._window(recorded_at, 'posting__')).values_list(
+            'skill', 'posting__salary_min', 'posting__salary_max'
+        )
+        for skill, salary_min, salary_max in rows.iterator(chunk_size=2000):
+            counts[skill] = counts.get(skill, 0) + 1
+            if salary_min and salary_max:
+                salaries[skill].append((salary_min + salary_max) / 2)
+        return {skill: (count, salaries[skill]) for skill, count in counts.items()}
+
+    def _live_career_stats(self, titles):
+        pages = adzuna_service.fetch_pages_for(titles, 'us')
+        return {
+            title: (page.get('count', 0), page.get('mean'))
+            for title, page in zip(titles, pages)
+            # A failed search says nothing about the market; leave a gap
+            if 'count' in page
+        }
+
+    # -------------------------------------------------
+    # Range queries
+    # -------------------------------------------------
+    def _points(self, subject_type, subjects, start, end, interval):
+        snapshots = MarketSnapshot.objects.filter(subject_type=subject_type)
+        if subjects is not None:
+            snapshots = snapshots.filter(subject__in=subjects)
+        if start:
+            snapshots = snapshots.filter(recorded_at__gte=start)
+        if end:
+            snapshots = snapshots.filter(recorded_at__lt=end)
+
+        return (
+            snapshots.annotate(period=INTERVALS[interval]('recorded_at'))
+            .values('subject', 'period')
+            .annotate(
+                job_count=Avg('job_count'),
+                average_salary=Avg('average_salary'),
+                samples=Count('id'),
+            )
+            .order_by('subject', 'period')
+        )
+
+    def series(self, subject_type, subject, start=None, end=None, interval='day'):
+        """Snapshots for one subject averaged into day/week/month buckets"""
+        return [
+            {
+                'period': point['period'],
+                'job_count': round(point['job_count'], 1),
+                'average_salary': (
+                    round(point['average_salary'], 2)
+                    if point['average_salary'] is not None else None
+                ),
+                'samples': point['samples'],
+            }
+            for point in self._points(subject_type, [subject], start, end, interval)
+        ]
+
+    # -------------------------------------------------
+    # Growth
+    # -------------------------------------------------
+    def growth_rates(self, subject_type, subjects=None, days=365):
+        """
+        Annualised job-count growth in percent per subject, from one query.
+
+        Fits a straight line through weekly averages over the last ``days``
+        and divides the yearly slope by the mean count. Subjects with too
+        little history are left out.
+        """
+        series = defaultdict(list)
+        start = timezone.now() - timedelta(days=days)
+        for point in self._points(subject_type, subjects, start, None, 'week'):
+            series[point['subject']].append((point['period'], point['job_count']))
+
+        rates = {}
+        for subject, points in series.items():
+            rate = self._growth(points)
+            if rate is not None:
+                rates[subject] = rate
+        return rates
+
+    def growth_rate(self, subject_type, subject, days=365):
+        return self.growth_rates(subject_type, [subject], days).get(subject)
+
+    def _growth(self, points):
+        if len(points) < self.MIN_POINTS:
+            return None
+        first = points[0][0]
+        x = np.array([(period - first).days for period, _ in points], dtype=float)
+        y = np.array([count for _, count in points], dtype=float)
+        if x[-1] < self.MIN_SPAN_DAYS or y.mean() <= 0:
+            return None
+
+        slope = np.polyfit(x, y, 1)[0]
+        rate = slope * 365 / y.mean() * 100
+        return round(float(np.clip(rate, *self.GROWTH_LIMITS)), 1)
+
+    def update_future_growth(self, days=365):
+        """Set CareerPath.future_growth from recorded history; return careers updated"""
+        rates = self.growth_rates('career', days=days)
+        careers = list(CareerPath.objects.filter(title__in=list(rates)))
+        for career in careers:
+            career.future_growth = rates[career.title]
+        CareerPath.objects.bulk_update(careers, ['future_growth'])
+        return len(careers)
+
+
+market_history_service = MarketHistoryService()
@@ -0,0 +1,390 @@
+import threading
+import uuid
+from functools import partial, reduce
+from itertools import islice
+from operator import or_
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import CareerPath, CareerPathSkill, CareerRescore, Recommendation, UserSkill
+
+
+class CareerSkillMatrix:
+    """
+    Career x skill proficiency matrix built from CareerPathSkill.
+
+    A career only needs a handful of the catalog's skills, so the matrix is kept
+    in compressed-row form: the entries of career i live in
+    ``indptr[i]:indptr[i + 1]`` of ``skill_cols``, ``levels`` and ``core``.
+    """
+
+    def __init__(self, career_ids, skill_ids, skill_names, indptr, skill_cols, levels, core):
+        self.career_ids = career_ids
+        self.skill_ids = skill_ids
+        self.skill_names = skill_names
+        self.indptr = indptr
+        self.skill_cols = skill_cols
+        self.levels = levels
+        self.core = core
+        self.entry_rows = np.repeat(np.arange(len(career_ids)), np.diff(indptr))
+        self.skill_index = {sid: j for j, sid in enumerate(skill_ids.tolist())}
+
+    @classmethod
+    def load(cls):
+        """Load every CareerPathSkill row with a single query"""
+        rows = list(
+            CareerPathSkill.objects.order_by('career_path_id', 'skill_id').values_list(
+                'career_path_id', 'skill_id', 'skill__name',
+                'proficiency_level', 'is_core'
+            )
+        )
+
+        skill_names_by_id = {row[1]: row[2] for row in rows}
+        skill_ids = sorted(skill_names_by_id)
+        skill_index = {sid: j for j, sid in enumerate(skill_ids)}
+
+        row_careers = np.array([row[0] for row in rows], dtype=np.int64)
+        career_ids, counts = np.unique(row_careers, return_counts=True)
+        indptr = np.zeros(len(career_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        return cls(
+            career_ids,
+            np.array(skill_ids, dtype=np.int64),
+            [skill_names_by_id[sid] for sid in skill_ids],
+            indptr,
+            np.array([skill_index[row[1]] for row in rows], dtype=np.int64),
+            np.array([row[3] for row in rows], dtype=np.float32),
+            np.array([row[4] for row in rows], dtype=bool),
+        )
+
+    @property
+    def shape(self):
+        return len(self.career_ids), len(self.skill_ids)
+
+    def subset(self, career_ids):
+        """Return a smaller matrix holding only the given careers and their skills"""
+        rows = np.flatnonzero(np.isin(self.career_ids, list(career_ids)))
+        counts = np.diff(self.indptr)[rows]
+        entries = np.concatenate(
+            [np.arange(self.indptr[r], self.indptr[r + 1]) for r in rows]
+            or [np.zeros(0, dtype=np.int64)]
+        )
+        used_cols, skill_cols = np.unique(self.skill_cols[entries], return_inverse=True)
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        return CareerSkillMatrix(
+            self.career_ids[rows],
+            self.skill_ids[used_cols],
+            [self.skill_names[c] for c in used_cols.tolist()],
+            indptr,
+            skill_cols.astype(np.int64),
+            self.levels[entries],
+            self.core[entries],
+        )
+
+
+class RecommendationService:
+    """Score users against every career path and store Recommendation rows"""
+
+    # Core skills count double towards the match percentage
+    CORE_WEIGHT = 2.0
+    # Shared across processes so every worker notices CareerPathSkill changes
+    MATRIX_VERSION_KEY = "recommendation_matrix_version"
+
+    def __init__(self):
+        self._matrix = None
+        self._matrix_version = None
+        self._lock = threading.Lock()
+        # {connection alias: PendingRefresh} of the transactions open on this thread
+        self._local = threading.local()
+
+    def get_matrix(self):
+        """Return the process-wide career x skill matrix, loading it on first use"""
+        version = cache.get(self.MATRIX_VERSION_KEY)
+        matrix = self._matrix
+        if matrix is None or self._matrix_version != version:
+            with self._lock:
+                if self._matrix is None or self._matrix_version != version:
+                    self._matrix = CareerSkillMatrix.load()
+                    self._matrix_version = version
+                matrix = self._matrix
+        return matrix
+
+    def invalidate(self):
+        """Drop the cached matrix in every process so the next call reloads it"""
+        with self._lock:
+            self._matrix = None
+            cache.set(self.MATRIX_VERSION_KEY, uuid.uuid4().hex, None)
+
+    def iter_user_chunks(self, chunk_size=200):
+        """Stream all user ids in lists of at most chunk_size"""
+        user_ids = (
+            User.objects.order_by("pk")
+            .values_list("pk", flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
+        while True:
+            chunk = list(islice(user_ids, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def user_matrix(self, user_ids, matrix=None):
+        """Build a users x skills proficiency matrix with one UserSkill query"""
+        matrix = matrix or self.get_matrix()
+        user_ids = list(user_ids)
+        row_index = {uid: i for i, uid in enumerate(user_ids)}
+        levels = np.zeros((len(user_ids), matrix.shape[1]), dtype=np.float32)
+
+        if not user_ids or not matrix.shape[1]:
+            return levels
+
+        rows = UserSkill.objects.filter(
+            user_id__in=user_ids, skill_id__in=matrix.skill_ids.tolist()
+        ).values_list('user_id', 'skill_id', 'proficiency_level')
+
+        for user_id, skill_id, level in rows:
+            levels[row_index[user_id], matrix.skill_index[skill_id]] = level
+
+        return levels
+
+    def score(self, levels, matrix=None):
+        """
+        Return a users x careers array of match percentages.
+
+        A career's match is the weighted share of its required proficiency the
+        user covers: sum(w * min(user, required)) / sum(w * required).
+        """
+        matrix = matrix or self.get_matrix()
+        levels = np.atleast_2d(levels)
+        if not matrix.shape[0]:
+            return np.zeros((levels.shape[0], 0))
+
+        weights = np.where(matrix.core, self.CORE_WEIGHT, 1.0).astype(np.float32)
+        covered = np.minimum(levels[:, matrix.skill_cols], matrix.levels) * weights
+        covered = np.add.reduceat(covered, matrix.indptr[:-1], axis=1)
+        total = np.add.reduceat(matrix.levels * weights, matrix.indptr[:-1])
+
+        return np.round((covered / total * 100).astype(np.float64), 2)
+
+    @staticmethod
+    def top_k(scores, k):
+        """Indices of the k highest scores, best first, without sorting the rest"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        best = np.argpartition(-scores, k - 1)[:k]
+        # Ties keep a stable order by position
+        return best[np.lexsort((best, -scores[best]))]
+
+    def top_careers(self, user_id, k=10):
+        """Return [(career_id, match_percentage)] for a user's k best careers"""
+        matrix = self.get_matrix()
+        levels = self.user_matrix([user_id], matrix)
+        match = self.score(levels, matrix)[0]
+        best = self.top_k(match, k)
+        return list(zip(matrix.career_ids[best].tolist(), match[best].tolist()))
+
+    def skill_gaps(self, user_levels, matrix=None):
+        """Return one list of missing/under-level skills per career for a single user"""
+        matrix = matrix or self.get_matrix()
+        current = user_levels[matrix.skill_cols]
+        entries = np.flatnonzero(current < matrix.levels)
+
+        # Core gaps first, then the largest shortfall, within each career
+        order = np.lexsort((
+            current[entries] - matrix.levels[entries],
+            ~matrix.core[entries],
+            matrix.entry_rows[entries],
+        ))
+        entries = entries[order]
+
+        gaps = [[] for _ in range(matrix.shape[0])]
+        skill_cols = matrix.skill_cols[entries].tolist()
+        for career, col, required, have, is_core in zip(
+            matrix.entry_rows[entries].tolist(),
+            skill_cols,
+            matrix.levels[entries].astype(int).tolist(),
+            current[entries].astype(int).tolist(),
+            matrix.core[entries].tolist(),
+        ):
+            gaps[career].append({
+                'skill_id': int(matrix.skill_ids[col]),
+                'skill': matrix.skill_names[col],
+                'required_level': required,
+                'current_level': have,
+                'is_core': is_core,
+            })
+        return gaps
+
+    def build_recommendations(self, user_ids, matrix=None):
+        """Score a batch of users and return unsaved Recommendation objects"""
+        matrix = matrix or self.get_matrix()
+        user_ids = list(user_ids)
+        levels = self.user_matrix(user_ids, matrix)
+        match = self.score(levels, matrix).tolist()
+        career_ids = matrix.career_ids.tolist()
+
+        recommendations = []
+        for row, user_id in enumerate(user_ids):
+            gaps = self.skill_gaps(levels[row], matrix)
+            for col, career_id in enumerate(career_ids):
+                recommendations.append(Recommendation(
+                    user_id=user_id,
+                    career_path_id=career_id,
+                    match_percentage=match[row][col],
+                    skill_gaps=gaps[col],
+                ))
+        return recommendations
+
+    def save_recommendations(self, user_ids, recommendations, matrix=None, batch_size=1000,
+                             prune=True):
+        """
+        Upsert recommendations for the given users.
+
+        With prune=True the matrix is taken to cover every career, and the users'
+        rows for careers missing from it are deleted.
+        """
+        matrix = matrix or self.get_matrix()
+        with transaction.atomic():
+            Recommendation.objects.bulk_create(
+                recommendations,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['user', 'career_path'],
+                update_fields=['match_percentage', 'skill_gaps', 'generated_at'],
+            )
+            if prune:
+                Recommendation.objects.filter(user_id__in=list(user_ids)).exclude(
+                    career_path_id__in=matrix.career_ids.tolist()
+                ).delete()
+
+    def refresh_users(self, user_ids, batch_size=1000):
+        """Recompute and store recommendations for the given users"""
+        matrix = self.get_matrix()
+        user_ids = list(user_ids)
+        recommendations = self.build_recommendations(user_ids, matrix)
+        self.save_recommendations(user_ids, recommendations, matrix, batch_size)
+        return recommendations
+
+    def refresh_user(self, user):
+        """Recompute and store recommendations for a single user"""
+        return self.refresh_users([user.pk])
+
+    def refresh_careers(self, career_ids, chunk_size=200, batch_size=1000):
+        """Re-score every user against just the given careers"""
+        career_ids = list(career_ids)
+        self.invalidate()
+        matrix = self.get_matrix().subset(career_ids)
+
+        # Careers left without any required skill are no longer recommended
+        Recommendation.objects.filter(career_path_id__in=career_ids).exclude(
+            career_path_id__in=matrix.career_ids.tolist()
+        ).delete()
+
+        if not matrix.shape[0]:
+            return
+
+        for chunk in self.iter_user_chunks(chunk_size):
+            recommendations = self.build_recommendations(chunk, matrix)
+            self.save_recommendations(chunk, recommendations, matrix, batch_size, prune=False)
+
+    def refresh_pending_careers(self, chunk_size=200, batch_size=1000):
+        """Re-score the careers queued by schedule_career_refresh; return how many"""
+        queued = list(CareerRescore.objects.values_list('career_path_id', 'requested_at'))
+        if not queued:
+            return 0
+
+        self.refresh_careers([career_id for career_id, _ in queued], chunk_size, batch_size)
+        # A career queued again meanwhile keeps its row for the next run
+        CareerRescore.objects.filter(reduce(or_, (
+            Q(career_path_id=career_id, requested_at=requested_at)
+            for career_id, requested_at in queued
+        ))).delete()
+        return len(queued)
+
+    # -------------------------------------------------
+    # Incremental refresh hooks (see api/signals.py)
+    # -------------------------------------------------
+    def schedule_user_refresh(self, user_id):
+        """Re-score one user once the current transaction commits"""
+        self._schedule('user_ids', user_id)
+
+    def schedule_career_refresh(self, career_id):
+        """Queue one career to be re-scored for all users once the current transaction commits"""
+        self._schedule('career_ids', career_id)
+
+    def _schedule(self, kind, pk):
+        """
+        Add pk to the PendingRefresh collecting this thread's changes on the
+        current connection, run when the transaction commits.
+
+        Every change registers the callback, so the refresh survives a rolled
+        back savepoint; the first one to run takes the batch and the rest find
+        nothing. A batch left by a rolled back transaction is picked up by the
+        next one, which at worst re-scores a few users needlessly.
+        """
+        alias = transaction.get_connection().alias
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = {}
+        pending = self._local.pending.get(alias)
+        if pending is None:
+            pending = self._local.pending[alias] = PendingRefresh(self)
+        getattr(pending, kind).add(pk)
+        transaction.on_commit(partial(self._run_pending, alias), using=alias)
+
+    def _run_pending(self, alias):
+        pending = self._local.pending.pop(alias, None)
+        if pending is not None:
+            pending.run()
+
+
+class PendingRefresh:
+    """
+    Users and careers changed by one transaction, handled together when it
+    commits: however many rows the transaction wrote, each user is re-scored
+    once and each career queued once.
+
+    Users are re-scored right away, which costs one user x careers matrix.
+    Careers need every user re-scored, so they are only marked in
+    CareerRescore and the matrix reloaded; the rows follow with
+    refresh_pending_careers().
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.user_ids = set()
+        self.career_ids = set()
+
+    def run(self):
+        if self.career_ids:
+            self.service.invalidate()
+            now = timezone.now()
+            CareerRescore.objects.bulk_create(
+                [
+                    CareerRescore(career_path_id=career_id, requested_at=now)
+                    for career_id in CareerPath.objects.filter(pk__in=self.career_ids)
+                    .values_list('pk', flat=True)
+                ],
+                update_conflicts=True,
+                unique_fields=['career_path'],
+                update_fields=['requested_at'],
+            )
+        if self.user_ids:
+            # Users may have been deleted, cascading to their UserSkill rows
+            user_ids = list(
+                User.objects.filter(pk__in=self.user_ids).order_by('pk').values_list('pk', flat=True)
+            )
+            if user_ids:
+                self.service.refresh_users(user_ids)
+
+
+# Singleton instance
+recommendation_service = RecommendationService()
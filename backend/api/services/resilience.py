@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+
+# Numeric form of the circuit state, for dashboards that only plot numbers
+STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class ProviderUnavailable(Exception):
+    """A provider call was refused locally, without touching the network"""
+
+
+class CircuitOpenError(ProviderUnavailable):
+    pass
+
+
+class RateLimitExceeded(ProviderUnavailable):
+    pass
+
+
+# Circuit state, failure counts and token buckets live in the shared cache.
+# They are exact fleet-wide only when its add() and incr() are atomic (Redis,
+# Memcached, the database cache). On the in-memory default they are exact but
+# kept per process, so each worker process gets its own breaker and quota.
+def _backend():
+    return caches[getattr(settings, 'SERVICE_CACHE_ALIAS', 'default')]
+
+
+def _incr(key, amount=1):
+    backend = _backend()
+    backend.add(key, 0, None)
+    try:
+        return backend.incr(key, amount)
+    except ValueError:
+        # Evicted between add() and incr()
+        backend.set(key, amount, None)
+        return amount
+
+
+def is_provider_failure(status_code):
+    """Rate limiting and server errors count against a provider; client errors do not"""
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one provider, kept in the shared cache so every
+    worker sees the same state (see the note on ``_backend``).
+
+    * closed: calls go through; consecutive failures are counted.
+    * open: after ``CIRCUIT_BREAKER_FAILURE_THRESHOLD`` failures in a row,
+      calls fail fast with CircuitOpenError for ``CIRCUIT_BREAKER_RESET_TIMEOUT``
+      seconds.
+    * half-open: after that, one worker gets to probe the provider; success
+      closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    @property
+    def failure_threshold(self):
+        return getattr(settings, 'CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5)
+
+    @property
+    def reset_timeout(self):
+        return getattr(settings, 'CIRCUIT_BREAKER_RESET_TIMEOUT', 30)
+
+    def _key(self, name):
+        return f"circuit:{self.provider}:{name}"
+
+    def state(self):
+        opened_at = _backend().get(self._key('opened_at'))
+        if opened_at is None:
+            return CLOSED
+        if time.time() - opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def before_call(self):
+        """Raise CircuitOpenError unless this caller may call the provider"""
+        state = self.state()
+        if state == CLOSED:
+            return
+        # The probe slot expires so a crashed prober cannot keep the circuit half-open
+        if state == HALF_OPEN and _backend().add(self._key('probe'), 1, self.reset_timeout):
+            return
+
+        _incr(self._key('rejected'))
+        raise CircuitOpenError(f"{self.provider} circuit is {state}")
+
+    def record_success(self):
+        backend = _backend()
+        if backend.get_many([self._key('failures'), self._key('opened_at')]):
+            backend.delete_many([
+                self._key('failures'), self._key('opened_at'), self._key('probe'),
+            ])
+            logger.info("%s circuit closed", self.provider)
+
+    def record_failure(self):
+        failures = _incr(self._key('failures'))
+        if failures >= self.failure_threshold:
+            # Also reached by a failed half-open probe, which reopens the circuit
+            backend = _backend()
+            backend.set(self._key('opened_at'), time.time(), None)
+            backend.delete(self._key('probe'))
+            _incr(self._key('opened'))
+            logger.warning(
+                "%s circuit opened after %d consecutive failures", self.provider, failures
+            )
+
+    def metrics(self):
+        backend = _backend()
+        state = self.state()
+        return {
+            'state': state,
+            'state_gauge': STATE_GAUGE[state],
+            'consecutive_failures': backend.get(self._key('failures'), 0),
+            'times_opened': backend.get(self._key('opened'), 0),
+            'rejected_calls': backend.get(self._key('rejected'), 0),
+        }
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every worker through the cache.
+
+    Holds up to ``burst`` tokens and refills at ``per_minute`` tokens a minute.
+    Updates take a short cache lock, which is cheap next to the API call it
+    guards. The lock is an ``add()``, so the limit holds fleet-wide only on a
+    shared backend where that is atomic; on the in-memory default every
+    process has its own bucket.
+    """
+
+    LOCK_TIMEOUT = 2
+    LOCK_RETRY = 0.01
+
+    def __init__(self, provider, per_minute, burst):
+        self.provider = provider
+        self.rate = per_minute / 60
+        self.burst = burst
+
+    def _key(self, name):
+        return f"ratelimit:{self.provider}:{name}"
+
+    def _take(self):
+        """Take a token; return 0 on success, else the seconds until one is available"""
+        backend = _backend()
+        lock_key = self._key('lock')
+        if not backend.add(lock_key, 1, self.LOCK_TIMEOUT):
+            return self.LOCK_RETRY
+
+        try:
+            now = time.time()
+            tokens, updated = backend.get(self._key('bucket'), (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+            backend.set(self._key('bucket'), (tokens - 1 if not wait else tokens, now), None)
+            return wait
+        finally:
+            backend.delete(lock_key)
+
+    def _give_up(self):
+        _incr(self._key('limited'))
+        return RateLimitExceeded(f"{self.provider} rate limit reached")
+
+    def acquire(self, max_wait):
+        """Take a token, waiting up to max_wait seconds for one"""
+        give_up_at = time.monotonic() + max_wait
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            if time.monotonic() + wait > give_up_at:
+                raise self._give_up()
+            time.sleep(wait)
+
+    async def aacquire(self, max_wait):
+        give_up_at = time.monotonic() + max_wait
+        while True:
+            wait = await sync_to_async(self._take, thread_sensitive=False)()
+            if not wait:
+                return
+            if time.monotonic() + wait > give_up_at:
+                raise self._give_up()
+            await asyncio.sleep(wait)
+
+    def metrics(self):
+        backend = _backend()
+        tokens, updated = backend.get(self._key('bucket'), (self.burst, time.time()))
+        return {
+            'tokens': round(min(self.burst, tokens + (time.time() - updated) * self.rate), 2),
+            'rate_limited_calls': backend.get(self._key('limited'), 0),
+        }
+
+
+class ProviderGuard:
+    """Circuit breaker plus optional rate limit around every HTTP call to one provider"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.breaker = CircuitBreaker(provider)
+
+    @property
+    def limiter(self):
+        limits = getattr(settings, 'EXTERNAL_API_RATE_LIMITS', {}).get(self.provider)
+        return TokenBucket(self.provider, **limits) if limits else None
+
+    @property
+    def max_wait(self):
+        return getattr(settings, 'EXTERNAL_API_RATE_LIMIT_WAIT', 1)
+
+    def _record(self, response=None, error=None):
+        status_code = getattr(response, 'status_code', 200)
+        if error is not None or is_provider_failure(status_code):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def call(self, request, *args, rate_limit_wait=None, **kwargs):
+        """
+        Run request(*args, **kwargs), e.g. session.get, unless the provider is
+        unavailable. Waits up to rate_limit_wait seconds for a rate limit
+        token, EXTERNAL_API_RATE_LIMIT_WAIT by default.
+        """
+        self.breaker.before_call()
+        limiter = self.limiter
+        if limiter is not None:
+            limiter.acquire(self.max_wait if rate_limit_wait is None else rate_limit_wait)
+
+        try:
+            response = request(*args, **kwargs)
+        except Exception as e:
+            self._record(error=e)
+            raise
+        self._record(response)
+        return response
+
+    async def acall(self, request, *args, **kwargs):
+        """Async ``call``: request is a coroutine function, e.g. AsyncClient.get"""
+        await sync_to_async(self.breaker.before_call, thread_sensitive=False)()
+        limiter = self.limiter
+        if limiter is not None:
+            await limiter.aacquire(self.max_wait)
+
+        try:
+            response = await request(*args, **kwargs)
+        except Exception as e:
+            await sync_to_async(self._record, thread_sensitive=False)(error=e)
+            raise
+        await sync_to_async(self._record, thread_sensitive=False)(response)
+        return response
+
+    def metrics(self):
+        limiter = self.limiter
+        return {
+            'provider': self.provider,
+            **self.breaker.metrics(),
+            **(limiter.metrics() if limiter is not None else {}),
+        }
+
+
+PROVIDERS = ('adzuna', 'coursera', 'youtube')
+_guards = {provider: ProviderGuard(provider) for provider in PROVIDERS}
+
+
+def get_guard(provider):
+    return _guards[provider]
+
+
+def provider_metrics():
+    """Breaker and rate limiter state for every provider"""
+    return [guard.metrics() for guard in _guards.values()]
@@ -0,0 +1,140 @@
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Q, When
+from django.db.models.expressions import RawSQL
+
+from ..models import JobPosting, LearningResource, Skill
+
+WORD = re.compile(r'\w+')
+# A one-letter prefix matches most of the catalog and ranks all of it
+MIN_PREFIX = 2
+
+
+def search_terms(query, limit=8):
+    """Lower-cased words of a user query; anything else is dropped, never parsed"""
+    return WORD.findall(query.lower())[:limit]
+
+
+class FullTextIndex:
+    """
+    Ranked, prefix-matching search over one model.
+
+    The index is an FTS5 table next to the model's table, keyed by row id
+    and kept current by the triggers in migration 0009. Other databases fall
+    back to ``icontains`` over ``fields``, unranked.
+    """
+
+    def __init__(self, model, table, bm25_weights, fields):
+        self.model = model
+        self.table = table
+        # Per FTS5 column, in table order; higher counts more
+        self.bm25_weights = bm25_weights
+        self.fields = fields
+
+    def search(self, queryset, query, limit=20):
+        """
+        The ``limit`` best matches for query among queryset, best first.
+
+        Every word must match; the last one also matches as a prefix (from
+        two letters on), so results show up while the user is still typing.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        if connection.vendor != 'sqlite':
+            return queryset.filter(self._icontains(terms))[:limit]
+
+        # Filters already on queryset (difficulty, free, ...) are checked for
+        # each match inside the ranked query, so LIMIT counts only rows that
+        # pass them
+        filters, params = '', []
+        if queryset.query.where:
+            candidate = queryset.order_by().filter(
+                pk=RawSQL(f'{self.table}.rowid', ())
+            ).values('pk')
+            sql, params = candidate.query.sql_with_params()
+            filters = f'AND EXISTS ({sql}) '
+
+        with connection.cursor() as cursor:
+            cursor.execute(self._sql(filters), [self._match(terms), *params, limit])
+            ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return queryset.none()
+
+        rank = Case(*(When(pk=pk, then=position) for position, pk in enumerate(ids)))
+        return queryset.filter(pk__in=ids).order_by(rank)
+
+    def filter(self, queryset, query):
+        """Every row of queryset matching query, unranked, for counts and aggregates"""
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        if connection.vendor != 'sqlite':
+            return queryset.filter(self._icontains(terms))
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', (self._match(terms),)
+        ))
+
+    def _icontains(self, terms):
+        return reduce(and_, (
+            reduce(or_, (Q(**{f'{field}__icontains': term}) for field in self.fields))
+            for term in terms
+        ))
+
+    # -------------------------------------------------
+    # SQLite FTS5
+    # -------------------------------------------------
+    @staticmethod
+    def _match(terms):
+        *words, last = terms
+        prefix = '*' if len(last) >= MIN_PREFIX else ''
+        return ' '.join([f'"{word}"' for word in words] + [f'"{last}"{prefix}'])
+
+    def _sql(self, filters):
+        table = self.table
+        weights = ', '.join(str(weight) for weight in self.bm25_weights)
+        return (
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s {filters}'
+            f'ORDER BY bm25({table}, {weights}), rowid LIMIT %s'
+        )
+
+    # -------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------
+    def rebuild(self):
+        """Re-index every row, e.g. after restoring a dump taken without the index tables"""
+        if connection.vendor != 'sqlite':
+            return 0
+
+        field = self.fields[0]
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {self.table}')
+            # A no-op UPDATE fires the triggers, which index each row again
+            return self.model.objects.update(**{field: F(field)})
+
+
+resource_index = FullTextIndex(
+    LearningResource,
+    table='api_learningresource_fts',
+    bm25_weights=(10.0, 5.0, 1.0),  # title, skill, description
+    fields=['title', 'skill__name', 'description'],
+)
+
+skill_index = FullTextIndex(
+    Skill,
+    table='api_skill_fts',
+    bm25_weights=(10.0, 5.0, 1.0),  # name, category, description
+    fields=['name', 'category', 'description'],
+)
+
+job_title_index = FullTextIndex(
+    JobPosting,
+    table='api_jobposting_fts',
+    bm25_weights=(1.0,),  # title
+    fields=['title'],
+)
@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Background refreshes of soft-expired entries
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cache-refresh')
+
+
+class ServiceCache:
+    """
+    Namespaced, versioned view of the shared cache for one external provider.
+
+    Keys look like ``<namespace>:<part>:<part>`` and are stored under the
+    provider's version from ``SERVICE_CACHE_VERSIONS``, so bumping a version
+    drops one provider's entries in every worker at once. Hits and misses are
+    counted locally and flushed to shared counters every few seconds.
+
+    ``fetch_once``/``afetch_once`` store results in an envelope with a soft and
+    a hard TTL:
+
+    * fresh (before the soft TTL): served from cache;
+    * stale (between soft and hard TTL): served from cache at once while one
+      background refresh fetches a new value;
+    * missing: one caller per key fetches, the others wait for its result.
+
+    Within a process that single-flight is exact. Across processes it relies
+    on a shared backend whose ``add()`` is atomic, as it is for Redis,
+    Memcached and the database cache; on the in-memory default every process
+    fetches and caches for itself.
+
+    Empty results and errors are cached too, for ``SERVICE_CACHE_NEGATIVE_TTL``
+    seconds only, so a query with no results or a provider outage costs one
+    call per minute instead of one per request.
+    """
+
+    STATS_FLUSH_INTERVAL = 10  # seconds
+    STATS = ('hits', 'stale', 'misses')
+    # How long one worker may hold a key's fetch before others give up waiting
+    LOCK_TIMEOUT = 15
+    LOCK_POLL_INTERVAL = 0.05
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._pending = dict.fromkeys(self.STATS, 0)
+        self._last_flush = time.monotonic()
+        self._inflight = {}
+        self._refreshing = set()
+        self._async_inflight = weakref.WeakKeyDictionary()
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'SERVICE_CACHE_ALIAS', 'default')]
+
+    @property
+    def version(self):
+        return getattr(settings, 'SERVICE_CACHE_VERSIONS', {}).get(self.namespace, 1)
+
+    @property
+    def negative_ttl(self):
+        return getattr(settings, 'SERVICE_CACHE_NEGATIVE_TTL', 60)
+
+    @property
+    def stale_factor(self):
+        return getattr(settings, 'SERVICE_CACHE_STALE_FACTOR', 4)
+
+    def key(self, *parts):
+        """Build a key from raw parts; quoting keeps spaces out of backend keys"""
+        return ':'.join([self.namespace, *(quote(str(part), safe='') for part in parts)])
+
+    def get(self, key, default=None):
+        value = self.backend.get(key, default, version=self.version)
+        self._record('misses' if value is default else 'hits')
+        return value
+
+    def set(self, key, value, timeout):
+        self.backend.set(key, value, timeout, version=self.version)
+
+    def delete(self, key):
+        self.backend.delete(key, version=self.version)
+
+    async def aget(self, key, default=None):
+        value = await self.backend.aget(key, default, version=self.version)
+        self._record('misses' if value is default else 'hits')
+        return value
+
+    async def aset(self, key, value, timeout):
+        await self.backend.aset(key, value, timeout, version=self.version)
+
+    # -------------------------------------------------
+    # Envelopes with soft/hard TTLs
+    # -------------------------------------------------
+    def _envelope(self, value, timeout, is_empty):
+        """Wrap a fetched value; return (envelope, hard TTL)"""
+        soft_ttl = self.negative_ttl if is_empty(value) else timeout
+        hard_ttl = soft_ttl * self.stale_factor
+        now = time.time()
+        envelope = {'value': value, 'fresh_until': now + soft_ttl, 'stale_until': now + hard_ttl}
+        return envelope, hard_ttl
+
+    def _failure_envelope(self, current, default):
+        """
+        Entry to store after a failed fetch: a stale value keeps being served
+        until its hard TTL, otherwise ``default`` is cached as a negative entry.
+        Either way the next attempt waits ``negative_ttl`` seconds.
+        """
+        now = time.time()
+        if current is None:
+            hard_ttl = self.negative_ttl * self.stale_factor
+            value = default
+        else:
+            hard_ttl = max(current['stale_until'] - now, self.negative_ttl)
+            value = current['value']
+        envelope = {'value': value, 'fresh_until': now + self.negative_ttl, 'stale_until': now + hard_ttl}
+        return envelope, hard_ttl
+
+    def _store(self, key, value, timeout, is_empty):
+        envelope, hard_ttl = self._envelope(value, timeout, is_empty)
+        self.set(key, envelope, hard_ttl)
+
+    def _store_failure(self, key, default):
+        current = self.backend.get(key, version=self.version)
+        envelope, hard_ttl = self._failure_envelope(current, default)
+        self.set(key, envelope, hard_ttl)
+
+    @staticmethod
+    def _is_fresh(envelope):
+        return envelope['fresh_until'] > time.time()
+
+    # -------------------------------------------------
+    # Single-flight fetching
+    # -------------------------------------------------
+    def fetch_once(self, key, fetch, timeout, default=None, is_empty=None):
+        """
+        Return the cached value for key, calling ``fetch()`` when needed.
+
+        ``timeout`` is the soft TTL; entries are kept ``SERVICE_CACHE_STALE_FACTOR``
+        times longer for stale serving. Values matching ``is_empty`` (falsy by
+        default) only get the negative TTL. If ``fetch`` raises with nothing
+        cached, ``default`` is cached briefly and the exception is re-raised.
+        """
+        is_empty = is_empty or (lambda value: not value)
+        envelope = self.backend.get(key, version=self.version)
+
+        if envelope is not None:
+            if self._is_fresh(envelope):
+                self._record('hits')
+            else:
+                self._record('stale')
+                self._refresh_in_background(key, fetch, timeout, default, is_empty)
+            return envelope['value']
+
+        self._record('misses')
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = self._fetch_as_fleet_leader(key, fetch, timeout, default, is_empty)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        return value
+
+    def _fetch_as_fleet_leader(self, key, fetch, timeout, default, is_empty):
+        lock_key = f"{key}:lock"
+        owns_lock = self.backend.add(lock_key, 1, self.LOCK_TIMEOUT, version=self.version)
+
+        if owns_lock:
+            # The previous holder may have stored the value and released the
+            # lock between our cache miss and add()
+            envelope = self.backend.get(key, version=self.version)
+            if envelope is not None:
+                self.backend.delete(lock_key, version=self.version)
+                return envelope['value']
+        else:
+            # Another worker is fetching this key; wait for its result
+            give_up_at = time.monotonic() + self.LOCK_TIMEOUT
+            while time.monotonic() < give_up_at:
+                time.sleep(self.LOCK_POLL_INTERVAL)
+                envelope = self.backend.get(key, version=self.version)
+                if envelope is not None:
+                    return envelope['value']
+                if self.backend.get(lock_key, version=self.version) is None:
+                    break
+
+        try:
+            value = fetch()
+        except Exception:
+            self._store_failure(key, default)
+            raise
+        else:
+            self._store(key, value, timeout, is_empty)
+            return value
+        finally:
+            if owns_lock:
+                self.backend.delete(lock_key, version=self.version)
+
+    def _refresh_in_background(self, key, fetch, timeout, default, is_empty):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        lock_key = f"{key}:lock"
+        if not self.backend.add(lock_key, 1, self.LOCK_TIMEOUT, version=self.version):
+            # Another worker is already refreshing it
+            with self._lock:
+                self._refreshing.discard(key)
+            return
+
+        def refresh():
+            try:
+                self._store(key, fetch(), timeout, is_empty)
+            except Exception as e:
+                logger.warning("Background refresh of %s failed: %s", key, e)
+                self._store_failure(key, default)
+            finally:
+                self.backend.delete(lock_key, version=self.version)
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        _refresh_executor.submit(refresh)
+
+    async def afetch_once(self, key, fetch, timeout, default=None, is_empty=None):
+        """Async ``fetch_once``: ``fetch`` is a coroutine function, coalesced per event loop"""
+        is_empty = is_empty or (lambda value: not value)
+        envelope = await self.backend.aget(key, version=self.version)
+        loop = asyncio.get_running_loop()
+        inflight = self._async_inflight.setdefault(loop, {})
+
+        if envelope is not None:
+            if self._is_fresh(envelope):
+                self._record('hits')
+            else:
+                self._record('stale')
+                if key not in inflight:
+                    task = inflight[key] = loop.create_task(
+                        self._afetch_and_store(key, fetch, timeout, default, is_empty)
+                    )
+                    task.add_done_callback(lambda _: inflight.pop(key, None))
+                    # Failures are already stored as negative entries
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            return envelope['value']
+
+        self._record('misses')
+
+        task = inflight.get(key)
+        if task is None:
+            task = inflight[key] = loop.create_task(
+                self._afetch_and_store(key, fetch, timeout, default, is_empty)
+            )
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+
+        # A cancelled waiter must not cancel the fetch the others wait on
+        return await asyncio.shield(task)
+
+    async def _afetch_and_store(self, key, fetch, timeout, default, is_empty):
+        try:
+            value = await fetch()
+        except Exception:
+            current = await self.backend.aget(key, version=self.version)
+            envelope, hard_ttl = self._failure_envelope(current, default)
+            await self.aset(key, envelope, hard_ttl)
+            raise
+
+        envelope, hard_ttl = self._envelope(value, timeout, is_empty)
+        await self.aset(key, envelope, hard_ttl)
+        return value
+
+    # -------------------------------------------------
+    # Hit/miss counters
+    # -------------------------------------------------
+    def _stats_key(self, name):
+        return f"cache_stats:{self.namespace}:{name}"
+
+    def _record(self, outcome):
+        with self._lock:
+            self._pending[outcome] += 1
+            due = time.monotonic() - self._last_flush >= self.STATS_FLUSH_INTERVAL
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Add this process's counts to the shared counters"""
+        with self._lock:
+            pending, self._pending = self._pending, dict.fromkeys(self.STATS, 0)
+            self._last_flush = time.monotonic()
+
+        for name, count in pending.items():
+            if not count:
+                continue
+            key = self._stats_key(name)
+            self.backend.add(key, 0, None)
+            try:
+                self.backend.incr(key, count)
+            except ValueError:
+                # Evicted between add() and incr()
+                self.backend.set(key, count, None)
+
+    def stats(self):
+        """Fleet-wide hit/stale/miss totals for this namespace"""
+        self.flush_stats()
+        counts = {
+            name: self.backend.get(self._stats_key(name), 0) for name in self.STATS
+        }
+        lookups = sum(counts.values())
+        served = counts['hits'] + counts['stale']
+        return {
+            'namespace': self.namespace,
+            'version': self.version,
+            **counts,
+            'hit_rate': round(served / lookups, 4) if lookups else None,
+        }
+
+
+adzuna_cache = ServiceCache('adzuna')
+coursera_cache = ServiceCache('coursera')
+youtube_cache = ServiceCache('youtube')
+
+SERVICE_CACHES = [adzuna_cache, coursera_cache, youtube_cache]
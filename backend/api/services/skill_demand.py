@@ -0,0 +1,105 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import JobPosting, SkillDemand
+
+
+def histogram_percentile(histogram, fraction, bucket):
+    """Estimate a percentile from {bucket lower bound: count}, interpolating inside buckets"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    target = fraction * total
+    seen = 0
+    for lower, count in sorted((float(lower), count) for lower, count in histogram.items()):
+        if seen + count >= target:
+            return round(lower + bucket * (target - seen) / count, 2)
+        seen += count
+    return None
+
+
+class SkillDemandService:
+    """Keeps the SkillDemand table in step with the JobPosting store"""
+
+    PERCENTILES = (('salary_p25', 0.25), ('salary_median', 0.5), ('salary_p75', 0.75))
+
+    def apply(self, postings):
+        """
+        Add newly stored postings to the aggregates.
+
+        postings: iterable of (skills, salary midpoint or None, location).
+        Call inside the transaction that stored the postings.
+        """
+        deltas = defaultdict(lambda: {
+            'job_count': 0, 'salaries': [], 'locations': Counter(), 'related': Counter(),
+        })
+        for skills, salary, location in postings:
+            for skill in skills:
+                delta = deltas[skill]
+                delta['job_count'] += 1
+                if salary is not None:
+                    delta['salaries'].append(salary)
+                delta['locations'][location or 'Unknown'] += 1
+                delta['related'].update(other for other in skills if other != skill)
+
+        if not deltas:
+            return
+
+        with transaction.atomic():
+            # Create missing rows first, so the lock below covers every skill
+            # and two runs adding the same new skill cannot both insert it
+            SkillDemand.objects.bulk_create(
+                [SkillDemand(skill=skill) for skill in deltas], ignore_conflicts=True
+            )
+            rows = list(SkillDemand.objects.select_for_update().filter(skill__in=list(deltas)))
+            for row in rows:
+                self._merge(row, deltas[row.skill])
+
+            SkillDemand.objects.bulk_update(
+                rows,
+                [
+                    'job_count', 'salary_count', 'salary_total', 'salary_histogram',
+                    'locations', 'related_skills', 'updated_at',
+                    *(field for field, _ in self.PERCENTILES),
+                ],
+            )
+
+    def _merge(self, row, delta):
+        row.job_count += delta['job_count']
+        row.salary_count += len(delta['salaries'])
+        row.salary_total += sum(delta['salaries'])
+
+        # JSON keys are strings; keep them that way when merging
+        histogram = Counter(row.salary_histogram)
+        histogram.update(
+            str(int(salary // SkillDemand.SALARY_BUCKET * SkillDemand.SALARY_BUCKET))
+            for salary in delta['salaries']
+        )
+        row.salary_histogram = dict(histogram)
+        row.locations = dict(Counter(row.locations) + delta['locations'])
+        row.related_skills = dict(Counter(row.related_skills) + delta['related'])
+        row.updated_at = timezone.now()
+
+        for field, fraction in self.PERCENTILES:
+            setattr(row, field, histogram_percentile(histogram, fraction, SkillDemand.SALARY_BUCKET))
+
+    def rebuild(self, chunk_size=2000):
+        """Recompute every aggregate from the stored postings"""
+        with transaction.atomic():
+            SkillDemand.objects.all().delete()
+            postings = JobPosting.objects.order_by('id').prefetch_related('skills')
+            for start in range(0, postings.count(), chunk_size):
+                self.apply(
+                    (
+                        [row.skill for row in posting.skills.all()],
+                        posting.salary_mid,
+                        posting.location,
+                    )
+                    for posting in postings[start:start + chunk_size]
+                )
+
+
+skill_demand_service = SkillDemandService()
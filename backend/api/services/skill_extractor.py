@@ -0,0 +1,151 @@
+import re
+import threading
+import uuid
+from collections import Counter
+
+from django.core.cache import cache
+
+from ..models import Skill
+
+# Always recognised, even before the Skill table is seeded
+DEFAULT_SKILLS = [
+    'python', 'javascript', 'java', 'c++', 'react', 'angular',
+    'vue', 'node.js', 'django', 'flask', 'spring', 'sql',
+    'mongodb', 'aws', 'azure', 'docker', 'kubernetes', 'git',
+    'linux', 'machine learning', 'data science', 'ai'
+]
+
+# Other spellings found in job descriptions, keyed by canonical skill name
+SKILL_ALIASES = {
+    'javascript': ['js', 'ecmascript'],
+    'node.js': ['nodejs', 'node js'],
+    'c++': ['cpp'],
+    'kubernetes': ['k8s'],
+    'aws': ['amazon web services'],
+    'azure': ['microsoft azure'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'machine learning': ['ml'],
+    'ai': ['artificial intelligence'],
+    'postgresql': ['postgres'],
+    'react': ['react.js', 'reactjs'],
+    'vue': ['vue.js', 'vuejs'],
+    'angular': ['angularjs', 'angular.js'],
+}
+
+REQUIREMENT_KEYWORDS = [
+    'degree', 'bachelor', 'master', 'phd', 'experience',
+    'years', 'certification', 'certified', 'knowledge of',
+    'proficient in', 'strong understanding', 'familiar with'
+]
+
+# A term must not be glued to other word characters, so 'ai' does not match
+# 'maintain' and 'java' does not match 'javascript'. '+' and '#' count as word
+# characters after a term so 'c' never matches inside 'c++' or 'c#'.
+_BEFORE = r'(?<![\w+#])'
+_AFTER = r'(?![\w+#])'
+
+
+def _trie_pattern(node):
+    """Turn a character trie into a regex that shares common prefixes"""
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != ''
+    ]
+    if not branches:
+        return ''
+
+    ends_here = '' in node
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if ends_here else pattern
+
+
+class KeywordMatcher:
+    """
+    Find many keywords in text in a single pass.
+
+    All terms are compiled into one regex shaped like a trie, so each position
+    in the text is examined once regardless of how many terms there are.
+    """
+
+    def __init__(self, vocabulary):
+        # vocabulary: {canonical name: [aliases]}
+        self.canonical = {}
+        for name, aliases in vocabulary.items():
+            for term in [name, *aliases]:
+                term = ' '.join(term.lower().split())
+                if term:
+                    self.canonical.setdefault(term, name.lower())
+
+        trie = {}
+        for term in self.canonical:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        self.pattern = re.compile(_BEFORE + '(' + _trie_pattern(trie) + ')' + _AFTER) if trie else None
+
+    def find(self, text):
+        """Return the distinct canonical names mentioned in text, in order of appearance"""
+        if not text or self.pattern is None:
+            return []
+        text = ' '.join(text.lower().split())
+        found = {}
+        for match in self.pattern.finditer(text):
+            found.setdefault(self.canonical[match.group(1)], None)
+        return list(found)
+
+    def count(self, texts):
+        """Count how many texts mention each keyword"""
+        counts = Counter()
+        for text in texts:
+            counts.update(self.find(text))
+        return counts
+
+
+class SkillExtractorCache:
+    """Process-wide KeywordMatcher over the Skill table, rebuilt when skills change"""
+
+    VERSION_KEY = "skill_extractor_version"
+
+    def __init__(self):
+        self._matcher = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = cache.get(self.VERSION_KEY)
+        matcher = self._matcher
+        if matcher is None or self._version != version:
+            with self._lock:
+                if self._matcher is None or self._version != version:
+                    self._matcher = self.build()
+                    self._version = version
+                matcher = self._matcher
+        return matcher
+
+    def invalidate(self):
+        with self._lock:
+            self._matcher = None
+            cache.set(self.VERSION_KEY, uuid.uuid4().hex, None)
+
+    @staticmethod
+    def build():
+        vocabulary = {name: [] for name in DEFAULT_SKILLS}
+        for name in Skill.objects.values_list('name', flat=True):
+            vocabulary.setdefault(name.lower(), [])
+        for name, aliases in SKILL_ALIASES.items():
+            vocabulary.setdefault(name, []).extend(aliases)
+        return KeywordMatcher(vocabulary)
+
+
+skill_extractor_cache = SkillExtractorCache()
+requirement_matcher = KeywordMatcher({keyword: [] for keyword in REQUIREMENT_KEYWORDS})
+
+
+def get_skill_extractor():
+    return skill_extractor_cache.get()
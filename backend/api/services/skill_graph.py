@@ -0,0 +1,202 @@
+import os
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from scipy import sparse
+
+from ..models import CareerPathSkill, JobPostingSkill, Skill
+from .skill_extractor import get_skill_extractor
+
+
+class SkillGraph:
+    """
+    Sparse skill x skill co-occurrence matrix.
+
+    Entry (a, b) counts the job postings mentioning both skills plus
+    ``CAREER_WEIGHT`` for every career path requiring both; the diagonal holds
+    each skill's own count. Relatedness is the cosine of two skills'
+    occurrence vectors, ``C[a, b] / sqrt(C[a, a] * C[b, b])``, so popular
+    skills like git do not come out related to everything.
+    """
+
+    # One career path says more about which skills belong together than one ad
+    CAREER_WEIGHT = 5.0
+
+    def __init__(self, skills, matrix):
+        self.skills = list(skills)
+        self.index = {name: i for i, name in enumerate(self.skills)}
+        self.matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        self.matrix.sort_indices()
+        self.diagonal = self.matrix.diagonal()
+
+    def __len__(self):
+        return len(self.skills)
+
+    @classmethod
+    def build(cls):
+        canonical = get_skill_extractor().canonical
+
+        def name(skill):
+            skill = skill.lower()
+            return canonical.get(skill, skill)
+
+        posting_rows = list(JobPostingSkill.objects.values_list('posting_id', 'skill'))
+        career_rows = [
+            (career_id, name(skill))
+            for career_id, skill in CareerPathSkill.objects.values_list(
+                'career_path_id', 'skill__name'
+            )
+        ]
+
+        # Every catalog skill gets a row, related to something or not
+        skills = sorted(
+            {name(skill) for skill in Skill.objects.values_list('name', flat=True)}
+            | {skill for _, skill in posting_rows}
+            | {skill for _, skill in career_rows}
+        )
+        index = {skill: i for i, skill in enumerate(skills)}
+
+        matrix = sparse.csr_matrix((len(skills), len(skills)), dtype=np.float32)
+        for rows, weight in ((posting_rows, 1.0), (career_rows, cls.CAREER_WEIGHT)):
+            if rows:
+                matrix = matrix + weight * cls._cooccurrence(rows, index)
+        return cls(skills, matrix)
+
+    @staticmethod
+    def _cooccurrence(rows, index):
+        """(document, skill) pairs -> skill x skill counts, via incidence.T @ incidence"""
+        documents = {}
+        doc_ids = np.fromiter(
+            (documents.setdefault(doc, len(documents)) for doc, _ in rows), dtype=np.int64
+        )
+        skill_ids = np.fromiter((index[skill] for _, skill in rows), dtype=np.int64)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (doc_ids, skill_ids)),
+            shape=(len(documents), len(index)),
+        )
+        # Duplicate (document, skill) pairs must count once
+        incidence.data[:] = 1
+        return (incidence.T @ incidence).tocsr()
+
+    def save(self, path):
+        """Write atomically, so a process loading the file never sees half of it"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.npz')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez_compressed(
+                f,
+                skills=np.array(self.skills, dtype=str),
+                data=self.matrix.data,
+                indices=self.matrix.indices,
+                indptr=self.matrix.indptr,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            skills = f['skills'].tolist()
+            matrix = sparse.csr_matrix(
+                (f['data'], f['indices'], f['indptr']), shape=(len(skills), len(skills))
+            )
+        return cls(skills, matrix)
+
+    def _scores(self, i):
+        """Cosine relatedness of skill i to every skill it co-occurs with"""
+        start, end = self.matrix.indptr[i], self.matrix.indptr[i + 1]
+        cols = self.matrix.indices[start:end]
+        norms = np.sqrt(self.diagonal[i] * self.diagonal[cols])
+        return cols, np.divide(
+            self.matrix.data[start:end], norms, out=np.zeros(len(cols), np.float32), where=norms > 0
+        )
+
+    def _top(self, cols, scores, exclude, limit):
+        keep = ~np.isin(cols, list(exclude)) & (scores > 0)
+        cols, scores = cols[keep], scores[keep]
+        if len(cols) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            cols, scores = cols[best], scores[best]
+        order = np.lexsort((cols, -scores))
+        return [(self.skills[cols[i]], round(float(scores[i]), 3)) for i in order]
+
+    def related(self, skill, limit=10):
+        """Skills most often needed alongside skill, as (skill, score) pairs"""
+        i = self.index.get(skill)
+        if i is None:
+            return []
+        cols, scores = self._scores(i)
+        return self._top(cols, scores, {i}, limit)
+
+    def next_skills(self, known, limit=5):
+        """Skills most related to a set of known skills that are not known yet"""
+        known = {self.index[skill] for skill in known if skill in self.index}
+        if not known:
+            return []
+
+        totals = np.zeros(len(self.skills), dtype=np.float32)
+        for i in known:
+            cols, scores = self._scores(i)
+            totals[cols] += scores
+        cols = np.flatnonzero(totals)
+        return self._top(cols, totals[cols], known, limit)
+
+
+class SkillGraphCache:
+    """
+    Process-wide SkillGraph loaded from ``SKILL_GRAPH_PATH`` on first use.
+
+    ``rebuild()`` writes a new file and bumps a version in the shared cache,
+    so every process reloads it on its next query.
+    """
+
+    VERSION_KEY = "skill_graph_version"
+
+    def __init__(self):
+        self._graph = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return Path(settings.SKILL_GRAPH_PATH)
+
+    def get(self):
+        version = cache.get(self.VERSION_KEY)
+        graph = self._graph
+        if graph is None or self._version != version:
+            with self._lock:
+                if self._graph is None or self._version != version:
+                    self._graph = self._load()
+                    self._version = version
+                graph = self._graph
+        return graph
+
+    def _load(self):
+        if self.path.exists():
+            return SkillGraph.load(self.path)
+        # First use on this host: build and persist for the next process
+        graph = SkillGraph.build()
+        graph.save(self.path)
+        return graph
+
+    def rebuild(self):
+        graph = SkillGraph.build()
+        graph.save(self.path)
+        with self._lock:
+            self._graph = graph
+            self._version = uuid.uuid4().hex
+            cache.set(self.VERSION_KEY, self._version, None)
+        return graph
+
+
+skill_graph_cache = SkillGraphCache()
+
+
+def get_skill_graph():
+    return skill_graph_cache.get()
@@ -1,54 +1,102 @@
-import requests 
 import json
+import logging
+from functools import partial
 from django.conf import settings
-from django.core.cache import cache
+from .http_client import get_async_client, get_session, get_timeout
+from .resilience import get_guard
+from .service_cache import youtube_cache
+
+logger = logging.getLogger(__name__)
 
 class YouTubeService:
     BASE_URL = "https://www.googleapis.com/youtube/v3"
-    
+    PROVIDER = "youtube"
+    # Namespaced, versioned slice of the shared cache
+    cache = youtube_cache
+
+    @property
+    def session(self):
+        # Pooled keep-alive session with retry/backoff, shared per provider
+        return get_session(self.PROVIDER)
+
+    @property
+    def guard(self):
+        # Circuit breaker and rate limit shared by every worker
+        return get_guard(self.PROVIDER)
+
     def __init__(self):
         self.api_key = getattr(settings, 'YOUTUBE_API_KEY', '')
-    
+
+    def _search_params(self, query, max_results):
+        return {
+            'part': 'snippet',
+            'q': f"{query} tutorial",
+            'type': 'video',
+            'videoDuration': 'medium',  # Medium length videos (4-20 min)
+            'maxResults': max_results,
+            'key': self.api_key,
+            'relevanceLanguage': 'en'
+        }
+
+    def _transform_videos(self, data):
+        videos = []
+        for item in data.get('items', []):
+            video_id = item['id']['videoId']
+            videos.append({
+                'id': video_id,
+                'title': item['snippet']['title'],
+                'description': item['snippet']['description'],
+                'channel': item['snippet']['channelTitle'],
+                'published_at': item['snippet']['publishedAt'],
+                'thumbnail': item['snippet']['thumbnails']['high']['url'],
+                'url': f"https://www.youtube.com/watch?v={video_id}",
+                'duration': '10-30 minutes',  # You can get actual duration with videos.list
+                'free': True
+            })
+        return videos
+
+    def _fetch_videos(self, url, params):
+        response = self.guard.call(self.session.get, url, params=params, timeout=get_timeout())
+        data = response.json()
+
+        return self._transform_videos(data)
+
     def search_educational_content(self, query="python tutorial", max_results=10):
-        cache_key = f"youtube_{query}_{max_results}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
-        
+        cache_key = self.cache.key('videos', query, max_results)
+
         try:
             url = f"{self.BASE_URL}/search"
-            params = {
-                'part': 'snippet',
-                'q': f"{query} tutorial",
-                'type': 'video',
-                'videoDuration': 'medium',  # Medium length videos (4-20 min)
-                'maxResults': max_results,
-                'key': self.api_key,
-                'relevanceLanguage': 'en'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            videos = []
-            for item in data.get('items', []):
-                video_id = item['id']['videoId']
-                videos.append({
-                    'id': video_id,
-                    'title': item['snippet']['title'],
-                    'description': item['snippet']['description'],
-                    'channel': item['snippet']['channelTitle'],
-                    'published_at': item['snippet']['publishedAt'],
-                    'thumbnail': item['snippet']['thumbnails']['high']['url'],
-                    'url': f"https://www.youtube.com/watch?v={video_id}",
-                    'duration': '10-30 minutes',  # You can get actual duration with videos.list
-                    'free': True
-                })
-            
-            cache.set(cache_key, videos, 43200)  # 12 hours
-            
-            return videos
+            params = self._search_params(query, max_results)
+
+            return self.cache.fetch_once(
+                cache_key, partial(self._fetch_videos, url, params), 43200,  # 12 hours
+                default=[],
+            )
+        except Exception as e:
+            logger.warning("YouTube API error: %s", e)
+            return []
+
+
+class AsyncYouTubeService(YouTubeService):
+    """Same API as YouTubeService, for async views, on the shared pooled client"""
+
+    async def _fetch_videos(self, url, params):
+        response = await self.guard.acall(get_async_client().get, url, params=params)
+        data = response.json()
+
+        return self._transform_videos(data)
+
+    async def search_educational_content(self, query="python tutorial", max_results=10):
+        cache_key = self.cache.key('videos', query, max_results)
+
+        try:
+            url = f"{self.BASE_URL}/search"
+            params = self._search_params(query, max_results)
+
+            return await self.cache.afetch_once(
+                cache_key, partial(self._fetch_videos, url, params), 43200,  # 12 hours
+                default=[],
+            )
         except Exception as e:
-            print(f"YouTube API error: {e}")
-            return []
\ No newline at end of file
+            logger.warning("YouTube API error: %s", e)
+            return []
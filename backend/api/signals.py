@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CareerPathSkill, Skill, UserSkill
+from .services.recommendation_service import recommendation_service
+from .services.skill_extractor import skill_extractor_cache
+
+
+# -------------------------------------------------
+# Keep Recommendation rows in step with skill changes
+# -------------------------------------------------
+# Refreshes are batched per transaction: write many rows inside atomic() and
+# each user is re-scored once when it commits, not once per row. A career
+# change needs every user re-scored, so it is only queued when it commits;
+# run_import_worker or `recompute_recommendations --pending` writes the rows
+@receiver([post_save, post_delete], sender=UserSkill)
+def refresh_user_recommendations(sender, instance, **kwargs):
+    recommendation_service.schedule_user_refresh(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=CareerPathSkill)
+def refresh_career_recommendations(sender, instance, **kwargs):
+    recommendation_service.schedule_career_refresh(instance.career_path_id)
+
+
+# -------------------------------------------------
+# Rebuild the skill extractor when the vocabulary changes
+# -------------------------------------------------
+@receiver([post_save, post_delete], sender=Skill)
+def refresh_skill_extractor(sender, instance, **kwargs):
+    transaction.on_commit(skill_extractor_cache.invalidate)
@@ -1,3 +1,1542 @@
-from django.test import TestCase
+import asyncio
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import requests
+import urllib3
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import (
+    Skill,
+    CareerPath,
+    CareerPathSkill,
+    CareerRescore,
+    UserSkill,
+    LearningResource,
+    InterviewQuestion,
+    UserProgress,
+    Recommendation,
+    JobPosting,
+    JobPostingSkill,
+    SkillDemand,
+    MarketSnapshot,
+    CareerImportJob,
+)
+from .services.catalog_import import CatalogImporter
+from .services import http_client
+from .services.adzuna_service import AdzunaService, AsyncAdzunaService
+from .services.coursera_service import CourseraService
+from .services.job_ingestion import (
+    AdzunaIngestionSource, JobIngestionService, RecordedAdzunaSource,
+)
+from .services.skill_graph import SkillGraph, get_skill_graph
+from .services.market_history import market_history_service
+from .services.fanout import Deadline, fan_out
+from .services.import_queue import career_import_queue
+from .services.resilience import (
+    CircuitOpenError, ProviderGuard, RateLimitExceeded, TokenBucket, provider_metrics,
+)
+from .services.service_cache import ServiceCache
+from .services.recommendation_service import RecommendationService, recommendation_service
+from .services.skill_extractor import KeywordMatcher, SkillExtractorCache
+
+# Tests that clear or fill the cache get a private in-memory one, never the
+# Redis cache REDIS_URL may point at
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecommendationServiceTests(TestCase):
+    def setUp(self):
+        self.service = RecommendationService()
+        self.user = User.objects.create(username="alice")
+
+        self.python = Skill.objects.create(name="Python", category="programming")
+        self.sql = Skill.objects.create(name="SQL", category="databases")
+        self.react = Skill.objects.create(name="React", category="web_dev")
+
+        self.backend = CareerPath.objects.create(
+            title="Backend Developer", description="", future_growth=10,
+            required_experience="1-3 years",
+        )
+        self.frontend = CareerPath.objects.create(
+            title="Frontend Developer", description="", future_growth=10,
+            required_experience="1-3 years",
+        )
+        CareerPathSkill.objects.create(
+            career_path=self.backend, skill=self.python, proficiency_level=4, is_core=True
+        )
+        CareerPathSkill.objects.create(
+            career_path=self.backend, skill=self.sql, proficiency_level=2
+        )
+        CareerPathSkill.objects.create(
+            career_path=self.frontend, skill=self.react, proficiency_level=3, is_core=True
+        )
+
+        UserSkill.objects.create(user=self.user, skill=self.python, proficiency_level=2)
+        UserSkill.objects.create(user=self.user, skill=self.sql, proficiency_level=5)
+        recommendation_service.invalidate()
+
+    def test_refresh_user_scores_every_career(self):
+        self.service.refresh_user(self.user)
+
+        backend = Recommendation.objects.get(user=self.user, career_path=self.backend)
+        frontend = Recommendation.objects.get(user=self.user, career_path=self.frontend)
+
+        # Python covers 2 of 4 (core, weight 2), SQL covers 2 of 2: (4 + 2) / (8 + 2)
+        self.assertEqual(backend.match_percentage, 60.0)
+        self.assertEqual(frontend.match_percentage, 0.0)
+        self.assertEqual(
+            [gap['skill'] for gap in backend.skill_gaps], ["Python"]
+        )
+        self.assertEqual(backend.skill_gaps[0]['current_level'], 2)
+        self.assertEqual(frontend.skill_gaps[0]['required_level'], 3)
+
+    def test_refresh_user_updates_existing_rows(self):
+        self.service.refresh_user(self.user)
+        UserSkill.objects.filter(user=self.user, skill=self.python).update(proficiency_level=4)
+        self.service.refresh_user(self.user)
+
+        backend = Recommendation.objects.get(user=self.user, career_path=self.backend)
+        self.assertEqual(backend.match_percentage, 100.0)
+        self.assertEqual(backend.skill_gaps, [])
+        self.assertEqual(Recommendation.objects.filter(user=self.user).count(), 2)
+
+    def test_single_query_per_user_batch(self):
+        self.service.get_matrix()
+        with self.assertNumQueries(1):
+            levels = self.service.user_matrix([self.user.pk])
+            self.service.score(levels)
+
+    def test_recompute_command_covers_all_users(self):
+        bob = User.objects.create(username="bob")
+        UserSkill.objects.create(user=bob, skill=self.react, proficiency_level=3)
+
+        call_command("recompute_recommendations", chunk_size=1, stdout=StringIO())
+
+        self.assertEqual(Recommendation.objects.count(), 4)
+        frontend = Recommendation.objects.get(user=bob, career_path=self.frontend)
+        self.assertEqual(frontend.match_percentage, 100.0)
+
+    def test_user_skill_change_refreshes_that_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            UserSkill.objects.create(user=self.user, skill=self.react, proficiency_level=3)
+
+        frontend = Recommendation.objects.get(user=self.user, career_path=self.frontend)
+        self.assertEqual(frontend.match_percentage, 100.0)
+        self.assertEqual(frontend.skill_gaps, [])
+
+    def test_career_skill_change_refreshes_that_career(self):
+        bob = User.objects.create(username="bob")
+        # bulk_create skips the signals, so only the career change below is pending
+        UserSkill.objects.bulk_create([
+            UserSkill(user=bob, skill=self.python, proficiency_level=2),
+            UserSkill(user=bob, skill=self.sql, proficiency_level=5),
+        ])
+        recommendation_service.refresh_users([bob.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CareerPathSkill.objects.filter(career_path=self.frontend).delete()
+            CareerPathSkill.objects.filter(
+                career_path=self.backend, skill=self.python
+            ).update(proficiency_level=2)
+            CareerPathSkill.objects.get(career_path=self.backend, skill=self.sql).save()
+        # The commit only queues the career; re-scoring every user is left
+        # to recompute_recommendations --pending
+        backend = Recommendation.objects.get(user=bob, career_path=self.backend)
+        self.assertEqual(backend.match_percentage, 60.0)
+
+        call_command("recompute_recommendations", pending=True, stdout=StringIO())
+
+        self.assertFalse(
+            Recommendation.objects.filter(career_path=self.frontend).exists()
+        )
+        backend = Recommendation.objects.get(user=bob, career_path=self.backend)
+        self.assertEqual(backend.match_percentage, 100.0)
+        self.assertFalse(CareerRescore.objects.exists())
+
+    def test_career_skill_changes_are_queued_once_per_transaction(self):
+        with mock.patch.object(recommendation_service, 'refresh_careers') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                for career_skill in CareerPathSkill.objects.all():
+                    career_skill.save()
+            refresh.assert_not_called()
+
+            self.assertEqual(recommendation_service.refresh_pending_careers(), 2)
+
+        refresh.assert_called_once_with([self.backend.pk, self.frontend.pk], 200, 1000)
+
+    def test_user_skill_changes_refresh_once_per_transaction(self):
+        with mock.patch.object(recommendation_service, 'refresh_users') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                for user_skill in UserSkill.objects.all():
+                    user_skill.save()
+            # A later transaction touching the same user is not skipped
+            with self.captureOnCommitCallbacks(execute=True):
+                UserSkill.objects.first().save()
+
+        self.assertEqual(refresh.call_count, 2)
+        refresh.assert_called_with([self.user.pk])
+
+    def test_career_queued_again_while_rescoring_stays_queued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CareerPathSkill.objects.get(career_path=self.frontend).save()
+
+        def edited_meanwhile(career_ids, *args):
+            with self.captureOnCommitCallbacks(execute=True):
+                CareerPathSkill.objects.get(career_path=self.frontend).save()
+
+        with mock.patch.object(recommendation_service, 'refresh_careers', edited_meanwhile):
+            recommendation_service.refresh_pending_careers()
+
+        self.assertTrue(CareerRescore.objects.filter(career_path=self.frontend).exists())
+
+    def test_skill_gaps_scores_careers_missing_from_stored_rows(self):
+        demo = User.objects.create(username="demo")
+        data = CareerPath.objects.create(
+            title="Data Engineer", description="", future_growth=10,
+            required_experience="1-3 years",
+        )
+        CareerPathSkill.objects.create(career_path=data, skill=self.sql, proficiency_level=3)
+        # Re-scoring one career leaves demo with a row for that career only
+        recommendation_service.refresh_careers([data.pk])
+
+        response = self.client.get("/api/user-skills/skill_gaps/")
+
+        self.assertEqual(
+            {gap["career_path"]["id"] for gap in response.data},
+            {self.backend.pk, self.frontend.pk, data.pk},
+        )
+        self.assertEqual(Recommendation.objects.filter(user=demo).count(), 3)
+
+    def test_top_k_ranks_best_careers(self):
+        demo = User.objects.create(username="demo")
+        UserSkill.objects.create(user=demo, skill=self.react, proficiency_level=2)
+
+        response = self.client.get("/api/recommendations/top/", {"k": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["career_path"], self.frontend.pk)
+        self.assertEqual(response.data[0]["match_percentage"], 66.67)
+
+        listing = self.client.get("/api/recommendations/", {"page_size": 1})
+        self.assertEqual(len(listing.data["results"]), 1)
+        self.assertIsNotNone(listing.data["next"])
+
+    def test_top_k_serves_the_scores_it_ranked_on(self):
+        demo = User.objects.create(username="demo")
+        UserSkill.objects.bulk_create([
+            UserSkill(user=demo, skill=self.react, proficiency_level=3),
+        ])
+        recommendation_service.refresh_users([demo.pk])
+        # A skill change whose refresh has not run yet
+        UserSkill.objects.filter(user=demo).update(skill=self.python, proficiency_level=4)
+
+        response = self.client.get("/api/recommendations/top/", {"k": 2})
+
+        self.assertEqual(
+            [(rec["career_path"], rec["match_percentage"]) for rec in response.data],
+            [(self.backend.pk, 80.0), (self.frontend.pk, 0.0)],
+        )
+
+    def test_top_k_rejects_invalid_k(self):
+        response = self.client.get("/api/recommendations/top/", {"k": "ten"})
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryBudgetTests(TestCase):
+    """Listing endpoints must cost a constant number of queries, not one per row"""
+
+    ROWS = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.demo = User.objects.create(username="demo")
+        skills = Skill.objects.bulk_create(
+            Skill(name=f"Skill {i}", category="programming") for i in range(cls.ROWS)
+        )
+        careers = CareerPath.objects.bulk_create(
+            CareerPath(
+                title=f"Career {i}", description="", future_growth=10,
+                required_experience="1-3 years",
+            )
+            for i in range(cls.ROWS)
+        )
+        resources = LearningResource.objects.bulk_create(
+            LearningResource(
+                title=f"Resource {i}", description="", resource_type="course",
+                url="https://example.com", skill=skill, difficulty="beginner",
+                estimated_hours=1,
+            )
+            for i, skill in enumerate(skills)
+        )
+        CareerPathSkill.objects.bulk_create(
+            CareerPathSkill(career_path=careers[0], skill=skill, proficiency_level=3)
+            for skill in skills
+        )
+        UserSkill.objects.bulk_create(
+            UserSkill(user=cls.demo, skill=skill) for skill in skills
+        )
+        UserProgress.objects.bulk_create(
+            UserProgress(user=cls.demo, resource=resource) for resource in resources
+        )
+        InterviewQuestion.objects.bulk_create(
+            InterviewQuestion(
+                career_path=career, question="Why?", question_type="technical",
+                sample_answer="Because.", difficulty="beginner",
+            )
+            for career in careers[:10]
+        )
+        Recommendation.objects.bulk_create(
+            Recommendation(user=cls.demo, career_path=career, match_percentage=i)
+            for i, career in enumerate(careers)
+        )
+        cls.career = careers[0]
+
+    def assertEndpointQueries(self, num, url):
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_user_progress_list(self):
+        response = self.assertEndpointQueries(2, "/api/user-progress/")
+        self.assertEqual(len(response.data), self.ROWS)
+
+    def test_user_skills_list(self):
+        response = self.assertEndpointQueries(2, "/api/user-skills/")
+        self.assertEqual(len(response.data), self.ROWS)
+
+    def test_career_path_detail(self):
+        response = self.assertEndpointQueries(2, f"/api/career-paths/{self.career.pk}/")
+        self.assertEqual(len(response.data["required_skills"]), self.ROWS)
+
+    def test_recommendations_list(self):
+        self.assertEndpointQueries(2, "/api/recommendations/?page_size=100")
+
+    def test_skill_gaps(self):
+        recommendation_service.invalidate()
+        recommendation_service.get_matrix()
+        response = self.assertEndpointQueries(2, "/api/user-skills/skill_gaps/")
+        self.assertEqual(len(response.data), self.ROWS)
+
+    def test_practice_session(self):
+        self.assertEndpointQueries(1, "/api/interview-questions/practice_session/")
+
+    def test_dashboard_resolves_user_once(self):
+        response = self.assertEndpointQueries(3, "/api/user-profiles/dashboard/")
+        self.assertEqual(response.data["skills_count"], self.ROWS)
+
+
+class FanOutTests(TestCase):
+    def test_slow_calls_fall_back_to_defaults(self):
+        def failing():
+            raise ValueError("provider down")
+
+        started = time.monotonic()
+        results, missing = fan_out(
+            {
+                'fast': lambda: 'ok',
+                'slow': lambda: time.sleep(1) or 'late',
+                'broken': failing,
+            },
+            Deadline(0.1),
+            defaults={'slow': [], 'broken': {}},
+        )
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(results, {'fast': 'ok', 'slow': [], 'broken': {}})
+        self.assertCountEqual(missing, ['slow', 'broken'])
+
+
+# Quotas are covered by ProviderGuardTests; these measure raw concurrency
+@override_settings(CACHES=LOCMEM_CACHES, EXTERNAL_API_RATE_LIMITS={})
+class AsyncServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_async_adzuna_fetches_pages_concurrently(self):
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json={
+                'results': [{'description': 'Python and SQL on AWS'}]
+            })
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            http_client._async_clients[loop] = httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            )
+            try:
+                return await AsyncAdzunaService().extract_skills_from_jobs(max_pages=3)
+            finally:
+                await http_client._async_clients.pop(loop).aclose()
+
+        skills = asyncio.run(run())
+
+        self.assertEqual(peak, 3)
+        self.assertEqual(dict(skills), {'python': 3, 'sql': 3, 'aws': 3})
+
+
+class HTTPSessionTests(TestCase):
+    def test_sessions_are_pooled_per_provider(self):
+        self.assertIs(http_client.get_session('adzuna'), http_client.get_session('adzuna'))
+        self.assertIsNot(http_client.get_session('adzuna'), http_client.get_session('youtube'))
+
+    @override_settings(EXTERNAL_API_BACKOFF=0, EXTERNAL_API_BACKOFF_JITTER=0)
+    def test_retries_rate_limited_responses(self):
+        statuses = [429, 503, 200]
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(statuses.pop(0))
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        response = http_client._build_session().get(
+            f"http://127.0.0.1:{server.server_port}/", timeout=5
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statuses, [])
+
+    @override_settings(EXTERNAL_API_MAX_RETRY_WAIT=2)
+    def test_retry_after_is_capped(self):
+        retry = http_client._build_session().get_adapter('https://').max_retries
+        response = urllib3.HTTPResponse(status=429, headers={'Retry-After': '120'})
+
+        self.assertEqual(retry.get_retry_after(response), 2)
+        # The cap is kept by the Retry copies made for each further attempt
+        self.assertEqual(retry.increment('GET', '/', response).get_retry_after(response), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AdzunaPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.requested_pages = []
+        self.lock = threading.Lock()
+
+        def get(url, params=None, timeout=None):
+            time.sleep(0.05)
+            with self.lock:
+                self.requested_pages.append(int(url.rsplit('/', 1)[1]))
+            return mock.Mock(status_code=200, json=lambda: {
+                'count': 120,
+                'results': [{'description': 'python developer'}] * 50,
+            })
+
+        patcher = mock.patch(
+            'api.services.adzuna_service.get_session',
+            return_value=mock.Mock(get=get),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = AdzunaService()
+
+    def test_search_and_extraction_share_pages(self):
+        data = self.service.search_jobs("developer", "us", max_results=20)
+        skills = self.service.extract_skills_from_jobs("developer", "us", max_pages=2)
+
+        self.assertEqual(len(data['results']), 20)
+        self.assertEqual(data['count'], 120)
+        self.assertEqual(skills, [('python', 100)])
+        self.assertEqual(sorted(self.requested_pages), [1, 2])
+
+    def test_concurrent_callers_download_a_page_once(self):
+        threads = [
+            threading.Thread(target=self.service.search_jobs, args=("developer", "us", 10)),
+            threading.Thread(
+                target=self.service.extract_skills_from_jobs, args=("developer", "us", 3)
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(self.requested_pages), [1, 2, 3])
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    EXTERNAL_API_RATE_LIMITS={'adzuna': {'per_minute': 600, 'burst': 1}},
+    EXTERNAL_API_RATE_LIMIT_WAIT=0,
+    JOB_INGESTION_RATE_LIMIT_WAIT=5,
+)
+class AdzunaIngestionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pages = {
+            1: {'results': [{'id': i, 'title': 'Python developer'} for i in range(1, 4)]},
+            2: 503,
+            3: {'results': [{'id': 4, 'title': 'SQL analyst'}]},
+            4: {'results': []},
+        }
+        self.requested_pages = []
+
+        def get(url, params=None, timeout=None):
+            page = int(url.rsplit('/', 1)[1])
+            self.requested_pages.append(page)
+            if self.pages[page] == 503:
+                return mock.Mock(
+                    status_code=503,
+                    **{'raise_for_status.side_effect': requests.HTTPError("503")},
+                )
+            return mock.Mock(status_code=200, json=lambda: self.pages[page])
+
+        patcher = mock.patch(
+            'api.services.adzuna_service.get_session',
+            return_value=mock.Mock(get=get),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pages_wait_for_tokens_and_skip_the_cache(self):
+        self.pages[2] = self.pages[3]
+        source = AdzunaIngestionSource(AdzunaService())
+
+        # One token at a time: the request path's zero wait would refuse pages 2 and 3
+        first = source.fetch_pages("python", "us", range(1, 4))
+        again = source.fetch_pages("python", "us", range(1, 4))
+
+        self.assertEqual(first, again)
+        self.assertNotIn(None, first)
+        self.assertEqual(self.requested_pages, [1, 2, 3] * 2)
+
+    def test_failed_pages_are_counted_and_fail_the_command(self):
+        with self.assertRaisesMessage(CommandError, "1 search pages could not be fetched"):
+            call_command("ingest_jobs", queries=["python"], pages=6, stdout=StringIO())
+
+        # Pages after the first empty one are not requested
+        self.assertEqual(self.requested_pages, [1, 2, 3, 4])
+        self.assertEqual(JobPosting.objects.count(), 4)
+        # The failure was not cached as an empty page
+        self.assertIsNone(
+            AdzunaIngestionSource(AdzunaService()).fetch_pages("python", "us", [2])[0]
+        )
+
+
+class SkillExtractorTests(TestCase):
+    def test_matches_whole_terms_only(self):
+        matcher = KeywordMatcher({'ai': [], 'java': [], 'javascript': ['js'], 'c': [], 'c++': []})
+
+        self.assertEqual(matcher.find("Maintain Java services"), ['java'])
+        self.assertEqual(matcher.find("JavaScript (JS) and C++, not C#"), ['javascript', 'c++'])
+        self.assertEqual(matcher.find("AI/ML and C."), ['ai', 'c'])
+
+    def test_vocabulary_includes_skill_table_and_aliases(self):
+        Skill.objects.create(name="Terraform", category="cloud_devops")
+        extractor = SkillExtractorCache.build()
+
+        counts = extractor.count([
+            "Terraform on Amazon Web Services with K8s",
+            "Machine\nLearning with node.js",
+        ])
+
+        self.assertEqual(counts, {
+            'terraform': 1, 'aws': 1, 'kubernetes': 1,
+            'machine learning': 1, 'node.js': 1,
+        })
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ServiceCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = ServiceCache('test')
+
+    def _wait_for_refreshes(self):
+        deadline = time.monotonic() + 5
+        while self.cache._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_keys_are_namespaced_and_versioned(self):
+        key = self.cache.key('jobs', 'software developer', 'us')
+        self.assertEqual(key, 'test:jobs:software%20developer:us')
+
+        self.cache.set(key, {'count': 1}, 60)
+        self.assertEqual(self.cache.get(key), {'count': 1})
+
+        with override_settings(SERVICE_CACHE_VERSIONS={'test': 2}):
+            self.assertIsNone(self.cache.get(key))
+
+    def test_hits_and_misses_are_shared(self):
+        key = self.cache.key('salary')
+        self.cache.get(key)
+        self.cache.set(key, {}, 60)
+        self.cache.get(key)
+        self.cache.get(key)
+
+        # A second process sees the first one's flushed counters
+        stats = ServiceCache('test').stats()
+        self.assertEqual((stats['hits'], stats['misses']), (0, 0))
+        self.cache.flush_stats()
+        stats = ServiceCache('test').stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (2, 1, 0.6667))
+
+    def test_fetch_once_coalesces_concurrent_misses(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'count': 42}
+
+        # Two instances stand in for two worker processes sharing the cache;
+        # LocMemCache's add() is atomic, as Redis' is in production
+        other_worker = ServiceCache('test')
+        key = self.cache.key('jobs', 'python')
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda c=c: results.append(c.fetch_once(key, fetch, 60))
+            )
+            for c in [self.cache, self.cache, self.cache, other_worker, other_worker]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'count': 42}] * 5)
+
+    def test_fetch_once_caches_failures_briefly(self):
+        def fail():
+            raise ConnectionError("timeout")
+
+        key = self.cache.key('jobs', 'rust')
+        with self.assertRaises(ConnectionError):
+            self.cache.fetch_once(key, fail, 3600, default={'results': []})
+
+        # The default is served without calling the provider again...
+        fetch = mock.Mock(return_value={'count': 1})
+        self.assertEqual(self.cache.fetch_once(key, fetch, 3600), {'results': []})
+        fetch.assert_not_called()
+
+        # ...until the negative TTL runs out
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertEqual(self.cache.fetch_once(key, fetch, 3600), {'results': []})
+        self._wait_for_refreshes()
+        self.assertEqual(self.cache.fetch_once(key, fetch, 3600), {'count': 1})
+
+    def test_empty_results_get_the_negative_ttl(self):
+        key = self.cache.key('jobs', 'cobol')
+        self.cache.fetch_once(key, lambda: [], 3600)
+        self.cache.fetch_once(key, lambda: ['job'], 3600)
+
+        envelope = cache.get(key, version=1)
+        self.assertEqual(envelope['value'], [])
+        self.assertLessEqual(envelope['fresh_until'] - time.time(), 60)
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        key = self.cache.key('salary', 'python')
+        self.cache.fetch_once(key, lambda: {'mean': 100}, 60)
+
+        refreshed = threading.Event()
+
+        def slow_fetch():
+            refreshed.wait(5)
+            return {'mean': 120}
+
+        # Past the soft TTL: the old value comes back at once
+        with mock.patch('time.time', return_value=time.time() + 120):
+            started = time.monotonic()
+            self.assertEqual(self.cache.fetch_once(key, slow_fetch, 60), {'mean': 100})
+            self.assertEqual(self.cache.fetch_once(key, slow_fetch, 60), {'mean': 100})
+            self.assertLess(time.monotonic() - started, 1)
+
+        refreshed.set()
+        self._wait_for_refreshes()
+        self.assertEqual(self.cache.fetch_once(key, slow_fetch, 60), {'mean': 120})
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['stale'], stats['misses']), (1, 2, 1))
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD=3,
+    CIRCUIT_BREAKER_RESET_TIMEOUT=30,
+    EXTERNAL_API_RATE_LIMITS={},
+)
+class ProviderGuardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guard = ProviderGuard('coursera')
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        request = mock.Mock(side_effect=ConnectionError("timeout"))
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                self.guard.call(request)
+
+        with self.assertRaises(CircuitOpenError):
+            self.guard.call(request)
+        self.assertEqual(request.call_count, 3)
+
+        metrics = self.guard.metrics()
+        self.assertEqual((metrics['state'], metrics['state_gauge']), ('open', 2))
+        self.assertEqual((metrics['times_opened'], metrics['rejected_calls']), (1, 1))
+
+    def test_half_open_probe_closes_the_circuit(self):
+        failing = mock.Mock(side_effect=ConnectionError("timeout"))
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                self.guard.call(failing)
+
+        healthy = mock.Mock(return_value=mock.Mock(status_code=200))
+        with mock.patch('time.time', return_value=time.time() + 31):
+            self.assertEqual(self.guard.breaker.state(), 'half_open')
+            self.guard.call(healthy)
+
+        self.assertEqual(self.guard.breaker.state(), 'closed')
+        self.guard.call(healthy)
+        self.assertEqual(healthy.call_count, 2)
+
+    def test_only_server_errors_count_as_failures(self):
+        for status_code in [404, 400, 404, 503, 429]:
+            self.guard.call(mock.Mock(return_value=mock.Mock(status_code=status_code)))
+        self.assertEqual(self.guard.breaker.state(), 'closed')
+
+        self.guard.call(mock.Mock(return_value=mock.Mock(status_code=500)))
+        self.assertEqual(self.guard.breaker.state(), 'open')
+
+    def test_open_circuit_returns_the_fallback_without_waiting(self):
+        session = mock.Mock()
+        session.get.side_effect = ConnectionError("timeout")
+        with mock.patch('api.services.coursera_service.get_session', return_value=session):
+            service = CourseraService()
+            for query in ['go', 'rust', 'java', 'scala']:
+                self.assertEqual(service.search_courses(query), [])
+
+        self.assertEqual(session.get.call_count, 3)
+
+    def test_token_bucket_is_shared_and_limits_calls(self):
+        first_worker = TokenBucket('youtube', per_minute=60, burst=2)
+        second_worker = TokenBucket('youtube', per_minute=60, burst=2)
+
+        first_worker.acquire(max_wait=0)
+        second_worker.acquire(max_wait=0)
+        with self.assertRaises(RateLimitExceeded):
+            first_worker.acquire(max_wait=0)
+
+        # Refills at one token a second
+        started = time.monotonic()
+        second_worker.acquire(max_wait=2)
+        self.assertGreater(time.monotonic() - started, 0.5)
+        self.assertEqual(second_worker.metrics()['rate_limited_calls'], 1)
+
+    def test_metrics_cover_every_provider(self):
+        with override_settings(EXTERNAL_API_RATE_LIMITS={'adzuna': {'per_minute': 25, 'burst': 10}}):
+            metrics = {m['provider']: m for m in provider_metrics()}
+
+        self.assertEqual(set(metrics), {'adzuna', 'coursera', 'youtube'})
+        self.assertEqual(metrics['adzuna']['tokens'], 10)
+        self.assertNotIn('tokens', metrics['coursera'])
+
+
+class IngestedJobsMixin:
+    """Fill the job store from the recorded Adzuna responses"""
+
+    def setUp(self):
+        cache.clear()
+        # Keep the skill graph file out of the source tree
+        graph_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(graph_dir.cleanup)
+        graph_path = override_settings(SKILL_GRAPH_PATH=f"{graph_dir.name}/skill_graph.npz")
+        graph_path.enable()
+        self.addCleanup(graph_path.disable)
+
+        self.client.force_login(User.objects.create(username="analyst"))
+        call_command("ingest_jobs", offline=True, stdout=StringIO())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class JobStoreTests(IngestedJobsMixin, TestCase):
+
+    def test_ingestion_dedupes_by_adzuna_id(self):
+        # One posting is recorded under two searches
+        self.assertEqual(JobPosting.objects.count(), 47)
+        self.assertEqual(
+            set(JobPostingSkill.objects.filter(posting__title="Data Scientist")
+                .values_list("skill", flat=True)),
+            {"python", "machine learning", "sql", "data science"},
+        )
+
+        stats = JobIngestionService(RecordedAdzunaSource()).ingest(
+            ["software developer", "devops engineer"], max_pages=2, batch_size=5
+        )
+        self.assertEqual(
+            stats, {"fetched": 24, "created": 0, "duplicates": 24, "failed_pages": 0}
+        )
+        self.assertEqual(JobPosting.objects.count(), 47)
+
+    def test_postings_stored_by_a_concurrent_run_are_not_counted_twice(self):
+        python = SkillDemand.objects.get(skill="python").job_count
+        stored_ids = JobIngestionService._stored_ids
+        checks = []
+
+        def racing(jobs):
+            # The first check runs before another ingestion run commits them
+            checks.append(jobs)
+            return set() if len(checks) == 1 else stored_ids(jobs)
+
+        with mock.patch.object(JobIngestionService, "_stored_ids", staticmethod(racing)):
+            stats = JobIngestionService(RecordedAdzunaSource()).ingest(
+                ["software developer"], max_pages=2
+            )
+
+        self.assertEqual(stats["created"], 0)
+        self.assertEqual(len(checks), 2)
+        self.assertEqual(JobPosting.objects.count(), 47)
+        self.assertEqual(SkillDemand.objects.get(skill="python").job_count, python)
+
+    @mock.patch("api.views_external.adzuna_service")
+    def test_market_endpoints_read_local_postings(self, adzuna):
+        # Session, user, then one indexed read of the aggregate row
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/external/skill-demand/", {"skill": "Python"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["source"], "local")
+        self.assertEqual(
+            response.data["total_jobs"],
+            JobPostingSkill.objects.filter(skill="python").count(),
+        )
+        self.assertIn("machine learning", dict(response.data["related_skills"]))
+
+        response = self.client.get("/api/external/trends/")
+        self.assertEqual(response.data["trends"][0]["category"], "IT Jobs")
+        self.assertEqual(response.data["trends"][0]["tag"], "it-jobs")
+
+        response = self.client.get("/api/external/jobs/", {"title": "data scientist"})
+        self.assertEqual(response.data["total_jobs"], 4)
+        self.assertEqual(len(response.data["job_listings"]), 4)
+        # Titles are matched by word through the full-text index: data and
+        # applied scientists
+        response = self.client.get("/api/external/jobs/", {"title": "Scientist"})
+        self.assertEqual(response.data["total_jobs"], 6)
+
+        adzuna.search_jobs.assert_not_called()
+
+    def test_skill_demand_is_updated_incrementally(self):
+        python = SkillDemand.objects.get(skill="python")
+        postings = JobPosting.objects.filter(skills__skill="python")
+        salaries = sorted(p.salary_mid for p in postings if p.salary_mid)
+
+        self.assertEqual(python.job_count, postings.count())
+        self.assertEqual(python.salary_count, len(salaries))
+        self.assertAlmostEqual(python.average_salary, sum(salaries) / len(salaries))
+        self.assertLessEqual(python.salary_p25, python.salary_median)
+        self.assertLessEqual(python.salary_median, python.salary_p75)
+        # Bucketed percentiles stay within one bucket of the exact value
+        exact_median = salaries[len(salaries) // 2]
+        self.assertLess(abs(python.salary_median - exact_median), SkillDemand.SALARY_BUCKET * 2)
+        self.assertEqual(
+            python.related_skills["sql"],
+            postings.filter(id__in=JobPostingSkill.objects.filter(skill="sql").values("posting")).count(),
+        )
+
+        # Folding postings in batch by batch matches a full recompute
+        incremental = {
+            row.skill: (row.job_count, row.salary_histogram, row.locations, row.related_skills)
+            for row in SkillDemand.objects.all()
+        }
+        call_command("rebuild_skill_demand", chunk_size=7, stdout=StringIO())
+        rebuilt = {
+            row.skill: (row.job_count, row.salary_histogram, row.locations, row.related_skills)
+            for row in SkillDemand.objects.all()
+        }
+        self.assertEqual(incremental, rebuilt)
+
+    @mock.patch("api.views_external.adzuna_service")
+    def test_unknown_skill_falls_back_to_live_search(self, adzuna):
+        adzuna.search_jobs.return_value = {"count": 0, "results": []}
+
+        response = self.client.get("/api/external/skill-demand/", {"skill": "cobol"})
+
+        self.assertEqual(response.data["source"], "live")
+        adzuna.search_jobs.assert_called_once()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SkillGraphTests(IngestedJobsMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        frontend = CareerPath.objects.create(
+            title="Frontend Developer", description="", future_growth=10,
+            required_experience="1-3 years",
+        )
+        for name in ["React", "TypeScript", "Figma"]:
+            CareerPathSkill.objects.create(
+                career_path=frontend, proficiency_level=3,
+                skill=Skill.objects.create(name=name, category="web_dev"),
+            )
+        call_command("build_skill_graph", stdout=StringIO())
+
+    def test_related_skills_come_from_postings_and_careers(self):
+        graph = get_skill_graph()
+
+        related = dict(graph.related("react", 10))
+        self.assertIn("javascript", related)
+        # Only ever seen together on a career path
+        self.assertIn("figma", related)
+        self.assertNotIn("react", related)
+        self.assertEqual({skill for skill, _ in graph.related("figma")}, {"react", "typescript"})
+        self.assertEqual(graph.related("cobol"), [])
+
+    def test_next_skills_skip_known_ones(self):
+        graph = get_skill_graph()
+
+        suggestions = [skill for skill, _ in graph.next_skills(["react", "javascript"], 5)]
+
+        self.assertEqual(len(suggestions), 5)
+        self.assertFalse({"react", "javascript"} & set(suggestions))
+        self.assertIn("typescript", suggestions)
+
+    def test_matrix_round_trips_through_disk(self):
+        graph = get_skill_graph()
+        loaded = SkillGraph.load(settings.SKILL_GRAPH_PATH)
+
+        self.assertEqual(loaded.skills, graph.skills)
+        self.assertEqual((loaded.matrix != graph.matrix).nnz, 0)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            loaded.related("python", 10)
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_endpoints(self):
+        response = self.client.get("/api/external/related-skills/", {"skill": "ReactJS"})
+        self.assertEqual(response.data["skill"], "react")
+        self.assertTrue(response.data["related_skills"])
+
+        response = self.client.get("/api/external/related-skills/", {"skill": "cobol"})
+        self.assertEqual(response.status_code, 404)
+
+        analyst = User.objects.get(username="analyst")
+        UserSkill.objects.create(
+            user=analyst, skill=Skill.objects.get(name="React"), proficiency_level=3
+        )
+        response = self.client.get("/api/external/next-skills/")
+        self.assertEqual(response.data["known_skills"], ["react"])
+        self.assertEqual(len(response.data["next_skills"]), 5)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, EXTERNAL_API_RATE_LIMITS={})
+class MarketTrendsTests(TestCase):
+    CATEGORIES = 12
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create(username="analyst"))
+        self.requests = []
+        self.lock = threading.Lock()
+
+        def get(url, params=None, timeout=None):
+            with self.lock:
+                self.requests.append(url)
+            if url.endswith("/categories"):
+                payload = {"results": [
+                    {"label": f"Category {i}", "tag": f"category-{i}"}
+                    for i in range(self.CATEGORIES)
+                ]}
+            else:
+                time.sleep(0.05)
+                i = int(params["what"].split()[-1])
+                payload = {"count": 100 * i, "mean": 50000.0 + i, "results": [{}]}
+            return mock.Mock(status_code=200, json=lambda: payload)
+
+        patcher = mock.patch(
+            "api.services.adzuna_service.get_session",
+            return_value=mock.Mock(get=get),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_categories_are_fetched_concurrently_and_cached_together(self):
+        started = time.monotonic()
+        response = self.client.get("/api/external/trends/", {"limit": 3})
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(response.data["source"], "live")
+        self.assertFalse(response.data["partial"])
+        self.assertEqual(response.data["total_categories"], self.CATEGORIES)
+        self.assertEqual(
+            [(t["category"], t["average_salary"]) for t in response.data["trends"]],
+            [("Category 11", 50011.0), ("Category 10", 50010.0), ("Category 9", 50009.0)],
+        )
+        self.assertEqual(len(self.requests), self.CATEGORIES + 1)
+        self.assertLess(elapsed, self.CATEGORIES * 0.05)
+
+        # Later views, whatever their limit, read the one cached snapshot
+        response = self.client.get("/api/external/trends/", {"limit": 100})
+        self.assertEqual(len(response.data["trends"]), self.CATEGORIES)
+        self.assertEqual(len(self.requests), self.CATEGORIES + 1)
+
+    def test_limit_must_be_an_integer(self):
+        response = self.client.get("/api/external/trends/", {"limit": "all"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MarketHistoryTests(IngestedJobsMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for title in ["Data Scientist", "DevOps Engineer"]:
+            CareerPath.objects.create(
+                title=title, description="", future_growth=15,
+                required_experience="1-3 years",
+            )
+
+    def add_history(self, subject, counts, step=timedelta(days=7)):
+        now = timezone.now()
+        MarketSnapshot.objects.bulk_create(
+            MarketSnapshot(
+                subject_type="career", subject=subject, job_count=count,
+                recorded_at=now - step * (len(counts) - i),
+            )
+            for i, count in enumerate(counts)
+        )
+
+    def test_record_appends_careers_and_skills(self):
+        # The recorded postings are from September 2026
+        recorded_at = datetime(2026, 10, 1, tzinfo=dt_timezone.utc)
+        market_history_service.record(recorded_at=recorded_at)
+        market_history_service.record(recorded_at=recorded_at + timedelta(days=1))
+
+        data_scientist = MarketSnapshot.objects.filter(subject_type="career", subject="Data Scientist")
+        self.assertEqual(data_scientist.count(), 2)
+        self.assertEqual(data_scientist.first().job_count, 4)
+        self.assertEqual(
+            MarketSnapshot.objects.filter(subject_type="skill").count(),
+            2 * SkillDemand.objects.count(),
+        )
+
+    def test_growth_is_fitted_from_history(self):
+        # 100 jobs growing by 2 a week is ~+80% a year relative to the mean
+        self.add_history("Data Scientist", [100 + 2 * week for week in range(20)])
+        self.add_history("DevOps Engineer", [200 - week for week in range(20)])
+        self.add_history("Too New", [10, 20])
+
+        with self.assertNumQueries(1):
+            rates = market_history_service.growth_rates("career")
+
+        self.assertAlmostEqual(rates["Data Scientist"], 2 * 52.14 / 119 * 100, delta=2)
+        self.assertLess(rates["DevOps Engineer"], 0)
+        self.assertNotIn("Too New", rates)
+
+        self.assertEqual(market_history_service.update_future_growth(), 2)
+        self.assertEqual(
+            CareerPath.objects.get(title="Data Scientist").future_growth, rates["Data Scientist"]
+        )
+
+    def test_snapshots_follow_recent_postings_not_the_whole_store(self):
+        CareerPath.objects.create(
+            title="Embedded Engineer", description="", future_growth=15,
+            required_experience="1-3 years",
+        )
+        start = timezone.now() - timedelta(days=100)
+        # Fewer postings every day; the store itself only ever grows
+        postings = JobPosting.objects.bulk_create(
+            JobPosting(
+                adzuna_id=f"embedded-{day}-{n}", title="Embedded Engineer",
+                posted_at=start + timedelta(days=day),
+            )
+            for day in range(100)
+            for n in range(1 + (100 - day) // 12)
+        )
+        JobPostingSkill.objects.bulk_create(
+            JobPostingSkill(posting=posting, skill="verilog") for posting in postings
+        )
+
+        for week in range(10):
+            market_history_service.record(recorded_at=start + timedelta(days=30 + 7 * week))
+
+        counts = list(
+            MarketSnapshot.objects.filter(subject="Embedded Engineer")
+            .order_by("recorded_at").values_list("job_count", flat=True)
+        )
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertGreater(counts[0], counts[-1])
+        self.assertLess(market_history_service.growth_rate("career", "Embedded Engineer"), 0)
+        self.assertLess(market_history_service.growth_rate("skill", "verilog"), 0)
+
+    def test_series_downsamples_by_interval(self):
+        self.add_history("Data Scientist", list(range(1, 29)), step=timedelta(days=1))
+
+        daily = market_history_service.series("career", "Data Scientist", interval="day")
+        monthly = market_history_service.series("career", "Data Scientist", interval="month")
+
+        self.assertEqual(len(daily), 28)
+        self.assertLessEqual(len(monthly), 2)
+        self.assertEqual(sum(point["samples"] for point in monthly), 28)
+
+        response = self.client.get(
+            "/api/external/market-history/",
+            {"subject": "Data Scientist", "interval": "week"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(point["samples"] for point in response.data["points"]), 28)
+
+        response = self.client.get("/api/external/market-history/", {"interval": "hour"})
+        self.assertEqual(response.status_code, 400)
+
+        for start in ("2024-13-45T00:00", "last week"):
+            response = self.client.get("/api/external/market-history/", {"start": start})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            "/api/external/market-history/",
+            {"subject": "Data Scientist", "start": "2000-01-01", "end": "2000-02-01"},
+        )
+        self.assertEqual(response.data["points"], [])
+
+
+class CareerImportTests(TestCase):
+    """Auto-populating a career costs the same few queries however many skills come back"""
+
+    SKILLS = [("python", 40), ("sql", 30), ("docker", 25), ("kubernetes", 12), ("aws", 9),
+              ("git", 8), ("linux", 7), ("terraform", 6), ("go", 5), ("redis", 4)]
+
+    def setUp(self):
+        self.python = Skill.objects.create(
+            name="Python", category="programming", description="Curated"
+        )
+
+    def courses(self, query, max_results):
+        return [
+            {"name": f"{query} course {i}", "description": "", "link": "https://example.com", "free": True}
+            for i in range(max_results)
+        ]
+
+    def populate(self, queries):
+        from .services.career_import import career_import_service
+
+        with mock.patch("api.services.career_import.adzuna_service") as adzuna, \
+                mock.patch("api.services.career_import.coursera_service") as coursera:
+            adzuna.extract_skills_from_jobs.return_value = self.SKILLS
+            adzuna.get_salary_data.return_value = {"median": 120000}
+            coursera.search_courses.side_effect = self.courses
+            with self.assertNumQueries(queries):
+                return career_import_service.populate("Platform Engineer")
+
+    def test_populate_creates_career_skills_and_resources(self):
+        summary = self.populate(15)
+
+        career = CareerPath.objects.get(pk=summary["career_id"])
+        self.assertEqual(career.average_salary, 120000)
+        self.assertEqual(summary["skills_added"], 10)
+        self.assertEqual(summary["resources_added"], 15)
+        self.assertEqual(career.required_skills.count(), 10)
+        self.assertEqual(LearningResource.objects.count(), 15)
+        # Existing skills are matched case-insensitively and left as curated
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.description, "Curated")
+        self.assertFalse(Skill.objects.filter(name="Python").exclude(pk=self.python.pk).exists())
+        link = CareerPathSkill.objects.get(career_path=career, skill=self.python)
+        self.assertEqual((link.proficiency_level, link.is_core), (4, True))
+
+    def test_worker_rescores_users_after_the_job(self):
+        demo = User.objects.create(username="demo")
+        UserSkill.objects.bulk_create([UserSkill(user=demo, skill=self.python, proficiency_level=4)])
+
+        with mock.patch.object(recommendation_service, "refresh_careers") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                career_id = self.populate(15)["career_id"]
+        # Committing the import only queues the career, so a long re-score
+        # cannot hold up the job past its heartbeat
+        refresh.assert_not_called()
+        self.assertTrue(CareerRescore.objects.filter(career_path_id=career_id).exists())
+
+        call_command("run_import_worker", "--once", "--concurrency", "1", stdout=StringIO())
+
+        recommendation = Recommendation.objects.get(user=demo, career_path_id=career_id)
+        self.assertGreater(recommendation.match_percentage, 0)
+        self.assertFalse(CareerRescore.objects.exists())
+
+    def test_repopulate_updates_in_place(self):
+        self.populate(15)
+        self.SKILLS = [("python", 80)] + self.SKILLS[1:]
+        self.populate(11)
+
+        self.assertEqual(Skill.objects.count(), 10)
+        self.assertEqual(CareerPathSkill.objects.count(), 10)
+        self.assertEqual(LearningResource.objects.count(), 15)
+        link = CareerPathSkill.objects.get(skill=self.python)
+        self.assertEqual(link.proficiency_level, 5)
+
+
+class CareerImportQueueTests(TestCase):
+    """Auto-population is queued by the API and run by run_import_worker"""
+
+    def setUp(self):
+        patcher = mock.patch("api.services.import_queue.career_import_service")
+        self.service = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def populate(title, progress):
+            progress("fetching")
+            progress("saving")
+            if title == "Broken":
+                raise RuntimeError("Adzuna is down")
+            return {"career_id": 1, "skills_added": 10, "resources_added": 15}
+
+        self.service.populate.side_effect = populate
+
+    def work(self):
+        call_command("run_import_worker", "--once", "--concurrency", "1", stdout=StringIO())
+
+    def test_post_queues_and_worker_runs_job(self):
+        response = self.client.post("/api/integrated/auto-populate/", {"title": "Data Engineer"})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data["job_id"]
+        self.assertEqual(response.data["status"], "queued")
+        self.assertFalse(self.service.populate.called)
+
+        # Asking again while it waits returns the same job
+        again = self.client.post("/api/integrated/auto-populate/", {"title": "data engineer"})
+        self.assertEqual((again.data["job_id"], again.data["created"]), (job_id, False))
+
+        self.work()
+
+        status = self.client.get(f"/api/integrated/import-jobs/{job_id}/").data
+        self.assertEqual((status["status"], status["progress"]), ("succeeded", 100))
+        self.assertEqual(status["result"]["skills_added"], 10)
+        self.assertEqual(status["attempts"], 1)
+
+    def test_batch_reports_progress_over_its_jobs(self):
+        response = self.client.post(
+            "/api/integrated/auto-populate/batch/",
+            {"titles": ["Data Engineer", "Broken", "data engineer", "ML Engineer"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual([job["title"] for job in response.data["jobs"]], ["Data Engineer", "Broken", "ML Engineer"])
+        url = f"/api/integrated/import-batches/{response.data['batch_id']}/"
+
+        before = self.client.get(url).data
+        self.assertEqual((before["status"], before["progress"], before["total"]), ("queued", 0, 3))
+
+        self.work()
+
+        after = self.client.get(url).data
+        self.assertEqual(after["status"], "partial")
+        self.assertEqual(after["counts"], {"queued": 0, "running": 0, "succeeded": 2, "failed": 1})
+        failed = [job for job in after["jobs"] if job["status"] == "failed"]
+        self.assertEqual(failed[0]["error"], "Adzuna is down")
+
+    def test_batch_shares_jobs_already_queued(self):
+        queued, _ = career_import_queue.enqueue("Data Engineer")
+
+        batch, jobs = career_import_queue.enqueue_batch(["data engineer", "ML Engineer"])
+
+        self.assertEqual(jobs[0], (queued, False))
+        self.assertTrue(jobs[1][1])
+        self.assertEqual(career_import_queue.batch_summary(batch)["total"], 2)
+        self.assertEqual(CareerImportJob.objects.count(), 2)
+
+    def test_one_active_job_per_title(self):
+        career_import_queue.enqueue("Data Engineer")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CareerImportJob.objects.create(title="DATA ENGINEER")
+
+        # Once the first job has finished the career can be queued again
+        CareerImportJob.objects.update(status="succeeded")
+        _, created = career_import_queue.enqueue("DATA ENGINEER")
+        self.assertTrue(created)
+
+    def test_batch_rejects_bad_titles(self):
+        for titles in ([], "Data Engineer", [1, 2], [" "]):
+            response = self.client.post(
+                "/api/integrated/auto-populate/batch/", {"titles": titles}, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 400, titles)
+
+    def test_claim_hands_each_job_to_one_worker(self):
+        career_import_queue.enqueue("Data Engineer")
+        first = career_import_queue.claim("a")
+        self.assertEqual(first.status, "running")
+        self.assertIsNone(career_import_queue.claim("b"))
+
+    def test_stale_running_jobs_are_requeued_then_failed(self):
+        job, _ = career_import_queue.enqueue("Data Engineer")
+        long_ago = timezone.now() - timedelta(hours=1)
+
+        CareerImportJob.objects.filter(pk=job.pk).update(status="running", attempts=1, heartbeat_at=long_ago)
+        self.assertEqual(career_import_queue.requeue_stale(), (1, 0))
+        self.assertEqual(CareerImportJob.objects.get(pk=job.pk).status, "queued")
+
+        CareerImportJob.objects.filter(pk=job.pk).update(status="running", attempts=3, heartbeat_at=long_ago)
+        self.assertEqual(career_import_queue.requeue_stale(), (0, 1))
+        self.assertEqual(CareerImportJob.objects.get(pk=job.pk).status, "failed")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CatalogImportTests(TestCase):
+    """import_catalog streams files in batches and reports bad rows by line"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, text):
+        path = f"{self.dir.name}/{name}"
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def load(self, kind, name, text, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_catalog", kind, self.write(name, text), *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_and_jsonl_catalog(self):
+        self.load("skills", "skills.csv", (
+            "name,category,description\n"
+            "Python,programming,Language\n"
+            "Docker,cloud_devops,\n"
+        ))
+        self.load("careers", "careers.jsonl", (
+            '{"title": "Platform Engineer", "description": "Runs platforms", '
+            '"future_growth": 12.5, "required_experience": "3-5 years"}\n'
+        ))
+        self.load("career_skills", "links.csv", (
+            "career,skill,proficiency_level,is_core\n"
+            "platform engineer,docker,4,true\n"
+            "Platform Engineer,Python,3,false\n"
+        ))
+        self.load("resources", "resources.jsonl", "".join(
+            f'{{"title": "Docker {i}", "description": "Notes", "resource_type": "course", '
+            f'"url": "https://example.com/{i}", "skill": "Docker", "difficulty": "beginner", '
+            f'"estimated_hours": 3}}\n'
+            for i in range(5)
+        ), "--batch-size", "2")
+        self.load("questions", "questions.csv", (
+            "career,question,question_type,sample_answer,difficulty\n"
+            "Platform Engineer,What is a container?,technical,An isolated process.,beginner\n"
+        ))
+
+        career = CareerPath.objects.get(title="Platform Engineer")
+        self.assertEqual(career.future_growth, 12.5)
+        self.assertEqual(
+            sorted(career.required_skills.values_list("skill__name", "proficiency_level", "is_core")),
+            [("Docker", 4, True), ("Python", 3, False)],
+        )
+        self.assertEqual(LearningResource.objects.filter(skill__name="Docker").count(), 5)
+        self.assertEqual(career.interview_questions.count(), 1)
+
+    def test_career_skill_import_rescores_recommendations(self):
+        demo = User.objects.create(username="demo")
+        self.load("skills", "skills.csv", "name,category\nDocker,cloud_devops\n")
+        self.load("careers", "careers.csv", (
+            "title,description,future_growth,required_experience\n"
+            "Platform Engineer,Runs platforms,10,3-5 years\n"
+        ))
+        links = "career,skill,proficiency_level,is_core\nPlatform Engineer,Docker,{},true\n"
+        self.load("career_skills", "links.csv", links.format(4))
+        UserSkill.objects.bulk_create([
+            UserSkill(user=demo, skill=Skill.objects.get(name="Docker"), proficiency_level=2),
+        ])
+        recommendation_service.refresh_users([demo.pk])
+        self.assertEqual(Recommendation.objects.get(user=demo).match_percentage, 50.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            out, _ = self.load("career_skills", "links.csv", links.format(2))
+        self.assertIn("1 careers queued for re-scoring", out)
+        call_command("recompute_recommendations", pending=True, stdout=StringIO())
+
+        self.assertEqual(Recommendation.objects.get(user=demo).match_percentage, 100.0)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        Skill.objects.create(name="Python", category="programming")
+        out, err = self.load("resources", "resources.csv", (
+            "title,description,resource_type,url,skill,difficulty,estimated_hours\n"
+            "Good,Notes,course,https://example.com,python,beginner,4\n"
+            "Bad type,Notes,podcast,https://example.com,Python,beginner,4\n"
+            "No skill,Notes,course,https://example.com,Cobol,beginner,4\n"
+            "Bad hours,Notes,course,https://example.com,Python,beginner,lots\n"
+        ))
+        self.assertEqual(list(LearningResource.objects.values_list("title", flat=True)), ["Good"])
+        self.assertIn("line 3: resource_type:", err)
+        self.assertIn("line 4: skill: unknown skill 'Cobol'", err)
+        self.assertIn("line 5: estimated_hours:", err)
+        self.assertIn("3 invalid", out)
+
+    def test_reimport_updates_or_skips_instead_of_duplicating(self):
+        skills = "name,category,description\nPython,programming,Old\nPython,programming,New\n"
+        self.load("skills", "skills.csv", skills)
+        self.assertEqual(Skill.objects.get().description, "New")
+
+        resources = (
+            '{"title": "Intro", "description": "Notes", "resource_type": "course", "url": "https://example.com", '
+            '"skill": "Python", "difficulty": "beginner", "estimated_hours": 3}\n'
+        )
+        self.load("resources", "resources.jsonl", resources)
+        out, _ = self.load("resources", "resources.jsonl", resources)
+        self.assertEqual(LearningResource.objects.count(), 1)
+        self.assertIn("0 resources (1 rows, 1 duplicates", out)
+
+    def test_dry_run_writes_nothing(self):
+        out, _ = self.load("skills", "skills.csv", "name,category\nPython,programming\n", "--dry-run")
+        self.assertFalse(Skill.objects.exists())
+        self.assertIn("Validated 1 skills", out)
+
+    def test_batches_cost_a_fixed_number_of_queries(self):
+        Skill.objects.create(name="Python", category="programming")
+        path = self.write("resources.jsonl", "".join(
+            f'{{"title": "R{i}", "description": "Notes", "resource_type": "course", "url": "https://example.com", '
+            f'"skill": "Python", "difficulty": "beginner", "estimated_hours": 1}}\n'
+            for i in range(300)
+        ))
+        # Skill lookup once, then per batch: existing keys, savepoint, INSERT, release
+        with self.assertNumQueries(1 + 3 * 4):
+            stats = CatalogImporter("resources", batch_size=100).run(path)
+        self.assertEqual(stats["written"], 300)
+
+
+class HotPathIndexTests(TestCase):
+    def test_interview_questions_filter_by_career_type_and_difficulty(self):
+        career = CareerPath.objects.create(
+            title="Backend", description="", future_growth=1, required_experience="1 year"
+        )
+        for question_type, difficulty in (("technical", "beginner"), ("behavioral", "beginner")):
+            InterviewQuestion.objects.create(
+                career_path=career, question="Why?", question_type=question_type,
+                sample_answer="", difficulty=difficulty,
+            )
+
+        response = self.client.get(
+            f"/api/interview-questions/?career_path={career.pk}&question_type=technical&difficulty=beginner"
+        )
+        self.assertEqual([q["question_type"] for q in response.data], ["technical"])
+        for query in ("career_path=abc", "question_type=trivia", "difficulty=expert"):
+            response = self.client.get(f"/api/interview-questions/?{query}")
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_progress_percentage_is_checked_by_the_database(self):
+        user = User.objects.create(username="learner")
+        skill = Skill.objects.create(name="Python", category="programming")
+        resource = LearningResource.objects.create(
+            title="Intro", description="", resource_type="course", url="https://example.com",
+            skill=skill, difficulty="beginner", estimated_hours=1,
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserProgress.objects.create(user=user, resource=resource, progress_percentage=120)
+
+    def test_benchmark_reports_plans_and_rolls_back(self):
+        out = StringIO()
+        call_command(
+            "benchmark_queries", "--users", "5", "--resources", "50", "--per-user", "3",
+            "--repeat", "1", stdout=out,
+        )
+        self.assertIn("recommendation_user_rank", out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith="bench-user").exists())
+
+
+class FullTextSearchTests(TestCase):
+    """Search runs on the FTS index kept current by triggers, whatever wrote the rows"""
+
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python", category="programming", description="Language")
+        self.go = Skill.objects.create(name="Go", category="programming")
+        self.react = Skill.objects.create(name="React", category="web_dev", description="UI library")
+        LearningResource.objects.bulk_create([
+            self.resource("Data pipelines", self.go, "Moving data around, with a little Python"),
+            self.resource("Python for data science", self.python, "Pandas and NumPy"),
+            self.resource("Advanced Python", self.python, "Decorators", difficulty="advanced", free=False),
+        ])
+
+    def resource(self, title, skill, description, difficulty="beginner", free=True):
+        return LearningResource(
+            title=title, description=description, resource_type="course", url="https://example.com",
+            skill=skill, difficulty=difficulty, estimated_hours=1, free=free,
+        )
+
+    def titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.data]
+
+    def test_ranked_prefix_search(self):
+        titles = self.titles("/api/learning-resources/?search=pyth")
+        # Title and skill matches outrank a mention in the description
+        self.assertEqual(set(titles[:2]), {"Python for data science", "Advanced Python"})
+        self.assertEqual(titles[2], "Data pipelines")
+        self.assertEqual(self.titles("/api/learning-resources/?search=data python"), [
+            "Python for data science", "Data pipelines",
+        ])
+        self.assertEqual(self.titles("/api/learning-resources/?search=cobol"), [])
+        self.assertEqual(len(self.titles("/api/learning-resources/?search=python&limit=1")), 1)
+        self.assertEqual(self.client.get("/api/learning-resources/?search=python&limit=x").status_code, 400)
+
+    def test_filters_apply_before_the_limit(self):
+        self.assertEqual(
+            self.titles("/api/learning-resources/?search=python&difficulty=advanced&limit=1"),
+            ["Advanced Python"],
+        )
+        self.assertEqual(
+            sorted(self.titles("/api/learning-resources/?search=python&free=true")),
+            ["Data pipelines", "Python for data science"],
+        )
+
+    def test_index_follows_updates_renames_and_deletes(self):
+        LearningResource.objects.filter(title="Data pipelines").update(title="Streaming with Kafka")
+        self.assertEqual(self.titles("/api/learning-resources/?search=kafka"), ["Streaming with Kafka"])
+
+        self.go.name = "Golang"
+        self.go.save()
+        self.assertEqual(self.titles("/api/learning-resources/?search=golang"), ["Streaming with Kafka"])
+
+        LearningResource.objects.filter(skill=self.python).delete()
+        self.assertEqual(self.titles("/api/learning-resources/?search=decorators"), [])
+
+    def test_skill_search_covers_name_and_category(self):
+        response = self.client.get("/api/skills/?search=web")
+        self.assertEqual([row["name"] for row in response.data], ["React"])
+        response = self.client.get("/api/skills/?search=programming")
+        self.assertEqual({row["name"] for row in response.data}, {"Python", "Go"})
+
+    def test_rebuild_restores_a_lost_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_learningresource_fts")
+        self.assertEqual(self.titles("/api/learning-resources/?search=decorators"), [])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.titles("/api/learning-resources/?search=decorators"), ["Advanced Python"])
@@ -23,4 +23,6 @@ router.register(r'recommendations', RecommendationViewSet, basename='recommendat
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('', include('api.urls_external')),
+    path('', include('api.urls_integrated')),
 ]
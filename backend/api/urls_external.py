@@ -5,4 +5,7 @@ urlpatterns = [
     path('external/jobs/', ExternalJobDataView.as_view(), name='external_jobs'),
     path('external/trends/', MarketTrendsView.as_view(), name='market_trends'),
     path('external/skill-demand/', SkillDemandView.as_view(), name='skill_demand'),
+    path('external/related-skills/', RelatedSkillsView.as_view(), name='related_skills'),
+    path('external/next-skills/', NextSkillsView.as_view(), name='next_skills'),
+    path('external/market-history/', MarketHistoryView.as_view(), name='market_history'),
 ]
\ No newline at end of file
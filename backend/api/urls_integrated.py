@@ -0,0 +1,9 @@
+from django.urls import path
+from .view_integrated import *
+
+urlpatterns = [
+    path('integrated/auto-populate/', AutoPopulateCareerView.as_view(), name='auto_populate_career'),
+    path('integrated/auto-populate/batch/', BatchAutoPopulateCareerView.as_view(), name='auto_populate_careers'),
+    path('integrated/import-jobs/<int:pk>/', CareerImportJobView.as_view(), name='career_import_job'),
+    path('integrated/import-batches/<int:pk>/', CareerImportBatchView.as_view(), name='career_import_batch'),
+]
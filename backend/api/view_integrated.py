@@ -5,7 +5,15 @@ from rest_framework import status
 from .services.adzuna_service import adzuna_service
 from .services.coursera_service import CourseraService
 from .services.youtube_service import YouTubeService
-from .models import Skill, CareerPath, LearningResource
+from .services.fanout import Deadline, fan_out
+from .services.import_queue import career_import_queue
+from .services.skill_extractor import requirement_matcher
+from .models import CareerImportBatch, CareerImportJob
+from .serializers import CareerImportJobSerializer
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from functools import partial
 import json
 from rest_framework.permissions import AllowAny
 coursera_service = CourseraService()
@@ -14,51 +22,70 @@ youtube_service = YouTubeService()
 class IntegratedCareerAnalysisView(APIView):
     permission_classes = [IsAuthenticated]
     
+    # Overall budget for all external calls made by one analysis request
+    deadline_seconds = getattr(settings, 'EXTERNAL_API_DEADLINE', 15)
+
     def get(self, request, career_title):
         """Get comprehensive career analysis using external APIs"""
-        
-        # 1. Get market data for this career
-        job_data = adzuna_service.search_jobs(
-            what=career_title,
-            where='us',
-            max_results=20
-        )
-        
-        # 2. Get salary data
-        salary_data = adzuna_service.get_salary_data(
-            job_title=career_title,
-            location='us'
-        )
-        
-        # 3. Extract required skills from job descriptions
-        extracted_skills = adzuna_service.extract_skills_from_jobs(
-            job_title=career_title,
-            location='us',
-            max_pages=2
+        deadline = Deadline(self.deadline_seconds)
+
+        # 1-3. Market data, salary data and skills extracted from job descriptions
+        market, missing = fan_out(
+            {
+                'jobs': lambda: adzuna_service.search_jobs(
+                    what=career_title,
+                    where='us',
+                    max_results=20
+                ),
+                'salary': lambda: adzuna_service.get_salary_data(
+                    job_title=career_title,
+                    location='us'
+                ),
+                'skills': lambda: adzuna_service.extract_skills_from_jobs(
+                    job_title=career_title,
+                    location='us',
+                    max_pages=2
+                ),
+            },
+            deadline,
+            defaults={'jobs': {'results': []}, 'salary': {}, 'skills': []},
         )
-        
-        # 4. Get learning resources for top skills
-        learning_resources = []
-        for skill, count in extracted_skills[:5]:
+        job_data = market['jobs']
+        salary_data = market['salary']
+        extracted_skills = market['skills']
+
+        # 4. Get learning resources for top skills, all providers at once
+        top_skills = extracted_skills[:5]
+        calls = {}
+        for skill, count in top_skills:
             # Coursera courses
-            courses = coursera_service.search_courses(
+            calls[('courses', skill)] = partial(
+                coursera_service.search_courses,
                 query=skill,
                 max_results=5
             )
-            
             # YouTube tutorials
-            youtube_videos = youtube_service.search_educational_content(
+            calls[('videos', skill)] = partial(
+                youtube_service.search_educational_content,
                 query=f"{skill} tutorial",
                 max_results=5
             )
-            
-            learning_resources.append({
+
+        resources, missing_resources = fan_out(
+            calls, deadline, defaults={key: [] for key in calls}
+        )
+        missing.extend(f"{kind}:{skill}" for kind, skill in missing_resources)
+
+        learning_resources = [
+            {
                 'skill': skill,
                 'job_count': count,
-                'courses': courses,
-                'videos': youtube_videos
-            })
-        
+                'courses': resources[('courses', skill)],
+                'videos': resources[('videos', skill)]
+            }
+            for skill, count in top_skills
+        ]
+
         # 5. Analyze job requirements
         jobs = job_data.get('results', [])[:10]
         common_requirements = []
@@ -67,11 +94,11 @@ class IntegratedCareerAnalysisView(APIView):
                 desc = job['description'].lower()
                 requirements = self._extract_requirements(desc)
                 common_requirements.extend(requirements)
-        
+
         # Count requirements
         from collections import Counter
         top_requirements = Counter(common_requirements).most_common(10)
-        
+
         return Response({
             'career_title': career_title,
             'market_data': {
@@ -85,115 +112,83 @@ class IntegratedCareerAnalysisView(APIView):
             'required_skills': extracted_skills,
             'common_requirements': top_requirements,
             'learning_resources': learning_resources,
-            'sample_jobs': jobs[:5]
+            'sample_jobs': jobs[:5],
+            'partial': bool(missing),
+            'unavailable': missing
         })
-    
+
     def _extract_requirements(self, description):
-        # Simple keyword extraction
-        keywords = [
-            'degree', 'bachelor', 'master', 'phd', 'experience',
-            'years', 'certification', 'certified', 'knowledge of',
-            'proficient in', 'strong understanding', 'familiar with'
-        ]
-        
-        found = []
-        for keyword in keywords:
-            if keyword in description:
-                found.append(keyword)
-        
-        return found
+        return requirement_matcher.find(description)
 
 class AutoPopulateCareerView(APIView):
     permission_classes = [AllowAny]
     
     def post(self, request):
-        """Automatically populate career path data from external APIs"""
+        """Queue auto-population of a career path; run_import_worker does the work"""
         career_title = request.data.get('title', 'Software Developer')
-        
-        try:
-            # Get market data
-            job_data = adzuna_service.search_jobs(
-                what=career_title,
-                where='us',
-                max_results=50
-            )
-            
-            # Extract skills
-            extracted_skills = adzuna_service.extract_skills_from_jobs(
-                job_title=career_title,
-                location='us',
-                max_pages=2
-            )
-            
-            # Get salary data
-            salary_data = adzuna_service.get_salary_data(career_title, 'us')
-            
-            # Create or update career path in database
-            career, created = CareerPath.objects.update_or_create(
-                title=career_title,
-                defaults={
-                    'description': f"Career path for {career_title} based on market data",
-                    'average_salary': salary_data.get('median', 70000),
-                    'future_growth': 15,  # Could be calculated from trends
-                    'required_experience': '2-5 years'
-                }
+        if not isinstance(career_title, str) or not career_title.strip():
+            return Response({'error': 'title must be a non-empty string'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user if request.user.is_authenticated else None
+        job, created = career_import_queue.enqueue(career_title.strip(), user)
+        return Response({
+            'job_id': job.id,
+            'status': job.status,
+            'created': created,
+            'status_url': request.build_absolute_uri(reverse('career_import_job', args=[job.id]))
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class BatchAutoPopulateCareerView(APIView):
+    permission_classes = [AllowAny]
+
+    max_titles = 50
+
+    def post(self, request):
+        """Queue auto-population of several career paths, run in parallel by the workers"""
+        titles = request.data.get('titles')
+        if not isinstance(titles, list) or not all(isinstance(title, str) for title in titles):
+            return Response({'error': 'titles must be a list of strings'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One job per career, in the order given
+        unique = {}
+        for title in titles:
+            if title.strip():
+                unique.setdefault(title.strip().lower(), title.strip())
+        titles = list(unique.values())
+        if not 1 <= len(titles) <= self.max_titles:
+            return Response(
+                {'error': f"titles must contain between 1 and {self.max_titles} career titles"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            # Add skills to career path
-            for skill_name, frequency in extracted_skills[:10]:
-                # Get or create skill
-                skill, _ = Skill.objects.get_or_create(
-                    name=skill_name.capitalize(),
-                    defaults={
-                        'category': 'Technical',
-                        'description': f"Skill extracted from {career_title} job market"
-                    }
-                )
-                
-                # Add to career path with proficiency level based on frequency
-                proficiency = min(5, max(3, frequency // 10))  # Scale frequency to 3-5
-                
-                from .models import CareerPathSkill
-                CareerPathSkill.objects.update_or_create(
-                    career_path=career,
-                    skill=skill,
-                    defaults={
-                        'proficiency_level': proficiency,
-                        'is_core': proficiency >= 4
-                    }
-                )
-            
-            # Add learning resources
-            for skill_name, frequency in extracted_skills[:5]:
-                # Get courses
-                courses = coursera_service.search_courses(skill_name, 3)
-                
-                for course in courses:
-                    skill = Skill.objects.filter(name=skill_name.capitalize()).first()
-                    if skill:
-                        LearningResource.objects.update_or_create(
-                            title=course['name'],
-                            defaults={
-                                'description': course.get('description', ''),
-                                'resource_type': 'course',
-                                'url': course['link'],
-                                'skill': skill,
-                                'difficulty': 'beginner',
-                                'estimated_hours': 20,
-                                'free': course.get('free', True)
-                            }
-                        )
-            
-            return Response({
-                'success': True,
-                'career_id': career.id,
-                'skills_added': len(extracted_skills[:10]),
-                'resources_added': len(extracted_skills[:5]) * 3,
-                'message': f"Career path '{career_title}' populated successfully"
-            })
-            
-        except Exception as e:
-            return Response({
-                'success': False,
-                'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+
+        user = request.user if request.user.is_authenticated else None
+        batch, jobs = career_import_queue.enqueue_batch(titles, user)
+        return Response({
+            'batch_id': batch.id,
+            # Careers already queued elsewhere share that job (created False)
+            'jobs': [{'id': job.id, 'title': job.title, 'created': created} for job, created in jobs],
+            'status_url': request.build_absolute_uri(reverse('career_import_batch', args=[batch.id]))
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class CareerImportJobView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        """Status and progress of one queued auto-population"""
+        job = get_object_or_404(CareerImportJob, pk=pk)
+        return Response(CareerImportJobSerializer(job).data)
+
+
+class CareerImportBatchView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        """Overall progress of a batch and the status of each of its jobs"""
+        batch = get_object_or_404(CareerImportBatch, pk=pk)
+        return Response({
+            'batch_id': batch.id,
+            **career_import_queue.batch_summary(batch),
+            'jobs': CareerImportJobSerializer(batch.jobs.prefetch_related('batches'), many=True).data
+        })
@@ -1,10 +1,10 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import action
-from django.contrib.auth.models import User
+from rest_framework.exceptions import ParseError
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, Prefetch
 from datetime import datetime
 
 from .models import (
@@ -29,16 +29,11 @@ from .serializers import (
     UserProgressSerializer,
     RecommendationSerializer,
 )
-
-# -------------------------------------------------
-# HELPER: GET DEMO USER
-# -------------------------------------------------
-def get_demo_user():
-    user, _ = User.objects.get_or_create(
-        username="demo",
-        defaults={"email": "demo@example.com"}
-    )
-    return user
+from .filters import FullTextSearchFilter
+from .middleware import get_acting_user
+from .pagination import RecommendationCursorPagination
+from .services.recommendation_service import recommendation_service
+from .services.search import resource_index, skill_index
 
 
 # =================================================
@@ -48,8 +43,8 @@ class SkillViewSet(viewsets.ModelViewSet):
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'category']
+    filter_backends = [FullTextSearchFilter]
+    search_index = skill_index
 
 
 # =================================================
@@ -60,6 +55,17 @@ class CareerPathViewSet(viewsets.ModelViewSet):
     serializer_class = CareerPathSerializer
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'required_skills',
+                    queryset=CareerPathSkill.objects.select_related('skill')
+                )
+            )
+        return queryset
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = CareerPathDetailSerializer(instance)
@@ -74,12 +80,12 @@ class UserSkillViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        demo_user = get_demo_user()
-        return UserSkill.objects.filter(user=demo_user)
+        acting_user = get_acting_user(self.request)
+        return UserSkill.objects.filter(user=acting_user).select_related('skill')
 
     def perform_create(self, serializer):
-        demo_user = get_demo_user()
-        serializer.save(user=demo_user)
+        acting_user = get_acting_user(self.request)
+        serializer.save(user=acting_user)
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -88,8 +94,22 @@ class UserSkillViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def skill_gaps(self, request):
-        demo_user = get_demo_user()
-        recommendations = Recommendation.objects.filter(user=demo_user)
+        acting_user = get_acting_user(self.request)
+
+        def load():
+            return list(
+                Recommendation.objects.filter(user=acting_user)
+                .select_related('career_path').order_by('-match_percentage')
+            )
+
+        # Rows are kept current by the UserSkill/CareerPathSkill signals;
+        # score here only if a career with skills has no row for this user,
+        # as for a user never scored or a career added since
+        recommendations = load()
+        stored = {rec.career_path_id for rec in recommendations}
+        if not stored.issuperset(recommendation_service.get_matrix().career_ids.tolist()):
+            recommendation_service.refresh_user(acting_user)
+            recommendations = load()
 
         gaps = []
         for rec in recommendations:
@@ -109,8 +129,21 @@ class LearningResourceViewSet(viewsets.ModelViewSet):
     queryset = LearningResource.objects.all()
     serializer_class = LearningResourceSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'skill__name']
+    filter_backends = [FullTextSearchFilter]
+    search_index = resource_index
+
+    def get_queryset(self):
+        # ?difficulty=&resource_type=&free= narrow the list and any ?search=
+        resources = LearningResource.objects.all()
+        for field in ('difficulty', 'resource_type'):
+            if self.request.query_params.get(field):
+                resources = resources.filter(**{field: self.request.query_params[field]})
+        free = self.request.query_params.get('free', '').lower()
+        if free in ('true', '1'):
+            resources = resources.filter(free=True)
+        elif free in ('false', '0'):
+            resources = resources.filter(free=False)
+        return resources
 
 
 # =================================================
@@ -120,10 +153,27 @@ class InterviewQuestionViewSet(viewsets.ModelViewSet):
     queryset = InterviewQuestion.objects.all()
     serializer_class = InterviewQuestionSerializer
     permission_classes = [AllowAny]
+    # Query parameters narrowing the list, served by the matching index
+    query_filters = ('career_path', 'question_type', 'difficulty')
+
+    def get_queryset(self):
+        filters = {
+            field: self.request.query_params[field]
+            for field in self.query_filters if self.request.query_params.get(field)
+        }
+        if not filters.get('career_path', '0').isdigit():
+            raise ParseError("career_path must be a career path id")
+        for field in ('question_type', 'difficulty'):
+            choices = dict(InterviewQuestion._meta.get_field(field).choices)
+            if field in filters and filters[field] not in choices:
+                raise ParseError(f"{field} must be one of {', '.join(choices)}")
+        return InterviewQuestion.objects.filter(**filters)
 
     @action(detail=False, methods=['get'])
     def practice_session(self, request):
-        questions = InterviewQuestion.objects.order_by('?')[:10]
+        questions = self.get_queryset().select_related(
+            'career_path'
+        ).order_by('?')[:10]
 
         data = [
             {
@@ -150,21 +200,21 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        demo_user = get_demo_user()
-        profile, _ = UserProfile.objects.get_or_create(user=demo_user)
-        return UserProfile.objects.filter(user=demo_user)
+        acting_user = get_acting_user(self.request)
+        profile, _ = UserProfile.objects.get_or_create(user=acting_user)
+        return UserProfile.objects.filter(user=acting_user)
 
     @action(detail=False, methods=['get'])
     def dashboard(self, request):
-        demo_user = get_demo_user()
+        acting_user = get_acting_user(self.request)
 
-        skills_count = UserSkill.objects.filter(user=demo_user).count()
+        skills_count = UserSkill.objects.filter(user=acting_user).count()
         completed_resources = UserProgress.objects.filter(
-            user=demo_user, completed=True
+            user=acting_user, completed=True
         ).count()
 
         return Response({
-            "username": demo_user.username,
+            "username": acting_user.username,
             "skills_count": skills_count,
             "completed_resources": completed_resources,
         })
@@ -178,12 +228,12 @@ class UserProgressViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        demo_user = get_demo_user()
-        return UserProgress.objects.filter(user=demo_user)
+        acting_user = get_acting_user(self.request)
+        return UserProgress.objects.filter(user=acting_user).select_related('resource')
 
     def perform_create(self, serializer):
-        demo_user = get_demo_user()
-        serializer.save(user=demo_user)
+        acting_user = get_acting_user(self.request)
+        serializer.save(user=acting_user)
 
 
 # =================================================
@@ -192,7 +242,47 @@ class UserProgressViewSet(viewsets.ModelViewSet):
 class RecommendationViewSet(viewsets.ModelViewSet):
     serializer_class = RecommendationSerializer
     permission_classes = [AllowAny]
+    pagination_class = RecommendationCursorPagination
+    max_top_k = 100
 
     def get_queryset(self):
-        demo_user = get_demo_user()
-        return Recommendation.objects.filter(user=demo_user)
+        acting_user = get_acting_user(self.request)
+        return Recommendation.objects.filter(
+            user=acting_user
+        ).select_related('career_path')
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        try:
+            k = int(request.query_params.get('k', 10))
+        except ValueError:
+            return Response(
+                {"error": "k must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        k = max(1, min(k, self.max_top_k))
+
+        acting_user = get_acting_user(self.request)
+        ranked = recommendation_service.top_careers(acting_user.pk, k)
+        career_ids = [career_id for career_id, _ in ranked]
+
+        def load():
+            return {
+                rec.career_path_id: rec
+                for rec in Recommendation.objects.filter(
+                    user=acting_user, career_path_id__in=career_ids
+                ).select_related('career_path')
+            }
+
+        # Serve rows that agree with the live ranking: a career missing or
+        # scored differently is still waiting for its refresh
+        stored = load()
+        if any(
+            career_id not in stored or stored[career_id].match_percentage != match
+            for career_id, match in ranked
+        ):
+            recommendation_service.refresh_user(acting_user)
+            stored = load()
+
+        results = [stored[career_id] for career_id in career_ids]
+        return Response(RecommendationSerializer(results, many=True).data)
@@ -1,140 +1,340 @@
+from datetime import datetime, time
+
+from django.db.models import Avg, Count
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.text import slugify
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
+from .models import JobPosting, JobPostingSkill, SkillDemand, UserSkill
+from .serializers import JobPostingSerializer
 from .services.adzuna_service import adzuna_service
+from .services.market_history import INTERVALS, market_history_service
+from .services.search import job_title_index
+from .services.skill_extractor import get_skill_extractor
+from .services.skill_graph import get_skill_graph
 import json
 
+# Market endpoints answer from postings stored by `manage.py ingest_jobs`;
+# they only call Adzuna live while the local store has nothing to offer
+
+
+def top_skills(postings, limit, exclude=None):
+    """Most mentioned skills across postings, as (skill, count) pairs"""
+    rows = JobPostingSkill.objects.filter(posting__in=postings)
+    if exclude:
+        rows = rows.exclude(skill=exclude)
+    rows = rows.values('skill').annotate(count=Count('id')).order_by('-count', 'skill')[:limit]
+    return [(row['skill'], row['count']) for row in rows]
+
+
 class ExternalJobDataView(APIView):
     permission_classes = [IsAuthenticated]
-    
+
     def get(self, request):
         """Get job market data for a specific role"""
         job_title = request.query_params.get('title', 'software developer')
         location = request.query_params.get('location', 'us')
         max_results = request.query_params.get('max_results', 10)
-        
+
         try:
-            # Get job listings
-            job_data = adzuna_service.search_jobs(
-                what=job_title,
-                where=location,
-                max_results=int(max_results)
-            )
-            
-            # Get salary data
-            salary_data = adzuna_service.get_salary_data(
-                job_title=job_title,
-                location=location
+            max_results = int(max_results)
+            postings = job_title_index.filter(
+                JobPosting.objects.filter(country=location), job_title
             )
-            
-            # Extract skills from job descriptions
-            extracted_skills = adzuna_service.extract_skills_from_jobs(
-                job_title=job_title,
-                location=location,
-                max_pages=2
+            total_jobs = postings.count()
+            if not total_jobs:
+                return self.get_live(job_title, location, max_results)
+
+            salary_info = postings.aggregate(
+                average_min=Avg('salary_min'),
+                average_max=Avg('salary_max'),
+                sample_size=Count('salary_min'),
             )
-            
+
             return Response({
                 'success': True,
-                'job_listings': job_data.get('results', [])[:10],
-                'salary_info': salary_data,
-                'extracted_skills': extracted_skills,
-                'total_jobs': job_data.get('count', 0)
+                'source': 'local',
+                'job_listings': JobPostingSerializer(postings[:min(max_results, 10)], many=True).data,
+                'salary_info': salary_info,
+                'extracted_skills': top_skills(postings, 20),
+                'total_jobs': total_jobs
             })
-            
+
         except Exception as e:
             return Response({
                 'success': False,
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def get_live(self, job_title, location, max_results):
+        # Get job listings
+        job_data = adzuna_service.search_jobs(
+            what=job_title,
+            where=location,
+            max_results=max_results
+        )
+
+        # Get salary data
+        salary_data = adzuna_service.get_salary_data(
+            job_title=job_title,
+            location=location
+        )
+
+        # Extract skills from job descriptions
+        extracted_skills = adzuna_service.extract_skills_from_jobs(
+            job_title=job_title,
+            location=location,
+            max_pages=2
+        )
+
+        return Response({
+            'success': True,
+            'source': 'live',
+            'job_listings': job_data.get('results', [])[:10],
+            'salary_info': salary_data,
+            'extracted_skills': extracted_skills,
+            'total_jobs': job_data.get('count', 0)
+        })
+
 class MarketTrendsView(APIView):
     permission_classes = [IsAuthenticated]
-    
+    max_limit = 100
+
     def get(self, request):
         """Get market trends for different career paths"""
-        categories = adzuna_service.get_job_categories()
-        
-        # Analyze trends for top categories
-        trends = []
-        for category in categories.get('results', [])[:5]:
-            tag = category.get('tag', '')
-            label = category.get('label', '')
-            
-            # Get job count for this category
-            job_data = adzuna_service.search_jobs(
-                what=label,
-                where='us',
-                max_results=1
-            )
-            
-            trends.append({
-                'category': label,
-                'tag': tag,
-                'job_count': job_data.get('count', 0),
-                'average_salary': 0  # You can enhance this
-            })
-        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 5)), 1), self.max_limit)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        categories = list(
+            JobPosting.objects.filter(country='us')
+            .exclude(category='')
+            .values('category')
+            .annotate(job_count=Count('id'), average_salary=Avg(JobPosting.SALARY_MID))
+            .order_by('-job_count', 'category')
+        )
+        if not categories:
+            return self.get_live(limit)
+
+        trends = [
+            {
+                'category': row['category'],
+                'tag': slugify(row['category']),
+                'job_count': row['job_count'],
+                'average_salary': round(row['average_salary'] or 0, 2),
+            }
+            for row in categories[:limit]
+        ]
+
         return Response({
             'success': True,
+            'source': 'local',
             'trends': trends,
-            'total_categories': len(categories.get('results', []))
+            'total_categories': len(categories)
+        })
+
+    def get_live(self, limit):
+        # Every category's count and mean salary, fetched concurrently and
+        # cached together, so a page view costs at most one cache read
+        snapshot = adzuna_service.get_market_trends('us')
+
+        return Response({
+            'success': True,
+            'source': 'live',
+            'partial': not snapshot['complete'],
+            'trends': snapshot['trends'][:limit],
+            'total_categories': len(snapshot['trends'])
         })
 
 class SkillDemandView(APIView):
     permission_classes = [IsAuthenticated]
-    
+
     def get(self, request):
         """Get demand for specific skills in the market"""
         skill = request.query_params.get('skill', 'python')
-        
+        canonical = get_skill_extractor().canonical.get(skill.lower(), skill.lower())
+
+        # Aggregated over every ingested posting by skill_demand_service
+        try:
+            demand = SkillDemand.objects.get(skill=canonical)
+        except SkillDemand.DoesNotExist:
+            return self.get_live(skill)
+
+        # Sample postings cost a second query, so they are opt-in
+        try:
+            samples = min(int(request.query_params.get('samples', 0)), 20)
+        except ValueError:
+            samples = 0
+        sample_jobs = (
+            JobPosting.objects.filter(skills__skill=canonical)[:samples] if samples > 0 else []
+        )
+
+        return Response({
+            'skill': skill,
+            'source': 'local',
+            'total_jobs': demand.job_count,
+            'average_salary': round(demand.average_salary, 2),
+            'salary_percentiles': {
+                'p25': demand.salary_p25,
+                'median': demand.salary_median,
+                'p75': demand.salary_p75,
+            },
+            'top_locations': demand.top_locations(5),
+            'related_skills': get_skill_graph().related(canonical, 5),
+            'sample_jobs': JobPostingSerializer(sample_jobs, many=True).data
+        })
+
+    def get_live(self, skill):
         # Search for jobs requiring this skill
         job_data = adzuna_service.search_jobs(
             what=skill,
             where='us',
             max_results=50
         )
-        
+
         # Analyze job data
         jobs = job_data.get('results', [])
         total_jobs = job_data.get('count', 0)
-        
+
         # Calculate average salary for these jobs
         salaries = []
         locations = {}
-        
+
         for job in jobs:
             # Salary
             salary_min = job.get('salary_min')
             salary_max = job.get('salary_max')
             if salary_min and salary_max:
                 salaries.append((salary_min + salary_max) / 2)
-            
+
             # Location
             location = job.get('location', {}).get('display_name', 'Unknown')
             locations[location] = locations.get(location, 0) + 1
-        
+
         avg_salary = sum(salaries) / len(salaries) if salaries else 0
-        
+
         # Get common related skills
-        related_skills = []
-        for job in jobs[:10]:
-            description = job.get('description', '').lower()
-            common_skills = ['javascript', 'sql', 'aws', 'docker', 'react']
-            for s in common_skills:
-                if s in description and s != skill:
-                    related_skills.append(s)
-        
+        extractor = get_skill_extractor()
+        related_skills = extractor.count(
+            job.get('description', '') for job in jobs
+        )
+        related_skills.pop(extractor.canonical.get(skill.lower(), skill.lower()), None)
+
         # Count related skills
         from collections import Counter
-        top_related = Counter(related_skills).most_common(5)
-        
+        top_related = related_skills.most_common(5)
+
         return Response({
             'skill': skill,
+            'source': 'live',
             'total_jobs': total_jobs,
             'average_salary': round(avg_salary, 2),
             'top_locations': dict(Counter(locations).most_common(5)),
             'related_skills': top_related,
             'sample_jobs': jobs[:5]
-        })
\ No newline at end of file
+        })
+
+
+def canonical_skill(name):
+    name = name.strip().lower()
+    return get_skill_extractor().canonical.get(name, name)
+
+
+class RelatedSkillsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Skills most often required together with the given one"""
+        skill = canonical_skill(request.query_params.get('skill', 'python'))
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        graph = get_skill_graph()
+        if skill not in graph.index:
+            return Response({'error': f"Unknown skill '{skill}'"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'skill': skill,
+            'related_skills': graph.related(skill, limit)
+        })
+
+
+class NextSkillsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Suggest what to learn next from ?skills=a,b or the user's own skills"""
+        skills = request.query_params.get('skills')
+        if skills:
+            known = [canonical_skill(name) for name in skills.split(',') if name.strip()]
+        else:
+            known = [
+                canonical_skill(name)
+                for name in UserSkill.objects.filter(user=request.user)
+                .values_list('skill__name', flat=True)
+            ]
+
+        return Response({
+            'known_skills': known,
+            'next_skills': get_skill_graph().next_skills(known, 5)
+        })
+
+
+def parse_bound(value):
+    """Aware datetime from an ISO 8601 date or datetime, None if blank; ValueError otherwise"""
+    if not value:
+        return None
+    # Both raise ValueError for well-formed but impossible dates such as 2024-13-45
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"not a date: {value!r}")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class MarketHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Recorded job counts and salaries for a career or skill over time"""
+        subject_type = request.query_params.get('type', 'career')
+        subject = request.query_params.get('subject', '')
+        interval = request.query_params.get('interval', 'week')
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+
+        if subject_type not in ('career', 'skill'):
+            return Response({'error': "type must be 'career' or 'skill'"}, status=status.HTTP_400_BAD_REQUEST)
+        if interval not in INTERVALS:
+            return Response(
+                {'error': f"interval must be one of {', '.join(INTERVALS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            start, end = (parse_bound(value) for value in (start, end))
+        except ValueError:
+            return Response(
+                {'error': "start and end must be ISO 8601 dates or datetimes"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if subject_type == 'skill':
+            subject = canonical_skill(subject)
+
+        return Response({
+            'type': subject_type,
+            'subject': subject,
+            'interval': interval,
+            'growth': market_history_service.growth_rate(subject_type, subject),
+            'points': market_history_service.series(subject_type, subject, start, end, interval)
+        })
+